@@ -0,0 +1,65 @@
+import datetime as dt
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+
+def setup_django(database_name: str = None):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+    import django
+    from django.conf import settings
+    from django.core.management import call_command
+
+    settings.DATABASES['default']['NAME'] = database_name or os.path.join(
+        tempfile.mkdtemp(prefix='mrbs_bench_'), 'bench.sqlite3'
+    )
+    django.setup()
+    call_command('migrate', verbosity=0)
+
+
+def seed_reservations(rooms: int, reservations: int) -> tuple[list[int], dt.datetime, dt.datetime]:
+    from django.contrib.auth import get_user_model
+
+    from mrbs_app.models import Reservation, Room
+
+    user = get_user_model().objects.create_user(username='bench', password='bench')
+    room_ids = [
+        room.id
+        for room in Room.objects.bulk_create(
+            [
+                Room(number=number, name=f'Room_{number}', capacity=2 + number % 20)
+                for number in range(rooms)
+            ]
+        )
+    ]
+    start = dt.datetime(2024, 1, 1, tzinfo=dt.timezone.utc)
+    per_room = reservations // rooms
+    batch = []
+    for room_id in room_ids:
+        for slot in range(per_room):
+            reserved_from = start + dt.timedelta(hours=slot)
+            batch.append(
+                Reservation(
+                    purpose_of_booking='bench',
+                    reserved_from=reserved_from,
+                    reserved_to=reserved_from + dt.timedelta(minutes=30),
+                    status=Reservation.ReservationStatus.ACTIVE,
+                    user=user,
+                    room_id=room_id,
+                )
+            )
+            if len(batch) == 10_000:
+                Reservation.objects.bulk_create(batch)
+                batch = []
+    Reservation.objects.bulk_create(batch)
+    return room_ids, start, start + dt.timedelta(hours=per_room)
+
+
+@contextmanager
+def timer(label: str, operations: int = 1):
+    started = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - started
+    print(f'{label:<40} {elapsed:10.4f} s  {elapsed / operations * 1e6:12.2f} us/op')
@@ -0,0 +1,109 @@
+"""Concurrent-request throughput of the read endpoints under ASGI and WSGI.
+
+Requests go through Django's in-process WSGI and ASGI handlers (the test clients), so the
+numbers compare the request handling models rather than a particular application server:
+WSGI serves `--concurrency` requests from a thread pool, ASGI from one event loop.
+
+python -m benchmarks.asgi_wsgi --requests 2000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import seed_reservations, setup_django
+
+
+def _report(label: str, latencies: list[float], elapsed: float):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(
+        f'{label:<40} {len(latencies) / elapsed:10.1f} req/s'
+        f'  p50 {statistics.median(latencies) * 1e3:8.2f} ms  p95 {p95 * 1e3:8.2f} ms'
+    )
+
+
+def run_wsgi(path: str, params: dict, headers: dict, requests: int, concurrency: int):
+    from django.db import connection
+    from django.test import Client
+
+    def _request(_) -> float:
+        started = time.perf_counter()
+        response = Client().get(path, data=params, headers=headers)
+        assert response.status_code == 200, response.content
+        return time.perf_counter() - started
+
+    def _close_connection(_):
+        connection.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(executor.map(_request, range(requests)))
+        list(executor.map(_close_connection, range(concurrency)))
+    return latencies, time.perf_counter() - started
+
+
+async def run_asgi(path: str, params: dict, headers: dict, requests: int, concurrency: int):
+    from django.test import AsyncClient
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _request() -> float:
+        async with semaphore:
+            started = time.perf_counter()
+            response = await AsyncClient().get(path, data=params, headers=headers)
+            assert response.status_code == 200, response.content
+            return time.perf_counter() - started
+
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(_request() for _ in range(requests)))
+    return latencies, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--reservations', type=int, default=10_000)
+    parser.add_argument('--rooms', type=int, default=10)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib.auth import get_user_model
+    from django.test.utils import setup_test_environment
+    from django.urls import reverse
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    setup_test_environment()
+    room_ids, start, _ = seed_reservations(args.rooms, args.reservations)
+    user = get_user_model().objects.get(username='bench')
+    headers = {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+
+    list_params = {
+        'room_id': room_ids[0],
+        'reserved_from': start.isoformat(),
+        'reserved_to': (start.replace(year=start.year + 1)).isoformat(),
+        'limit': 50,
+    }
+    availability_params = {
+        'room_id': room_ids[0],
+        'reserved_from': start.isoformat(),
+        'reserved_to': start.replace(minute=15).isoformat(),
+    }
+    cases = (
+        ('list', 'reservations', 'async-reservations', list_params),
+        ('availability', 'availability', 'async-availability', availability_params),
+    )
+    print(f'{args.requests} requests, concurrency {args.concurrency}')
+    for label, sync_name, async_name, params in cases:
+        run = (reverse(sync_name), params, headers, args.requests, args.concurrency)
+        _report(f'{label}: WSGI, sync view', *run_wsgi(*run))
+        _report(f'{label}: ASGI, sync view', *asyncio.run(run_asgi(*run)))
+        run = (reverse(async_name), params, headers, args.requests, args.concurrency)
+        _report(f'{label}: ASGI, async view', *asyncio.run(run_asgi(*run)))
+
+
+if __name__ == '__main__':
+    main()
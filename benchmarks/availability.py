@@ -0,0 +1,53 @@
+"""Overlap checks: ORM query vs. in-process interval index.
+
+python -m benchmarks.availability --reservations 1000000 --rooms 100
+"""
+
+import argparse
+import datetime as dt
+import random
+
+from benchmarks import seed_reservations, setup_django, timer
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--reservations', type=int, default=1_000_000)
+    parser.add_argument('--rooms', type=int, default=100)
+    parser.add_argument('--probes', type=int, default=10_000)
+    args = parser.parse_args()
+
+    setup_django()
+    from mrbs_app.services.availability import (
+        IntervalIndexAvailabilityEngine,
+        ORMAvailabilityEngine,
+    )
+
+    with timer(f'seed {args.reservations} reservations'):
+        room_ids, start, end = seed_reservations(args.rooms, args.reservations)
+
+    rng = random.Random(0)
+    span = int((end - start).total_seconds() // 60)
+    probes = []
+    for _ in range(args.probes):
+        reserved_from = start + dt.timedelta(minutes=rng.randrange(span))
+        probes.append(
+            (rng.choice(room_ids), reserved_from, reserved_from + dt.timedelta(minutes=20))
+        )
+
+    orm_engine = ORMAvailabilityEngine()
+    index_engine = IntervalIndexAvailabilityEngine()
+
+    with timer('interval index: load all rooms', len(room_ids)):
+        for room_id in room_ids:
+            index_engine.is_available(room_id, start, start)
+    with timer('orm: is_available', len(probes)):
+        orm_answers = [orm_engine.is_available(*probe) for probe in probes]
+    with timer('interval index: is_available', len(probes)):
+        index_answers = [index_engine.is_available(*probe) for probe in probes]
+
+    assert orm_answers == index_answers, 'engines disagree'
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""DOCX report generation: the python-docx document tree against the streaming writer.
+
+Both writers get rows read from the database, as in BookingReportService, for increasing row
+counts. A writer whose run takes longer than --budget seconds is not run with more rows
+(python-docx grows quadratically with the number of rows). The peak of memory allocated by
+Python is measured with tracemalloc in a second run, for runs shorter than ten seconds.
+
+python -m benchmarks.docx_report --rows 1000 5000 50000 --split-by-room
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from itertools import islice
+
+from benchmarks import seed_reservations, setup_django
+
+WRITERS = ('python_docx', 'streaming')
+
+
+def run(row_counts: list[int], rooms: int, split_by_room: bool, budget: float):
+    from mrbs_app.services.booking import BookingReportService
+    from mrbs_app.services.docx_report import REPORT_WRITERS
+
+    _, start, end = seed_reservations(rooms, max(row_counts))
+    directory = tempfile.mkdtemp(prefix='mrbs_bench_')
+    service = BookingReportService()
+
+    def _write(writer: str, rows: int) -> str:
+        # pylint: disable=protected-access
+        bookings = service._get_reservations(start, end, by_room=split_by_room).iterator(
+            chunk_size=2000
+        )
+        file_path = os.path.join(directory, f'{writer}_{rows}.docx')
+        REPORT_WRITERS[writer]().write(islice(bookings, rows), file_path, split_by_room)
+        return file_path
+
+    print(f'{"writer":<12} {"rows":>8} {"time":>10} {"rows/s":>10} {"peak":>10} {"file":>9}')
+    for writer in WRITERS:
+        for rows in sorted(row_counts):
+            started = time.perf_counter()
+            file_path = _write(writer, rows)
+            elapsed = time.perf_counter() - started
+            peak = '-'
+            if elapsed < 10:
+                tracemalloc.start()
+                _write(writer, rows)
+                peak = f'{tracemalloc.get_traced_memory()[1] / 2**20:.1f} MB'
+                tracemalloc.stop()
+            print(
+                f'{writer:<12} {rows:>8} {elapsed:>8.2f} s {rows / elapsed:>10.0f} {peak:>10}'
+                f' {os.path.getsize(file_path) / 2**20:>6.1f} MB'
+            )
+            if elapsed > budget:
+                print(f'{writer:<12} over the {budget:.0f} s budget, larger row counts skipped')
+                break
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, nargs='+', default=[250, 500, 1000, 50_000])
+    parser.add_argument('--rooms', type=int, default=20)
+    parser.add_argument('--split-by-room', action='store_true')
+    parser.add_argument('--budget', type=float, default=30.0, help='Seconds per run')
+    args = parser.parse_args()
+
+    setup_django()
+    run(args.rows, args.rooms, args.split_by_room, args.budget)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Free-slot search: one query per room vs. one ordered query for all rooms.
+
+python -m benchmarks.free_slots --rooms 500 --reservations 50000
+"""
+
+import argparse
+import datetime as dt
+
+from benchmarks import seed_reservations, setup_django, timer
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rooms', type=int, default=500)
+    parser.add_argument('--reservations', type=int, default=50_000)
+    parser.add_argument('--window-hours', type=int, default=24)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from mrbs_app.services.booking import BookingService
+    from mrbs_app.services.free_slots import FreeSlotService, compute_free_gaps
+
+    with timer(f'seed {args.reservations} reservations'):
+        room_ids, start, _ = seed_reservations(args.rooms, args.reservations)
+    window_to = start + dt.timedelta(hours=args.window_hours)
+    duration = dt.timedelta(minutes=30)
+
+    def per_room():
+        # What clients do today: one reservations request per room, gaps on their side.
+        return [
+            compute_free_gaps(
+                BookingService._get_active_reservations(  # pylint: disable=protected-access
+                    room_id=room_id, reserved_from=start, reserved_to=window_to
+                )
+                .order_by('reserved_from')
+                .values_list('reserved_from', 'reserved_to'),
+                start,
+                window_to,
+                duration,
+            )
+            for room_id in room_ids
+        ]
+
+    def single_query():
+        return FreeSlotService.find_free_slots(start, window_to, duration)
+
+    for label, search in (('per-room queries', per_room), ('single ordered query', single_query)):
+        with CaptureQueriesContext(connection) as queries:
+            search()
+        with timer(f'{label} ({len(queries)} queries)', args.repeat):
+            for _ in range(args.repeat):
+                search()
+
+
+if __name__ == '__main__':
+    main()
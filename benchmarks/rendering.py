@@ -0,0 +1,58 @@
+"""Reservations list serialization and rendering paths.
+
+python -m benchmarks.rendering --rows 10000
+"""
+
+import argparse
+
+from benchmarks import seed_reservations, setup_django, timer
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.forms.models import model_to_dict
+    from rest_framework.renderers import JSONRenderer
+
+    from mrbs_app.api import renderers
+    from mrbs_app.api.renderers import FastJSONRenderer
+    from mrbs_app.models import Reservation
+    from mrbs_app.serializers.booking import ReservationsResponseSerializer
+    from mrbs_app.services.booking import RESERVATION_LIST_FIELDS
+
+    seed_reservations(rooms=1, reservations=args.rows)
+    reservations = Reservation.objects.order_by('reserved_from', 'id')
+
+    with timer('fetch model instances', args.repeat):
+        for _ in range(args.repeat):
+            instances = list(reservations)
+    with timer('fetch values() rows', args.repeat):
+        for _ in range(args.repeat):
+            rows = list(reservations.values(*RESERVATION_LIST_FIELDS))
+
+    print(f'orjson installed: {renderers.orjson is not None}')
+    for label, render in (
+        (
+            'ModelSerializer + JSONRenderer',
+            lambda: JSONRenderer().render(
+                ReservationsResponseSerializer(instances, many=True).data
+            ),
+        ),
+        (
+            'model_to_dict + JSONRenderer',
+            lambda: JSONRenderer().render([model_to_dict(instance) for instance in instances]),
+        ),
+        ('rows + JSONRenderer', lambda: JSONRenderer().render(rows)),
+        ('rows + FastJSONRenderer', lambda: FastJSONRenderer().render(rows)),
+    ):
+        with timer(label, args.repeat):
+            for _ in range(args.repeat):
+                render()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""Concurrent bookings on SQLite with the default configuration and the production profile.
+
+Writer threads book their own room through POST /booking/reservation while reader threads
+list reservations. Connections are handled as by the WSGI handler: close_old_connections()
+runs around every request, so CONN_MAX_AGE decides whether a connection is reused.
+
+"default" is plain SQLite (rollback journal, synchronous=FULL, a new connection per request,
+writers racing for the database lock); "production" is the profile core/settings.py
+selects with MRBS_SQLITE_PROFILE=production.
+
+python -m benchmarks.sqlite_profile --writers 8 --readers 4 --bookings 100
+"""
+
+import argparse
+import datetime as dt
+import os
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import seed_reservations, setup_django
+
+
+def _configure(profile: str, database_name: str):
+    from django.core.management import call_command
+    from django.db import connection, connections
+
+    import mrbs_app.services.locks
+    import mrbs_app.signals
+    from core import settings as project_settings
+
+    production = profile == 'production'
+    mrbs_app.signals.SQLITE_PRAGMAS = (
+        project_settings.SQLITE_PRODUCTION_PRAGMAS if production else {}
+    )
+    mrbs_app.services.locks.SERIALIZE_DATABASE_WRITES = production
+    database = connections.settings['default']
+    database['CONN_MAX_AGE'] = (
+        project_settings.DATABASES['default']['CONN_MAX_AGE'] if production else 0
+    )
+    database['NAME'] = database_name
+    connection.close()
+    connection.settings_dict.update(database)
+    call_command('migrate', verbosity=0)
+
+
+def _percentile(latencies: list[float], percent: int) -> float:
+    return sorted(latencies)[max(int(len(latencies) * percent / 100) - 1, 0)]
+
+
+def run_profile(profile: str, writers: int, readers: int, bookings: int):
+    from django.contrib.auth import get_user_model
+    from django.db import close_old_connections, connection
+    from django.test import Client
+    from django.urls import reverse
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from mrbs_app.services.user_cache import user_cache
+
+    _configure(profile, os.path.join(tempfile.mkdtemp(prefix='mrbs_bench_'), 'bench.sqlite3'))
+    user_cache.clear()
+    room_ids, start, end = seed_reservations(writers, writers * 100)
+    user = get_user_model().objects.get(username='bench')
+    headers = {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+    connection.close()
+    writing = threading.Event()
+    writing.set()
+
+    def _request(method, *args, **kwargs):
+        close_old_connections()
+        started = time.perf_counter()
+        response = method(*args, **kwargs, headers=headers)
+        latency = time.perf_counter() - started
+        close_old_connections()
+        return response.status_code, latency
+
+    def _write(room_id: int):
+        client = Client()
+        results = []
+        for slot in range(bookings):
+            reserved_from = end + dt.timedelta(hours=slot)
+            results.append(
+                _request(
+                    client.post,
+                    reverse('reservation'),
+                    data={
+                        'room_id': room_id,
+                        'purpose_of_booking': 'bench',
+                        'reserved_from': reserved_from.isoformat(),
+                        'reserved_to': (reserved_from + dt.timedelta(minutes=30)).isoformat(),
+                    },
+                )
+            )
+        connection.close()
+        return results
+
+    def _read(reader: int):
+        client = Client()
+        results = []
+        params = {
+            'room_id': room_ids[reader % len(room_ids)],
+            'reserved_from': start.isoformat(),
+            'reserved_to': end.isoformat(),
+            'limit': 50,
+        }
+        while writing.is_set():
+            results.append(_request(client.get, reverse('reservations'), data=params))
+        connection.close()
+        return results
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=writers + readers) as executor:
+        read_futures = [executor.submit(_read, reader) for reader in range(readers)]
+        write_results = [result for results in executor.map(_write, room_ids) for result in results]
+        elapsed = time.perf_counter() - started
+        writing.clear()
+        read_results = [result for future in read_futures for result in future.result()]
+
+    write_latencies = [latency for _, latency in write_results]
+    failed = sum(status_code != 201 for status_code, _ in write_results)
+    print(
+        f'{profile:<12} writes {len(write_results) / elapsed:8.1f}/s'
+        f'  p50 {statistics.median(write_latencies) * 1e3:7.1f} ms'
+        f'  p99 {_percentile(write_latencies, 99) * 1e3:7.1f} ms  failed {failed:4d}'
+    )
+    if read_results:
+        read_latencies = [latency for _, latency in read_results]
+        print(
+            f'{"":<12} reads  {len(read_results) / elapsed:8.1f}/s'
+            f'  p50 {statistics.median(read_latencies) * 1e3:7.1f} ms'
+            f'  p99 {_percentile(read_latencies, 99) * 1e3:7.1f} ms'
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--writers', type=int, default=8)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--bookings', type=int, default=100, help='Bookings per writer')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    print(f'{args.writers} writers x {args.bookings} bookings, {args.readers} readers')
+    for profile in ('default', 'production'):
+        run_profile(profile, args.writers, args.readers, args.bookings)
+
+
+if __name__ == '__main__':
+    main()
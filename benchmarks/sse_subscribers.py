@@ -0,0 +1,151 @@
+"""Idle GET /booking/events subscribers held by one ASGI worker, and fan-out latency.
+
+Subscribers connect straight to the ASGI application in one event loop (no network server),
+so the numbers are the cost of Django and the broker per open stream: memory, connect rate,
+CPU while idle, and the time for one booking to reach every subscriber of its room.
+
+python -m benchmarks.sse_subscribers --subscribers 5000 --rooms 1
+"""
+
+import argparse
+import asyncio
+import resource
+import time
+
+from benchmarks import setup_django
+
+
+def _rss_mb() -> float:
+    try:
+        with open('/proc/self/status', encoding='ascii') as status_file:
+            for line in status_file:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Subscriber:
+    def __init__(self, application, room_id: int, token: str):
+        self.connected = asyncio.Event()
+        self.received = asyncio.Event()
+        self.received_at = None
+        self._disconnect = asyncio.Event()
+        self._requested = False
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': '/booking/events',
+            'raw_path': b'/booking/events',
+            'query_string': f'room_id={room_id}'.encode(),
+            'root_path': '',
+            'headers': [(b'host', b'localhost'), (b'authorization', f'Bearer {token}'.encode())],
+            'client': ('127.0.0.1', 50000),
+            'server': ('localhost', 80),
+        }
+        self.task = asyncio.ensure_future(application(scope, self._receive, self._send))
+
+    async def _receive(self) -> dict:
+        if not self._requested:
+            self._requested = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await self._disconnect.wait()
+        return {'type': 'http.disconnect'}
+
+    async def _send(self, message: dict):
+        if message['type'] == 'http.response.start':
+            assert message['status'] == 200, message
+        body = message.get('body', b'')
+        if body.startswith(b'retry'):
+            self.connected.set()
+        elif body.startswith(b'id:'):
+            self.received_at = time.perf_counter()
+            self.received.set()
+
+    def disconnect(self):
+        self._disconnect.set()
+
+
+async def run(subscribers: int, rooms: int, idle: float, batch: int):
+    from asgiref.sync import sync_to_async
+    from django.contrib.auth import get_user_model
+    from django.core.asgi import get_asgi_application
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from benchmarks import seed_reservations
+    from mrbs_app.models import Reservation
+    from mrbs_app.services.events import reservation_events
+
+    application = get_asgi_application()
+    room_ids, start, end = await sync_to_async(seed_reservations)(rooms, rooms)
+    user = await get_user_model().objects.aget(username='bench')
+    token = str(AccessToken.for_user(user))
+
+    rss_before = _rss_mb()
+    started = time.perf_counter()
+    clients = []
+    for offset in range(0, subscribers, batch):
+        connecting = [
+            Subscriber(application, room_ids[number % rooms], token)
+            for number in range(offset, min(offset + batch, subscribers))
+        ]
+        await asyncio.gather(*(client.connected.wait() for client in connecting))
+        clients.extend(connecting)
+    connect_elapsed = time.perf_counter() - started
+    rss_after = _rss_mb()
+    assert reservation_events.subscribers == subscribers
+    print(
+        f'{subscribers} subscribers connected in {connect_elapsed:.2f} s'
+        f' ({subscribers / connect_elapsed:.0f}/s)'
+    )
+    print(
+        f'RSS {rss_before:.0f} MB -> {rss_after:.0f} MB'
+        f' ({(rss_after - rss_before) * 1024 / subscribers:.1f} KB per subscriber)'
+    )
+
+    cpu_started = time.process_time()
+    await asyncio.sleep(idle)
+    cpu = time.process_time() - cpu_started
+    print(f'CPU while idle for {idle:.0f} s: {cpu:.2f} s ({cpu / idle * 100:.1f}%)')
+
+    published = time.perf_counter()
+    await sync_to_async(Reservation.objects.create)(
+        purpose_of_booking='bench',
+        reserved_from=end,
+        reserved_to=end.replace(minute=30),
+        status=Reservation.ReservationStatus.ACTIVE,
+        user=user,
+        room_id=room_ids[0],
+    )
+    recipients = clients[::rooms]
+    await asyncio.gather(*(client.received.wait() for client in recipients))
+    latencies = sorted(client.received_at - published for client in recipients)
+    print(
+        f'one booking reached {len(recipients)} subscribers of its room:'
+        f' first {latencies[0] * 1e3:.1f} ms, last {latencies[-1] * 1e3:.1f} ms'
+    )
+
+    for client in clients:
+        client.disconnect()
+    await asyncio.gather(*(client.task for client in clients))
+    assert reservation_events.subscribers == 0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--subscribers', type=int, default=5000)
+    parser.add_argument('--rooms', type=int, default=1)
+    parser.add_argument('--idle', type=float, default=5.0, help='Seconds to measure idle CPU')
+    parser.add_argument('--batch', type=int, default=500, help='Subscribers connecting at once')
+    args = parser.parse_args()
+
+    setup_django()
+    asyncio.run(run(args.subscribers, args.rooms, args.idle, args.batch))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,219 @@
+"""End-to-end benchmarks of the booking API on seeded data.
+
+Every scenario sends requests through the full Django stack (JWT authentication included) and
+records latency percentiles, throughput and SQL queries per request. Results can be saved and
+compared with a run on another commit:
+
+python -m benchmarks.suite --reservations 1000000 --output before.json
+python -m benchmarks.suite --reservations 1000000 --compare before.json
+
+--database keeps the seeded database between runs, so only the first run pays for seeding.
+"""
+
+import argparse
+import datetime as dt
+import json
+import math
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+
+from benchmarks import setup_django
+
+COMPARED_METRICS = ('p50_ms', 'p95_ms', 'p99_ms', 'throughput_rps', 'queries_mean')
+
+
+def _percentile(values: list[float], percent: int) -> float:
+    ordered = sorted(values)
+    return ordered[max(math.ceil(percent / 100 * len(ordered)) - 1, 0)]
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run_scenario(make_request, iterations: int, warmup: int) -> dict:
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    for index in range(warmup):
+        make_request(index)
+    latencies, queries = [], []
+    started = time.perf_counter()
+    for index in range(warmup, warmup + iterations):
+        with CaptureQueriesContext(connection) as captured:
+            request_started = time.perf_counter()
+            make_request(index)
+            latencies.append(time.perf_counter() - request_started)
+        queries.append(len(captured))
+    elapsed = time.perf_counter() - started
+    return {
+        'iterations': iterations,
+        'mean_ms': statistics.fmean(latencies) * 1e3,
+        'p50_ms': _percentile(latencies, 50) * 1e3,
+        'p95_ms': _percentile(latencies, 95) * 1e3,
+        'p99_ms': _percentile(latencies, 99) * 1e3,
+        'throughput_rps': iterations / elapsed,
+        'queries_mean': statistics.fmean(queries),
+        'queries_max': max(queries),
+    }
+
+
+def make_scenarios(client, rng: random.Random) -> dict:
+    from django.urls import reverse
+    from django.utils import timezone
+
+    from mrbs_app.models import Room
+
+    room_ids = list(Room.objects.values_list('id', flat=True))
+    now = timezone.now().replace(minute=0, second=0, microsecond=0)
+    # Far enough ahead not to collide with seeded bookings, one hour per request.
+    create_start = now + dt.timedelta(days=3 * 365)
+
+    def _check(response, expected_status: int = 200):
+        assert response.status_code == expected_status, response.content
+        if response.streaming:
+            b''.join(response.streaming_content)
+
+    def _period(days: int) -> dict:
+        reserved_from = now - dt.timedelta(days=rng.randrange(300))
+        return {
+            'room_id': rng.choice(room_ids),
+            'reserved_from': reserved_from.isoformat(),
+            'reserved_to': (reserved_from + dt.timedelta(days=days)).isoformat(),
+        }
+
+    def _availability(_):
+        params = _period(days=0)
+        params['reserved_to'] = (
+            dt.datetime.fromisoformat(params['reserved_from']) + dt.timedelta(minutes=30)
+        ).isoformat()
+        _check(client.get(reverse('availability'), data=params))
+
+    def _list(_):
+        _check(client.get(reverse('reservations'), data={**_period(days=7), 'limit': 100}))
+
+    # Dashboards poll the same window: a 304 whatever the length of the window.
+    not_modified_params = {
+        'room_id': room_ids[0],
+        'reserved_from': (now - dt.timedelta(days=50 * 365)).isoformat(),
+        'reserved_to': (now + dt.timedelta(days=50 * 365)).isoformat(),
+    }
+    not_modified_etag = client.get(reverse('reservations'), data=not_modified_params)['ETag']
+
+    def _not_modified(_):
+        _check(
+            client.get(
+                reverse('reservations'),
+                data=not_modified_params,
+                HTTP_IF_NONE_MATCH=not_modified_etag,
+            ),
+            expected_status=304,
+        )
+
+    def _report_csv(_):
+        _check(client.get(reverse('report'), data={**_period(days=7), 'export': 'csv'}))
+
+    def _report_docx(_):
+        _check(client.get(reverse('report'), data=_period(days=1)))
+
+    def _create(index: int):
+        reserved_from = create_start + dt.timedelta(hours=index)
+        response = client.post(
+            reverse('reservation'),
+            data={
+                'room_id': rng.choice(room_ids),
+                'purpose_of_booking': 'benchmark',
+                'reserved_from': reserved_from.isoformat(),
+                'reserved_to': (reserved_from + dt.timedelta(minutes=30)).isoformat(),
+            },
+        )
+        _check(response, expected_status=201)
+
+    return {
+        'availability': _availability,
+        'list': _list,
+        'not_modified': _not_modified,
+        'report_csv': _report_csv,
+        'report_docx': _report_docx,
+        'create': _create,
+    }
+
+
+def print_results(results: dict, baseline: dict = None):
+    header = f'{"scenario":<14}' + ''.join(f'{metric:>16}' for metric in COMPARED_METRICS)
+    print(header)
+    for name, metrics in results['scenarios'].items():
+        line = f'{name:<14}'
+        for metric in COMPARED_METRICS:
+            cell = f'{metrics[metric]:.2f}'
+            previous = (baseline or {}).get('scenarios', {}).get(name, {}).get(metric)
+            if previous:
+                cell += f' ({(metrics[metric] - previous) / previous * 100:+.0f}%)'
+            line += f'{cell:>16}'
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rooms', type=int, default=100)
+    parser.add_argument('--reservations', type=int, default=100_000)
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--scenarios', nargs='*', help='Run only these scenarios')
+    parser.add_argument('--database', help='SQLite file to keep seeded data between runs')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    parser.add_argument('--compare', help='JSON results of an earlier run to compare with')
+    args = parser.parse_args()
+
+    setup_django(args.database)
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.test import Client
+    from django.test.utils import setup_test_environment
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from mrbs_app.models import Reservation
+    from mrbs_app.services import report_store
+
+    setup_test_environment()
+    settings.DEBUG = False
+    report_store.REPORT_STORE_DIR = tempfile.mkdtemp(prefix='mrbs_reports_')
+
+    if not Reservation.objects.exists():
+        call_command('seed_bookings', rooms=args.rooms, reservations=args.reservations)
+    user = get_user_model().objects.order_by('id').first()
+    client = Client(headers={'Authorization': f'Bearer {AccessToken.for_user(user)}'})
+
+    scenarios = make_scenarios(client, random.Random(0))
+    results = {
+        'commit': _git_commit(),
+        'reservations': Reservation.objects.count(),
+        'scenarios': {
+            name: run_scenario(make_request, args.iterations, args.warmup)
+            for name, make_request in scenarios.items()
+            if not args.scenarios or name in args.scenarios
+        },
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+        print(f'commit {results["commit"]} vs {baseline["commit"]}')
+    print_results(results, baseline)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump(results, output_file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 import datetime
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -45,6 +46,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'mrbs_app.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -82,9 +84,37 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Keep connections between requests, the pragmas below then run once per connection.
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# SQLite profile, selected by the MRBS_SQLITE_PROFILE environment variable: 'default' keeps
+# the stock SQLite configuration, 'production' applies SQLITE_PRODUCTION_PRAGMAS and
+# serializes the writes of a process.
+SQLITE_PROFILE = os.environ.get('MRBS_SQLITE_PROFILE', 'default')
+
+# Applied to every new SQLite connection in the production profile. WAL lets readers run
+# alongside the writer and, with synchronous=NORMAL, a commit no longer waits for fsync (a
+# power loss may drop the last commits but never corrupts the database). busy_timeout is in
+# milliseconds.
+SQLITE_PRODUCTION_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'temp_store': 'memory',
+}
+SQLITE_PRAGMAS = SQLITE_PRODUCTION_PRAGMAS if SQLITE_PROFILE == 'production' else {}
+
+# SQLite allows one writer at a time: in the production profile the writes of this process
+# wait for each other on one in-process lock instead of competing for the database lock. The
+# per-room locks of mrbs_app.services.locks are then always taken under it and only matter
+# without it (the default profile, or another database).
+SERIALIZE_DATABASE_WRITES = SQLITE_PROFILE == 'production'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -132,7 +162,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'mrbs_app.api.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
@@ -149,5 +179,79 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": datetime.timedelta(days=1),
 }
 
-REPORT_FILE_PATH = 'reports/report_'
+# Generated DOCX reports are stored in REPORT_STORE_DIR under the hash of their parameters
+# and data version; the least recently used ones are deleted once the files take more than
+# REPORT_STORE_MAX_BYTES.
+REPORT_STORE_DIR = 'reports'
+REPORT_STORE_MAX_BYTES = 512 * 1024 * 1024
 REPORT_EXT = '.docx'
+# Report files are sent by Django (FileResponse) when None. With 'X-Accel-Redirect' nginx
+# sends them from REPORT_SENDFILE_URL_PREFIX, an internal location aliased to REPORT_STORE_DIR;
+# with 'X-Sendfile' Apache or lighttpd send them by their absolute path.
+REPORT_SENDFILE_HEADER = None
+REPORT_SENDFILE_URL_PREFIX = '/protected/reports/'
+REPORT_EXPORT_CHUNK_SIZE = 2000
+
+# Background report jobs, see `manage.py report_worker`. A job running longer than
+# REPORT_JOB_TIMEOUT seconds is considered abandoned and is queued again.
+REPORT_WORKER_CONCURRENCY = 2
+REPORT_WORKER_POLL_INTERVAL = 1.0
+REPORT_JOB_TIMEOUT = 600
+
+# 'orm' checks every booking with a database query, 'interval_index' keeps a per-room
+# in-process interval index (suitable for single-process deployments only).
+AVAILABILITY_ENGINE = 'orm'
+
+# Attempts to repeat a booking that failed on a locked database, with exponential backoff
+# (in seconds) and full jitter between them.
+RESERVATION_MAX_RETRIES = 5
+RESERVATION_RETRY_BACKOFF = 0.01
+
+BULK_RESERVATIONS_MAX_ITEMS = 1000
+
+# Page size of GET /booking/reservations when `limit` is not given, and its upper bound.
+RESERVATIONS_PAGE_SIZE = 100
+RESERVATIONS_MAX_PAGE_SIZE = 1000
+
+SERIES_MAX_OCCURRENCES = 366
+
+# Longest reservation accepted by the API and the admin, in days. It bounds the per-day rows
+# written for a change: longer reservations created otherwise bump one whole-time data version
+# per room.
+RESERVATION_MAX_DAYS = 31
+
+# Upper bound of buckets per room returned by GET /booking/analytics/occupancy.
+ANALYTICS_MAX_BUCKETS = 24 * 31
+
+# `manage.py sweep_reservations` moves ended reservations to COMPLETED in chunks of
+# RESERVATION_SWEEP_CHUNK_SIZE rows, every RESERVATION_SWEEP_INTERVAL seconds in loop mode.
+RESERVATION_SWEEP_CHUNK_SIZE = 1000
+RESERVATION_SWEEP_INTERVAL = 60.0
+
+# Rows moved per transaction by `manage.py archive_reservations`.
+RESERVATION_ARCHIVE_CHUNK_SIZE = 1000
+
+# Requests running more SQL queries than this are logged by RequestMetricsMiddleware
+# (None disables the check). Request and service timings are exposed at GET /metrics.
+REQUEST_QUERY_BUDGET = 20
+
+# In-process cache of users authenticated by JWT: the number of cached users and the seconds
+# an entry lives (bounds the delay before a change made by another process is seen).
+AUTH_USER_CACHE_SIZE = 10_000
+AUTH_USER_CACHE_TTL = 60.0
+
+# GET /booking/events (ASGI only): seconds between heartbeat comments, events buffered per
+# subscriber before a slow subscriber is disconnected to resume with Last-Event-ID, and the
+# reconnection delay suggested to clients in milliseconds. The fan-out is in-process, like
+# the 'interval_index' availability engine.
+EVENTS_HEARTBEAT_INTERVAL = 15.0
+EVENTS_SUBSCRIBER_QUEUE_SIZE = 100
+EVENTS_RETRY_MS = 3000
+
+# Upper bound of time slots per room returned by GET /booking/availability-matrix (a week of
+# 5-minute slots).
+AVAILABILITY_MATRIX_MAX_SLOTS = 7 * 24 * 12
+
+# Writer of DOCX reports: 'streaming' writes the table XML straight into the file while the
+# rows are read, 'python_docx' builds the whole document in memory first.
+REPORT_DOCX_WRITER = 'streaming'
@@ -1,8 +1,17 @@
 from django.contrib import admin
 
-from mrbs_app.models import Reservation, Room
+from mrbs_app.models import (
+    ReportJob,
+    Reservation,
+    ReservationArchive,
+    ReservationSeries,
+    Room,
+    RoomDailyOccupancy,
+)
 
 
-@admin.register(Room, Reservation)
+@admin.register(
+    Room, Reservation, ReservationSeries, ReportJob, RoomDailyOccupancy, ReservationArchive
+)
 class ReservationAdmin(admin.ModelAdmin):
     pass
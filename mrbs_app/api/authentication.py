@@ -0,0 +1,68 @@
+import copy
+
+from django.contrib.auth import get_user_model
+from django.http import HttpRequest
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import Token
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from mrbs_app.services.user_cache import user_cache
+
+
+def _get_token_version(validated_token: Token):
+    # The password hash claim changes when the password does, so tokens issued before
+    # a password change never match a user cached after it.
+    return validated_token.get(jwt_settings.REVOKE_TOKEN_CLAIM)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    # JWTAuthentication that serves users from an in-process cache, so authenticated requests
+    # do not query the user table. Entries are invalidated when a user is saved or deleted.
+    def get_user(self, validated_token: Token):
+        user_id = validated_token.get(jwt_settings.USER_ID_CLAIM)
+        token_version = _get_token_version(validated_token)
+        user = user_cache.get(user_id, token_version)
+        if user is None:
+            generation = user_cache.generation
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, token_version, user, generation)
+        # Views may set attributes on request.user, the cached instance must stay untouched.
+        return copy.copy(user)
+
+
+_jwt_authentication = CachedJWTAuthentication()
+
+
+async def aauthenticate(request: HttpRequest):
+    # Async counterpart of JWTAuthentication for plain Django async views: the token is
+    # checked in the event loop and only the user lookup goes to the database.
+    header = _jwt_authentication.get_header(request)
+    if header is None:
+        return None
+    raw_token = _jwt_authentication.get_raw_token(header)
+    if raw_token is None:
+        return None
+    try:
+        validated_token = _jwt_authentication.get_validated_token(raw_token)
+        user_id = validated_token[jwt_settings.USER_ID_CLAIM]
+    except (InvalidToken, KeyError):
+        return None
+    token_version = _get_token_version(validated_token)
+    user = user_cache.get(user_id, token_version)
+    if user is None:
+        generation = user_cache.generation
+        user = await (
+            get_user_model()
+            .objects.filter(**{jwt_settings.USER_ID_FIELD: user_id}, is_active=True)
+            .afirst()
+        )
+        if user is None:
+            return None
+        if jwt_settings.CHECK_REVOKE_TOKEN and token_version != get_md5_hash_password(
+            user.password
+        ):
+            return None
+        user_cache.set(user_id, token_version, user, generation)
+    return copy.copy(user)
@@ -9,3 +9,35 @@ class HTTPErrorMessages:
         'Время бронирования указано неверно',
         'incorrect_reservation_time',
     )
+    BOOKING_CONFLICT = (
+        'Не удалось забронировать комнату, повторите попытку',
+        'booking_conflict',
+    )
+    RESERVATION_NOT_FOUND = (
+        'Бронирование не найдено',
+        'reservation_not_found',
+    )
+    SERIES_TOO_LONG = (
+        'Слишком много повторений в серии бронирований',
+        'series_too_long',
+    )
+    REPORT_JOB_NOT_FOUND = (
+        'Задача формирования отчёта не найдена',
+        'report_job_not_found',
+    )
+    REPORT_NOT_READY = (
+        'Отчёт ещё не готов',
+        'report_not_ready',
+    )
+    REPORT_EXPIRED = (
+        'Файл отчёта удалён из хранилища, создайте задачу заново',
+        'report_expired',
+    )
+    ANALYTICS_WINDOW_TOO_LONG = (
+        'Слишком длинный период для выбранной детализации',
+        'analytics_window_too_long',
+    )
+    AVAILABILITY_MATRIX_TOO_LARGE = (
+        'Слишком много временных слотов: увеличьте длину слота или сократите период',
+        'availability_matrix_too_large',
+    )
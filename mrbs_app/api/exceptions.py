@@ -8,3 +8,35 @@ class ReservationBusyError(BookingErrorBase):
 
 class ReservationTimeError(BookingErrorBase):
     pass
+
+
+class ReservationNotFoundError(BookingErrorBase):
+    pass
+
+
+class ReservationConflictError(BookingErrorBase):
+    pass
+
+
+class ReservationSeriesTooLongError(BookingErrorBase):
+    pass
+
+
+class ReportJobNotFoundError(BookingErrorBase):
+    pass
+
+
+class ReportNotReadyError(BookingErrorBase):
+    pass
+
+
+class ReportExpiredError(BookingErrorBase):
+    pass
+
+
+class AnalyticsWindowTooLongError(BookingErrorBase):
+    pass
+
+
+class AvailabilityMatrixTooLargeError(BookingErrorBase):
+    pass
@@ -1,9 +1,62 @@
 from django.urls import path
 
-from .views import booking
+from .views import booking, booking_async, metrics
 
 urlpatterns = [
     path(r'booking/reservation', booking.ReservationCreateView.as_view(), name='reservation'),
     path(r'booking/reservations', booking.ReservationListView.as_view(), name='reservations'),
+    path(
+        r'booking/reservations/bulk',
+        booking.ReservationBulkCreateView.as_view(),
+        name='reservations-bulk',
+    ),
+    path(r'booking/series', booking.ReservationSeriesCreateView.as_view(), name='series'),
+    path(
+        r'booking/series/<int:series_id>',
+        booking.ReservationSeriesView.as_view(),
+        name='series-detail',
+    ),
+    path(
+        r'booking/series/<int:series_id>/skip',
+        booking.ReservationSeriesSkipView.as_view(),
+        name='series-skip',
+    ),
+    path(r'booking/changes', booking.ReservationChangesView.as_view(), name='changes'),
+    path(r'booking/availability', booking.AvailabilityView.as_view(), name='availability'),
+    path(
+        r'booking/availability-matrix',
+        booking.AvailabilityMatrixView.as_view(),
+        name='availability-matrix',
+    ),
+    path(r'booking/free-slots', booking.FreeSlotsView.as_view(), name='free-slots'),
+    path(
+        r'booking/analytics/occupancy',
+        booking.OccupancyView.as_view(),
+        name='analytics-occupancy',
+    ),
     path(r'booking/report', booking.ReservationReportView.as_view(), name='report'),
+    path(r'booking/report/jobs', booking.ReportJobCreateView.as_view(), name='report-jobs'),
+    path(
+        r'booking/report/jobs/<int:job_id>',
+        booking.ReportJobView.as_view(),
+        name='report-job',
+    ),
+    path(
+        r'booking/report/jobs/<int:job_id>/file',
+        booking.ReportJobFileView.as_view(),
+        name='report-job-file',
+    ),
+    path(
+        r'booking/async/reservations',
+        booking_async.reservation_list,
+        name='async-reservations',
+    ),
+    path(r'booking/async/availability', booking_async.availability, name='async-availability'),
+    path(
+        r'booking/async/report/jobs/<int:job_id>',
+        booking_async.report_job,
+        name='async-report-job',
+    ),
+    path(r'booking/events', booking_async.events, name='events'),
+    path(r'metrics', metrics.metrics, name='metrics'),
 ]
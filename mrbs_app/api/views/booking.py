@@ -1,16 +1,66 @@
 # pylint: disable=too-many-return-statements, too-many-branches, unused-argument
-from django.forms.models import model_to_dict
-from drf_spectacular.utils import extend_schema
+import os
+
+from core.settings import REPORT_SENDFILE_HEADER, REPORT_SENDFILE_URL_PREFIX
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header
+from drf_spectacular.utils import OpenApiParameter, extend_schema
 from rest_framework import status
-from rest_framework.generics import CreateAPIView, ListAPIView, RetrieveAPIView
+from rest_framework.generics import CreateAPIView, DestroyAPIView, ListAPIView, RetrieveAPIView
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.request import Request
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 import mrbs_app.api.exceptions as booking_exceptions
 import mrbs_app.serializers.booking as booking_serializers
 from mrbs_app.api.error_messages import HTTPErrorMessages
+from mrbs_app.api.renderers import FastJSONRenderer
+from mrbs_app.services.analytics import OccupancyService
+from mrbs_app.services.availability_matrix import AvailabilityMatrixService
 from mrbs_app.services.booking import BookingReportService, BookingService
+from mrbs_app.services.changes import ReservationChangeService
+from mrbs_app.services.docx_report import DOCX_CONTENT_TYPE
+from mrbs_app.services.free_slots import FreeSlotService
+from mrbs_app.services.report_jobs import ReportJobService
+from mrbs_app.services.series import ReservationSeriesService
+
+
+def make_next_page_headers(url: str, next_cursor: str | None) -> dict:
+    if next_cursor is None:
+        return {}
+    next_url = replace_query_param(url, 'cursor', next_cursor)
+    return {'Link': f'<{next_url}>; rel="next"', 'X-Next-Cursor': next_cursor}
+
+
+def make_report_file_response(file_path: str, file_name: str) -> HttpResponse:
+    # Report bytes are sent by the front server when it is configured to, otherwise by
+    # FileResponse, which uses the server's sendfile support (wsgi.file_wrapper) if any.
+    if REPORT_SENDFILE_HEADER is None:
+        return FileResponse(
+            open(file_path, 'rb'),  # pylint: disable=consider-using-with
+            as_attachment=True,
+            filename=file_name,
+            content_type=DOCX_CONTENT_TYPE,
+        )
+    response = HttpResponse(content_type=DOCX_CONTENT_TYPE)
+    response['Content-Disposition'] = content_disposition_header(True, file_name)
+    if REPORT_SENDFILE_HEADER == 'X-Accel-Redirect':
+        response[REPORT_SENDFILE_HEADER] = (
+            f'{REPORT_SENDFILE_URL_PREFIX}{os.path.basename(file_path)}'
+        )
+    else:
+        response[REPORT_SENDFILE_HEADER] = os.path.abspath(file_path)
+    return response
+
+
+def get_not_modified_response(request: Request, etag: str) -> HttpResponse | None:
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        response['ETag'] = etag
+    return response
 
 
 class ReservationCreateView(CreateAPIView):
@@ -32,24 +82,146 @@ class ReservationCreateView(CreateAPIView):
                 data=HTTPErrorMessages.INCORRECT_RESERVATION_TIME,
                 status=status.HTTP_400_BAD_REQUEST,
             )
+        except booking_exceptions.ReservationConflictError:
+            return Response(
+                data=HTTPErrorMessages.BOOKING_CONFLICT, status=status.HTTP_409_CONFLICT
+            )
         return Response(status=status.HTTP_201_CREATED)
 
 
+class ReservationBulkCreateView(CreateAPIView):
+    permission_classes = (IsAuthenticated,)
+
+    @staticmethod
+    def _make_item_result(index: int, result) -> dict:
+        if isinstance(result, booking_exceptions.ReservationTimeError):
+            return {
+                'index': index,
+                'created': False,
+                'error': HTTPErrorMessages.INCORRECT_RESERVATION_TIME,
+            }
+        if isinstance(result, booking_exceptions.ReservationBusyError):
+            return {
+                'index': index,
+                'created': False,
+                'error': HTTPErrorMessages.BOOKING_TIME_IS_BUSY[0],
+            }
+        return {'index': index, 'created': True, 'id': result.id}
+
+    @extend_schema(
+        request=booking_serializers.ReservationCreateSerializer(many=True),
+        responses={
+            status.HTTP_200_OK: booking_serializers.ReservationBulkResultSerializer(many=True),
+        },
+    )
+    def post(self, request: Request, *args, **kwargs):
+        try:
+            booking_service = BookingService()
+            results = booking_service.make_reservations_bulk(request=request)
+        except booking_exceptions.ReservationConflictError:
+            return Response(
+                data=HTTPErrorMessages.BOOKING_CONFLICT, status=status.HTTP_409_CONFLICT
+            )
+        return Response(
+            data=[self._make_item_result(index, result) for index, result in enumerate(results)],
+            status=status.HTTP_200_OK,
+        )
+
+
+class ReservationSeriesCreateView(CreateAPIView):
+    permission_classes = (IsAuthenticated,)
+
+    @extend_schema(
+        request=booking_serializers.ReservationSeriesCreateSerializer,
+        responses={
+            status.HTTP_201_CREATED: booking_serializers.ReservationSeriesResponseSerializer,
+        },
+    )
+    def post(self, request: Request, *args, **kwargs):
+        try:
+            series_service = ReservationSeriesService()
+            series, occurrences = series_service.create_series(request=request)
+        except booking_exceptions.ReservationBusyError:
+            return Response(
+                data=HTTPErrorMessages.BOOKING_TIME_IS_BUSY, status=status.HTTP_400_BAD_REQUEST
+            )
+        except booking_exceptions.ReservationTimeError:
+            return Response(
+                data=HTTPErrorMessages.INCORRECT_RESERVATION_TIME,
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except booking_exceptions.ReservationSeriesTooLongError:
+            return Response(
+                data=HTTPErrorMessages.SERIES_TOO_LONG, status=status.HTTP_400_BAD_REQUEST
+            )
+        except booking_exceptions.ReservationConflictError:
+            return Response(
+                data=HTTPErrorMessages.BOOKING_CONFLICT, status=status.HTTP_409_CONFLICT
+            )
+        return Response(
+            data={'id': series.id, 'occurrences': occurrences}, status=status.HTTP_201_CREATED
+        )
+
+
+class ReservationSeriesView(DestroyAPIView):
+    permission_classes = (IsAuthenticated,)
+    serializer_class = booking_serializers.ReservationSeriesResponseSerializer
+
+    def delete(self, request: Request, *args, **kwargs):
+        try:
+            series_service = ReservationSeriesService()
+            series_service.cancel_series(series_id=kwargs['series_id'], request=request)
+        except booking_exceptions.ReservationNotFoundError:
+            return Response(
+                data=HTTPErrorMessages.RESERVATION_NOT_FOUND, status=status.HTTP_404_NOT_FOUND
+            )
+        except booking_exceptions.ReservationConflictError:
+            return Response(
+                data=HTTPErrorMessages.BOOKING_CONFLICT, status=status.HTTP_409_CONFLICT
+            )
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ReservationSeriesSkipView(CreateAPIView):
+    permission_classes = (IsAuthenticated,)
+    serializer_class = booking_serializers.ReservationSeriesSkipSerializer
+
+    @extend_schema(
+        request=booking_serializers.ReservationSeriesSkipSerializer,
+    )
+    def post(self, request: Request, *args, **kwargs):
+        try:
+            series_service = ReservationSeriesService()
+            series_service.skip_occurrence(series_id=kwargs['series_id'], request=request)
+        except booking_exceptions.ReservationNotFoundError:
+            return Response(
+                data=HTTPErrorMessages.RESERVATION_NOT_FOUND, status=status.HTTP_404_NOT_FOUND
+            )
+        except booking_exceptions.ReservationConflictError:
+            return Response(
+                data=HTTPErrorMessages.BOOKING_CONFLICT, status=status.HTTP_409_CONFLICT
+            )
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
 class ReservationListView(ListAPIView):
     permission_classes = (IsAuthenticated,)
-    serializer_class = booking_serializers.ReservationsRequestSerializer
+    renderer_classes = (FastJSONRenderer, BrowsableAPIRenderer)
+    serializer_class = booking_serializers.ReservationsPageRequestSerializer
 
     @extend_schema(
-        parameters=[booking_serializers.ReservationsRequestSerializer],
+        parameters=[booking_serializers.ReservationsPageRequestSerializer],
         responses={
-            status.HTTP_200_OK: booking_serializers.ReservationsResponseSerializer,
+            status.HTTP_200_OK: booking_serializers.ReservationsResponseSerializer(many=True),
         },
     )
     def get(self, request, *args, **kwargs):
         try:
             booking_service = BookingService()
-            reservations = booking_service.get_reservations_by_period(request=request)
-            reservations = [model_to_dict(reservation) for reservation in reservations]
+            etag = booking_service.get_reservations_etag(request=request)
+            if not_modified := get_not_modified_response(request, etag):
+                return not_modified
+            reservations, next_cursor = booking_service.get_reservations_page(request=request)
         except booking_exceptions.ReservationBusyError:
             return Response(
                 data=HTTPErrorMessages.BOOKING_TIME_IS_BUSY, status=status.HTTP_400_BAD_REQUEST
@@ -59,19 +231,148 @@ class ReservationListView(ListAPIView):
                 data=HTTPErrorMessages.INCORRECT_RESERVATION_TIME,
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        return Response(data=reservations, status=status.HTTP_200_OK)
+        return Response(
+            data=reservations,
+            status=status.HTTP_200_OK,
+            headers={
+                'ETag': etag,
+                **make_next_page_headers(request.build_absolute_uri(), next_cursor),
+            },
+        )
+
+
+class ReservationChangesView(RetrieveAPIView):
+    permission_classes = (IsAuthenticated,)
+    renderer_classes = (FastJSONRenderer, BrowsableAPIRenderer)
+    serializer_class = booking_serializers.ReservationChangesSerializer
+
+    @extend_schema(parameters=[booking_serializers.ReservationChangesRequestSerializer])
+    def get(self, request, *args, **kwargs):
+        change_service = ReservationChangeService()
+        changes = change_service.get_changes(request=request)
+        return Response(data=changes, status=status.HTTP_200_OK)
+
+
+class AvailabilityView(RetrieveAPIView):
+    permission_classes = (IsAuthenticated,)
+    serializer_class = booking_serializers.AvailabilityResponseSerializer
+
+    @extend_schema(parameters=[booking_serializers.ReservationsRequestSerializer])
+    def get(self, request, *args, **kwargs):
+        try:
+            booking_service = BookingService()
+            availability = booking_service.check_availability(request=request)
+        except booking_exceptions.ReservationTimeError:
+            return Response(
+                data=HTTPErrorMessages.INCORRECT_RESERVATION_TIME,
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(data=availability, status=status.HTTP_200_OK)
+
+
+class FreeSlotsView(ListAPIView):
+    permission_classes = (IsAuthenticated,)
+    renderer_classes = (FastJSONRenderer, BrowsableAPIRenderer)
+    serializer_class = booking_serializers.FreeSlotsRequestSerializer
+
+    @extend_schema(
+        parameters=[booking_serializers.FreeSlotsRequestSerializer],
+        responses={
+            status.HTTP_200_OK: booking_serializers.RoomFreeSlotsSerializer(many=True),
+        },
+    )
+    def get(self, request, *args, **kwargs):
+        try:
+            free_slot_service = FreeSlotService()
+            free_slots = free_slot_service.get_free_slots(request=request)
+        except booking_exceptions.ReservationTimeError:
+            return Response(
+                data=HTTPErrorMessages.INCORRECT_RESERVATION_TIME,
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(data=free_slots, status=status.HTTP_200_OK)
+
+
+class AvailabilityMatrixView(RetrieveAPIView):
+    permission_classes = (IsAuthenticated,)
+    renderer_classes = (FastJSONRenderer, BrowsableAPIRenderer)
+    serializer_class = booking_serializers.AvailabilityMatrixSerializer
+
+    @extend_schema(parameters=[booking_serializers.AvailabilityMatrixRequestSerializer])
+    def get(self, request, *args, **kwargs):
+        try:
+            matrix_service = AvailabilityMatrixService()
+            matrix = matrix_service.get_matrix(request=request)
+        except booking_exceptions.ReservationTimeError:
+            return Response(
+                data=HTTPErrorMessages.INCORRECT_RESERVATION_TIME,
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except booking_exceptions.AvailabilityMatrixTooLargeError:
+            return Response(
+                data=HTTPErrorMessages.AVAILABILITY_MATRIX_TOO_LARGE,
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(data=matrix, status=status.HTTP_200_OK)
+
+
+class OccupancyView(ListAPIView):
+    permission_classes = (IsAuthenticated,)
+    renderer_classes = (FastJSONRenderer, BrowsableAPIRenderer)
+    serializer_class = booking_serializers.OccupancyRequestSerializer
+
+    @extend_schema(
+        parameters=[booking_serializers.OccupancyRequestSerializer],
+        responses={
+            status.HTTP_200_OK: booking_serializers.RoomOccupancySerializer(many=True),
+        },
+    )
+    def get(self, request, *args, **kwargs):
+        try:
+            occupancy_service = OccupancyService()
+            occupancy = occupancy_service.get_occupancy(request=request)
+        except booking_exceptions.ReservationTimeError:
+            return Response(
+                data=HTTPErrorMessages.INCORRECT_RESERVATION_TIME,
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except booking_exceptions.AnalyticsWindowTooLongError:
+            return Response(
+                data=HTTPErrorMessages.ANALYTICS_WINDOW_TOO_LONG,
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(data=occupancy, status=status.HTTP_200_OK)
 
 
 class ReservationReportView(RetrieveAPIView):
     permission_classes = (IsAuthenticated,)
 
     @extend_schema(
-        parameters=[booking_serializers.ReservReportRequestSerializer],
+        parameters=[
+            booking_serializers.ReservDocxReportRequestSerializer,
+            OpenApiParameter(
+                'export',
+                enum=('csv', 'ndjson'),
+                description='Stream the report rows instead of building a DOCX file',
+            ),
+        ],
+        responses={(status.HTTP_200_OK, DOCX_CONTENT_TYPE): bytes},
     )
     def get(self, request, *args, **kwargs):
         try:
             booking_service = BookingReportService()
-            file_path = booking_service.get_reservations_report(request=request)
+            etag = booking_service.get_report_etag(request=request)
+            if not_modified := get_not_modified_response(request, etag):
+                return not_modified
+            if 'export' in request.query_params:
+                rows, content_type, file_name = booking_service.export_reservations_report(
+                    request=request
+                )
+                response = StreamingHttpResponse(rows, content_type=content_type)
+                response['Content-Disposition'] = f'attachment; filename="{file_name}"'
+                response['ETag'] = etag
+                return response
+            file_path, file_name = booking_service.get_reservations_report(request=request)
         except booking_exceptions.ReservationBusyError:
             return Response(
                 data=HTTPErrorMessages.BOOKING_TIME_IS_BUSY, status=status.HTTP_400_BAD_REQUEST
@@ -81,4 +382,62 @@ class ReservationReportView(RetrieveAPIView):
                 data=HTTPErrorMessages.INCORRECT_RESERVATION_TIME,
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        return Response(data=file_path, status=status.HTTP_200_OK)
+        response = make_report_file_response(file_path, file_name)
+        response['ETag'] = etag
+        return response
+
+
+class ReportJobCreateView(CreateAPIView):
+    permission_classes = (IsAuthenticated,)
+    serializer_class = booking_serializers.ReportJobSerializer
+
+    @extend_schema(
+        request=booking_serializers.ReportJobCreateSerializer,
+        responses={status.HTTP_202_ACCEPTED: booking_serializers.ReportJobSerializer},
+    )
+    def post(self, request: Request, *args, **kwargs):
+        report_job_service = ReportJobService()
+        job, _ = report_job_service.create_job(request=request)
+        return Response(
+            data=booking_serializers.ReportJobSerializer(job).data,
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+
+class ReportJobView(RetrieveAPIView):
+    permission_classes = (IsAuthenticated,)
+    serializer_class = booking_serializers.ReportJobSerializer
+
+    def get(self, request, *args, **kwargs):
+        try:
+            report_job_service = ReportJobService()
+            job = report_job_service.get_job(job_id=kwargs['job_id'])
+        except booking_exceptions.ReportJobNotFoundError:
+            return Response(
+                data=HTTPErrorMessages.REPORT_JOB_NOT_FOUND, status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(
+            data=booking_serializers.ReportJobSerializer(job).data, status=status.HTTP_200_OK
+        )
+
+
+class ReportJobFileView(RetrieveAPIView):
+    permission_classes = (IsAuthenticated,)
+    serializer_class = booking_serializers.ReportJobSerializer
+
+    @extend_schema(responses={(status.HTTP_200_OK, DOCX_CONTENT_TYPE): bytes})
+    def get(self, request, *args, **kwargs):
+        try:
+            report_job_service = ReportJobService()
+            file_path, file_name = report_job_service.get_job_file(job_id=kwargs['job_id'])
+        except booking_exceptions.ReportJobNotFoundError:
+            return Response(
+                data=HTTPErrorMessages.REPORT_JOB_NOT_FOUND, status=status.HTTP_404_NOT_FOUND
+            )
+        except booking_exceptions.ReportNotReadyError:
+            return Response(
+                data=HTTPErrorMessages.REPORT_NOT_READY, status=status.HTTP_409_CONFLICT
+            )
+        except booking_exceptions.ReportExpiredError:
+            return Response(data=HTTPErrorMessages.REPORT_EXPIRED, status=status.HTTP_410_GONE)
+        return make_report_file_response(file_path, file_name)
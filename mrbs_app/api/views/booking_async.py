@@ -0,0 +1,106 @@
+# Native async variants of the read-only booking endpoints and the reservation event stream.
+# DRF views are synchronous, so these are plain Django async views that reuse the DRF
+# serializers and renderer.
+import functools
+
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework import status
+from rest_framework.exceptions import NotAuthenticated, ValidationError
+
+import mrbs_app.api.exceptions as booking_exceptions
+import mrbs_app.serializers.booking as booking_serializers
+from mrbs_app.api.authentication import aauthenticate
+from mrbs_app.api.error_messages import HTTPErrorMessages
+from mrbs_app.api.renderers import FastJSONRenderer
+from mrbs_app.api.views.booking import make_next_page_headers
+from mrbs_app.services.booking import BookingService
+from mrbs_app.services.events import reservation_events
+from mrbs_app.services.report_jobs import ReportJobService
+
+
+def _json_response(data, status_code: int = status.HTTP_200_OK, headers: dict = None):
+    return HttpResponse(
+        FastJSONRenderer().render(data),
+        content_type=FastJSONRenderer.media_type,
+        status=status_code,
+        headers=headers,
+    )
+
+
+def _authenticated(view):
+    @functools.wraps(view)
+    async def _wrapper(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        user = await aauthenticate(request)
+        if user is None:
+            return _json_response(
+                {'detail': NotAuthenticated.default_detail}, status.HTTP_401_UNAUTHORIZED
+            )
+        request.user = user
+        try:
+            return await view(request, *args, **kwargs)
+        except ValidationError as exc:
+            return _json_response(exc.detail, status.HTTP_400_BAD_REQUEST)
+
+    return _wrapper
+
+
+@require_GET
+@_authenticated
+async def reservation_list(request: HttpRequest) -> HttpResponse:
+    try:
+        booking_service = BookingService()
+        reservations, next_cursor = await booking_service.aget_reservations_page(
+            query_params=request.GET.dict()
+        )
+    except booking_exceptions.ReservationTimeError:
+        return _json_response(
+            HTTPErrorMessages.INCORRECT_RESERVATION_TIME, status.HTTP_400_BAD_REQUEST
+        )
+    return _json_response(
+        reservations, headers=make_next_page_headers(request.build_absolute_uri(), next_cursor)
+    )
+
+
+@require_GET
+@_authenticated
+async def availability(request: HttpRequest) -> HttpResponse:
+    try:
+        booking_service = BookingService()
+        result = await booking_service.acheck_availability(query_params=request.GET.dict())
+    except booking_exceptions.ReservationTimeError:
+        return _json_response(
+            HTTPErrorMessages.INCORRECT_RESERVATION_TIME, status.HTTP_400_BAD_REQUEST
+        )
+    return _json_response(result)
+
+
+@require_GET
+@_authenticated
+async def report_job(request: HttpRequest, job_id: int) -> HttpResponse:
+    try:
+        job = await ReportJobService.aget_job(job_id=job_id)
+    except booking_exceptions.ReportJobNotFoundError:
+        return _json_response(HTTPErrorMessages.REPORT_JOB_NOT_FOUND, status.HTTP_404_NOT_FOUND)
+    return _json_response(booking_serializers.ReportJobSerializer(job).data)
+
+
+@require_GET
+@_authenticated
+async def events(request: HttpRequest) -> StreamingHttpResponse:
+    query_params = request.GET.copy()
+    if 'Last-Event-ID' in request.headers:
+        query_params['last_event_id'] = request.headers['Last-Event-ID']
+    events_serializer = booking_serializers.ReservationEventsRequestSerializer(data=query_params)
+    events_serializer.is_valid(raise_exception=True)
+    data = events_serializer.validated_data
+    response = StreamingHttpResponse(
+        reservation_events.stream(
+            room_ids=data['room_id'], last_event_id=data.get('last_event_id')
+        ),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    # Keeps nginx from buffering the stream.
+    response['X-Accel-Buffering'] = 'no'
+    return response
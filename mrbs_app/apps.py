@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class MrbsAppConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "mrbs_app"
+
+    def ready(self):
+        import mrbs_app.signals  # noqa: F401 pylint: disable=import-outside-toplevel,unused-import
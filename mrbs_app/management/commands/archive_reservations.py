@@ -0,0 +1,25 @@
+from datetime import timedelta
+
+from core.settings import RESERVATION_ARCHIVE_CHUNK_SIZE
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from mrbs_app.services.archive import ReservationArchiveService
+
+
+class Command(BaseCommand):
+    help = 'Moves reservations that ended more than --older-than days ago to the archive table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, required=True, help='Days')
+        parser.add_argument('--chunk-size', type=int, default=RESERVATION_ARCHIVE_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        older_than = timezone.now() - timedelta(days=options['older_than'])
+        archived = 0
+        for rows in ReservationArchiveService().archive_reservations(
+            older_than=older_than, chunk_size=options['chunk_size']
+        ):
+            archived += rows
+            self.stdout.write(f'{archived} reservations archived')
+        self.stdout.write(f'Done: {archived} reservations ended before {older_than} archived')
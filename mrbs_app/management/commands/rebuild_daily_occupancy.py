@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from mrbs_app.services.daily_occupancy import rebuild_daily_occupancy
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the per room daily occupancy rollup from the reservations table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-days', type=int, default=31, help='Days recomputed per transaction'
+        )
+
+    def handle(self, *args, **options):
+        for window_from, window_to, rows in rebuild_daily_occupancy(options['chunk_days']):
+            self.stdout.write(f'{window_from} - {window_to}: {rows} rows')
@@ -0,0 +1,20 @@
+from core.settings import REPORT_WORKER_CONCURRENCY, REPORT_WORKER_POLL_INTERVAL
+from django.core.management.base import BaseCommand
+
+from mrbs_app.services.report_jobs import ReportJobService
+
+
+class Command(BaseCommand):
+    help = 'Runs queued report jobs in a bounded thread pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=REPORT_WORKER_CONCURRENCY)
+        parser.add_argument('--poll-interval', type=float, default=REPORT_WORKER_POLL_INTERVAL)
+        parser.add_argument('--once', action='store_true', help='Exit when the queue is empty')
+
+    def handle(self, *args, **options):
+        ReportJobService().run_worker(
+            concurrency=options['concurrency'],
+            poll_interval=options['poll_interval'],
+            once=options['once'],
+        )
@@ -0,0 +1,46 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from mrbs_app.services.daily_occupancy import rebuild_daily_occupancy
+from mrbs_app.services.seeding import BookingSeedService
+
+
+class Command(BaseCommand):
+    help = 'Fills the database with realistic, non-overlapping bookings for benchmarks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rooms', type=int, default=100)
+        parser.add_argument('--reservations', type=int, default=100_000)
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument(
+            '--days-back', type=int, default=365, help='Bookings start this many days ago'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--skip-rollup', action='store_true', help='Do not rebuild the daily occupancy'
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        start = (now - timedelta(days=options['days_back'])).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        started = time.perf_counter()
+        created = BookingSeedService(seed=options['seed']).seed_bookings(
+            rooms=options['rooms'],
+            reservations=options['reservations'],
+            users=options['users'],
+            start=start,
+            now=now,
+        )
+        self.stdout.write(
+            f'{created} reservations in {options["rooms"]} rooms created '
+            f'in {time.perf_counter() - started:.1f} s'
+        )
+        if not options['skip_rollup']:
+            for _ in rebuild_daily_occupancy(chunk_days=31):
+                pass
+            self.stdout.write('Daily occupancy rebuilt')
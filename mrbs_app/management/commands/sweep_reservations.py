@@ -0,0 +1,23 @@
+from core.settings import RESERVATION_SWEEP_CHUNK_SIZE, RESERVATION_SWEEP_INTERVAL
+from django.core.management.base import BaseCommand
+
+from mrbs_app.services.sweeper import ReservationSweepService
+
+
+class Command(BaseCommand):
+    help = 'Moves ended reservations to COMPLETED, once or every --interval seconds'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=RESERVATION_SWEEP_CHUNK_SIZE)
+        parser.add_argument('--interval', type=float, default=RESERVATION_SWEEP_INTERVAL)
+        parser.add_argument('--loop', action='store_true', help='Keep sweeping every --interval')
+
+    def handle(self, *args, **options):
+        sweep_service = ReservationSweepService()
+        if options['loop']:
+            sweep_service.run_sweeper(
+                interval=options['interval'], chunk_size=options['chunk_size']
+            )
+            return
+        completed = sweep_service.complete_ended_reservations(chunk_size=options['chunk_size'])
+        self.stdout.write(f'{completed} reservations completed')
@@ -0,0 +1,123 @@
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from core.settings import REQUEST_QUERY_BUDGET
+from django.http import HttpRequest, HttpResponse
+
+from mrbs_app.services.metrics import request_duration, request_queries, request_sql_duration
+
+logger = logging.getLogger(__name__)
+
+
+class _QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+
+_request_query_stats: ContextVar[_QueryStats | None] = ContextVar(
+    'request_query_stats', default=None
+)
+
+
+def count_request_queries(execute, sql, params, many, context):
+    # Installed on every database connection (mrbs_app.signals). The stats of the request come
+    # from the context, which threads running the ORM for async code (sync_to_async) inherit,
+    # so queries are counted whichever thread and connection run them.
+    stats = _request_query_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.count += 1
+        stats.duration += time.perf_counter() - started
+
+
+@contextmanager
+def _counting_queries(stats: _QueryStats):
+    # Restores the previous value rather than resetting a token: a streamed response may be
+    # closed in another context than the one it was iterated in.
+    previous = _request_query_stats.get()
+    _request_query_stats.set(stats)
+    try:
+        yield
+    finally:
+        _request_query_stats.set(previous)
+
+
+class RequestMetricsMiddleware:
+    # Records request duration, SQL query count and SQL time of every request. Streamed
+    # responses are measured until their content has been sent, since their queries run
+    # while the content is iterated; async streams (event streams) and files until they start:
+    # wrapping a FileResponse would keep the server from sending the file itself
+    # (wsgi.file_wrapper). Async capable, so requests to async views under ASGI are not
+    # routed through a thread.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if iscoroutinefunction(self):
+            return self._acall(request)
+        stats = _QueryStats()
+        started = time.perf_counter()
+        with _counting_queries(stats):
+            response = self.get_response(request)
+        return self._finish(request, response, stats, started)
+
+    async def _acall(self, request: HttpRequest) -> HttpResponse:
+        stats = _QueryStats()
+        started = time.perf_counter()
+        with _counting_queries(stats):
+            response = await self.get_response(request)
+        return self._finish(request, response, stats, started)
+
+    def _finish(
+        self, request: HttpRequest, response: HttpResponse, stats: _QueryStats, started: float
+    ) -> HttpResponse:
+        if (
+            response.streaming
+            and not response.is_async
+            and getattr(response, 'file_to_stream', None) is None
+        ):
+            response.streaming_content = self._stream(
+                response.streaming_content, request, response, stats, started
+            )
+        else:
+            self._record(request, response, stats, started)
+        return response
+
+    def _stream(self, content, request, response, stats: _QueryStats, started: float):
+        try:
+            with _counting_queries(stats):
+                yield from content
+        finally:
+            self._record(request, response, stats, started)
+
+    @staticmethod
+    def _record(request: HttpRequest, response: HttpResponse, stats: _QueryStats, started: float):
+        match = request.resolver_match
+        view = match.view_name if match else 'unmatched'
+        request_duration.observe(
+            time.perf_counter() - started, request.method, view, str(response.status_code)
+        )
+        request_queries.observe(stats.count, request.method, view)
+        request_sql_duration.observe(stats.duration, request.method, view)
+        if REQUEST_QUERY_BUDGET is not None and stats.count > REQUEST_QUERY_BUDGET:
+            logger.warning(
+                '%s %s ran %d SQL queries (budget %d) taking %.1f ms',
+                request.method,
+                request.get_full_path(),
+                stats.count,
+                REQUEST_QUERY_BUDGET,
+                stats.duration * 1e3,
+            )
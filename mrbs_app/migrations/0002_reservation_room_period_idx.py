@@ -0,0 +1,21 @@
+# Generated by Django 5.0.2 on 2026-10-18 07:39
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("mrbs_app", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="reservation",
+            index=models.Index(
+                fields=["room", "status", "reserved_from", "reserved_to"],
+                name="reservation_room_period_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.2 on 2026-10-18 07:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("mrbs_app", "0003_reservation_series"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="room",
+            name="capacity",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.0.2 on 2026-10-18 08:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("mrbs_app", "0005_report_job"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RoomDailyOccupancy",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("date", models.DateField()),
+                ("booked_minutes", models.PositiveIntegerField(default=0)),
+                ("reservation_count", models.PositiveIntegerField(default=0)),
+                ("peak_concurrency", models.PositiveIntegerField(default=0)),
+                (
+                    "room",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="mrbs_app.room"
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="roomdailyoccupancy",
+            constraint=models.UniqueConstraint(
+                fields=("room", "date"), name="room_daily_occupancy_unique"
+            ),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.2 on 2026-10-18 08:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("mrbs_app", "0006_room_daily_occupancy"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="reservation",
+            name="reservation_room_period_idx",
+        ),
+        migrations.AddIndex(
+            model_name="reservation",
+            index=models.Index(
+                condition=models.Q(("status", "active")),
+                fields=["room", "reserved_from", "reserved_to"],
+                name="reservation_active_period_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="reservation",
+            index=models.Index(
+                condition=models.Q(("status", "active")),
+                fields=["reserved_to"],
+                name="reservation_active_end_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.0.2 on 2026-10-18 08:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("mrbs_app", "0008_reservation_archive"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReservationChange",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("reservation_id", models.BigIntegerField()),
+                ("room_id", models.BigIntegerField()),
+                ("changed_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["room_id", "id"], name="reservation_change_room_idx"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.2 on 2026-10-18 09:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("mrbs_app", "0009_reservation_change"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReservationDataVersion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("room_id", models.BigIntegerField()),
+                ("date", models.DateField()),
+                ("version", models.BigIntegerField()),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="reservationdataversion",
+            constraint=models.UniqueConstraint(
+                fields=("room_id", "date"), name="reservation_data_version_unique"
+            ),
+        ),
+    ]
@@ -1,4 +1,8 @@
+from datetime import datetime, timedelta
+
+from core.settings import RESERVATION_MAX_DAYS
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
@@ -14,6 +18,29 @@ class TimeStampedIDMixin(models.Model):
 class Room(TimeStampedIDMixin):
     number = models.IntegerField(blank=False, null=False)
     name = models.CharField(max_length=32, blank=False, null=False)
+    capacity = models.PositiveIntegerField(default=0)
+
+
+class ReservationSeries(TimeStampedIDMixin):
+    class Frequency(models.TextChoices):
+        DAILY = 'daily', _('Daily')
+        WEEKLY = 'weekly', _('Weekly')
+
+    class SeriesStatus(models.TextChoices):
+        ACTIVE = 'active', _('Active')
+        CANCELLED = 'cancelled', _('Cancelled')
+
+    purpose_of_booking = models.CharField(max_length=256)
+    reserved_from = models.DateTimeField()
+    reserved_to = models.DateTimeField()
+    frequency = models.CharField(max_length=16, choices=Frequency.choices)
+    interval = models.PositiveSmallIntegerField(default=1)
+    weekdays = models.JSONField(default=list, blank=True)
+    until = models.DateTimeField()
+    excluded_dates = models.JSONField(default=list, blank=True)
+    user = models.ForeignKey(get_user_model(), on_delete=models.CASCADE)
+    room = models.ForeignKey(Room, on_delete=models.CASCADE)
+    status = models.CharField(max_length=32, choices=SeriesStatus.choices)
 
 
 class Reservation(TimeStampedIDMixin):
@@ -28,3 +55,154 @@ class Reservation(TimeStampedIDMixin):
     user = models.ForeignKey(get_user_model(), on_delete=models.CASCADE)
     room = models.ForeignKey(Room, on_delete=models.CASCADE)
     status = models.CharField(max_length=32, choices=ReservationStatus.choices)
+    series = models.ForeignKey(
+        ReservationSeries,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='reservations',
+    )
+
+    class Meta:
+        # Partial indexes over active reservations only: past bookings are moved to COMPLETED
+        # by `manage.py sweep_reservations`, so the overlap checks of the booking hot path and
+        # the sweeper itself scan current and future bookings only.
+        indexes = [
+            models.Index(
+                fields=['room', 'reserved_from', 'reserved_to'],
+                condition=models.Q(status='active'),
+                name='reservation_active_period_idx',
+            ),
+            models.Index(
+                fields=['reserved_to'],
+                condition=models.Q(status='active'),
+                name='reservation_active_end_idx',
+            ),
+        ]
+
+    def clean(self):
+        # The admin is held to the limit of the API.
+        if (
+            self.reserved_from
+            and self.reserved_to
+            and self.reserved_to - self.reserved_from > timedelta(days=RESERVATION_MAX_DAYS)
+        ):
+            raise ValidationError(
+                _('A reservation cannot be longer than %(days)s days'),
+                params={'days': RESERVATION_MAX_DAYS},
+            )
+
+    def get_changed_ranges(self) -> list[tuple[int, datetime, datetime]]:
+        # The room and period written and, for a reservation moved by save(), the ones it was
+        # moved away from (remembered by a pre_save receiver in mrbs_app.signals).
+        ranges = [(self.room_id, self.reserved_from, self.reserved_to)]
+        previous_range = getattr(self, '_previous_range', None)
+        if previous_range and previous_range != ranges[0]:
+            ranges.append(previous_range)
+        return ranges
+
+
+class ReservationArchive(models.Model):
+    # Reservations moved out of the live table by `manage.py archive_reservations`. Rows keep
+    # their ids and timestamps.
+    id = models.BigIntegerField(primary_key=True)
+    purpose_of_booking = models.CharField(max_length=256)
+    reserved_from = models.DateTimeField()
+    reserved_to = models.DateTimeField()
+    user = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name='+')
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name='+')
+    status = models.CharField(max_length=32, choices=Reservation.ReservationStatus.choices)
+    series = models.ForeignKey(
+        ReservationSeries, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['reserved_to'], name='reservation_archive_end_idx'),
+        ]
+
+
+class ReportJob(TimeStampedIDMixin):
+    class JobStatus(models.TextChoices):
+        PENDING = 'pending', _('Pending')
+        RUNNING = 'running', _('Running')
+        DONE = 'done', _('Done')
+        FAILED = 'failed', _('Failed')
+
+    IN_FLIGHT_STATUSES = (JobStatus.PENDING, JobStatus.RUNNING)
+
+    params_key = models.CharField(max_length=64)
+    reserved_from = models.DateTimeField()
+    reserved_to = models.DateTimeField()
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, null=True, blank=True)
+    user = models.ForeignKey(get_user_model(), on_delete=models.CASCADE)
+    status = models.CharField(max_length=32, choices=JobStatus.choices)
+    file_path = models.CharField(max_length=512, blank=True)
+    error = models.TextField(blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            # At most one pending or running job per set of report parameters.
+            models.UniqueConstraint(
+                fields=['params_key'],
+                condition=models.Q(status__in=['pending', 'running']),
+                name='report_job_in_flight_unique',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'id'], name='report_job_status_idx'),
+        ]
+
+
+class RoomDailyOccupancy(TimeStampedIDMixin):
+    # Per room and UTC day rollup of non-cancelled reservations, kept up to date by
+    # mrbs_app.services.daily_occupancy.
+    room = models.ForeignKey(Room, on_delete=models.CASCADE)
+    date = models.DateField()
+    booked_minutes = models.PositiveIntegerField(default=0)
+    reservation_count = models.PositiveIntegerField(default=0)
+    peak_concurrency = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['room', 'date'], name='room_daily_occupancy_unique'),
+        ]
+
+
+class ReservationChange(models.Model):
+    # Append-only log behind GET /booking/changes, written in the transaction of the change
+    # for every reservation passed to send_reservations_changed(). SQLite allocates ids under
+    # its single writer lock, held until the commit, so they grow in commit order and serve as
+    # the feed cursor. No foreign keys: entries of deleted reservations must stay.
+    reservation_id = models.BigIntegerField()
+    room_id = models.BigIntegerField()
+    changed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['room_id', 'id'], name='reservation_change_room_idx'),
+        ]
+
+
+class ReservationDataVersion(models.Model):
+    # Data version of a room and UTC day, behind the keys of cached reports and the ETags of
+    # reservation lists (mrbs_app.services.report_cache): the id of the latest change log entry
+    # of a reservation of the room that overlaps the day. Written in the transaction of the
+    # change, so every process sees it as soon as the change commits. Rows with room_id 0 hold
+    # the versions of all rooms, rows dated 0001-01-01 those of reservations too long to be
+    # versioned per day, which cover every window.
+    room_id = models.BigIntegerField()
+    date = models.DateField()
+    version = models.BigIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['room_id', 'date'], name='reservation_data_version_unique'
+            ),
+        ]
@@ -1,6 +1,10 @@
+from datetime import datetime, timedelta
+
+from core.settings import RESERVATION_MAX_DAYS, RESERVATIONS_MAX_PAGE_SIZE, RESERVATIONS_PAGE_SIZE
 from rest_framework import serializers
 
-from mrbs_app.models import Reservation
+from mrbs_app.models import ReportJob, Reservation, ReservationSeries, Room
+from mrbs_app.services.pagination import decode_change_cursor, decode_cursor
 
 
 class BookingBaseSerializer(serializers.Serializer):
@@ -11,12 +15,53 @@ class BookingBaseSerializer(serializers.Serializer):
         pass
 
 
+class FromToSerializerMixin:
+    # `from` is a Python keyword, so the period fields cannot be declared in the class body.
+    def get_fields(self):
+        fields = super().get_fields()
+        fields['from'] = serializers.DateTimeField()
+        fields['to'] = serializers.DateTimeField()
+        return fields
+
+
 class ReservationCreateSerializer(BookingBaseSerializer):
     reserved_from = serializers.DateTimeField()
     reserved_to = serializers.DateTimeField()
     room_id = serializers.IntegerField()
     purpose_of_booking = serializers.CharField(max_length=256)
 
+    def validate(self, attrs):
+        if attrs['reserved_to'] - attrs['reserved_from'] > timedelta(days=RESERVATION_MAX_DAYS):
+            raise serializers.ValidationError(
+                f'A reservation cannot be longer than {RESERVATION_MAX_DAYS} days'
+            )
+        return attrs
+
+
+class ReservationBulkResultSerializer(BookingBaseSerializer):
+    index = serializers.IntegerField()
+    created = serializers.BooleanField()
+    id = serializers.IntegerField(required=False)
+    error = serializers.ListField(child=serializers.CharField(), required=False)
+
+
+class ReservationSeriesCreateSerializer(ReservationCreateSerializer):
+    frequency = serializers.ChoiceField(choices=ReservationSeries.Frequency.choices)
+    interval = serializers.IntegerField(min_value=1, default=1)
+    weekdays = serializers.ListField(
+        child=serializers.IntegerField(min_value=0, max_value=6), default=list
+    )
+    until = serializers.DateTimeField()
+
+
+class ReservationSeriesSkipSerializer(BookingBaseSerializer):
+    date = serializers.DateField()
+
+
+class ReservationSeriesResponseSerializer(BookingBaseSerializer):
+    id = serializers.IntegerField()
+    occurrences = serializers.IntegerField()
+
 
 class ReservationsRequestSerializer(BookingBaseSerializer):
     reserved_from = serializers.DateTimeField()
@@ -24,11 +69,160 @@ class ReservationsRequestSerializer(BookingBaseSerializer):
     room_id = serializers.IntegerField()
 
 
+class ReservationsPageRequestSerializer(ReservationsRequestSerializer):
+    cursor = serializers.CharField(required=False)
+    limit = serializers.IntegerField(
+        min_value=1, max_value=RESERVATIONS_MAX_PAGE_SIZE, default=RESERVATIONS_PAGE_SIZE
+    )
+
+    @staticmethod
+    def validate_cursor(value: str) -> tuple[datetime, int]:
+        try:
+            return decode_cursor(value)
+        except ValueError as exc:
+            raise serializers.ValidationError('Invalid cursor') from exc
+
+
+class ReservationChangesRequestSerializer(BookingBaseSerializer):
+    cursor = serializers.CharField(
+        required=False, help_text='next_cursor of the previous response, omit to start from now'
+    )
+    room_id = serializers.IntegerField(required=False)
+    limit = serializers.IntegerField(
+        min_value=1, max_value=RESERVATIONS_MAX_PAGE_SIZE, default=RESERVATIONS_PAGE_SIZE
+    )
+
+    @staticmethod
+    def validate_cursor(value: str) -> int:
+        try:
+            return decode_change_cursor(value)
+        except ValueError as exc:
+            raise serializers.ValidationError('Invalid cursor') from exc
+
+
+class ReservationEventsRequestSerializer(BookingBaseSerializer):
+    room_id = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+    last_event_id = serializers.IntegerField(
+        min_value=0, required=False, help_text='Alternative to the Last-Event-ID header'
+    )
+
+
+class AvailabilityResponseSerializer(BookingBaseSerializer):
+    room_id = serializers.IntegerField()
+    available = serializers.BooleanField()
+
+
 class ReservReportRequestSerializer(ReservationsRequestSerializer):
     room_id = serializers.IntegerField(required=False)
 
 
+class ReportJobCreateSerializer(ReservReportRequestSerializer):
+    @staticmethod
+    def validate_room_id(value: int) -> int:
+        # Stored as a foreign key, unlike the room filter of a report built at once.
+        if not Room.objects.filter(pk=value).exists():
+            raise serializers.ValidationError('Room does not exist')
+        return value
+
+
+class ReservDocxReportRequestSerializer(ReservReportRequestSerializer):
+    split_by_room = serializers.BooleanField(
+        default=False, help_text='A section with its own table for every room'
+    )
+
+
+class ReservExportRequestSerializer(ReservReportRequestSerializer):
+    export = serializers.ChoiceField(choices=('csv', 'ndjson'))
+
+
 class ReservationsResponseSerializer(serializers.ModelSerializer):
     class Meta:
         model = Reservation
         fields = '__all__'
+
+
+class ReservationChangesSerializer(BookingBaseSerializer):
+    reservations = ReservationsResponseSerializer(many=True, help_text='Current state')
+    deleted = serializers.ListField(child=serializers.IntegerField())
+    next_cursor = serializers.CharField()
+    has_more = serializers.BooleanField()
+
+
+class FreeSlotsRequestSerializer(FromToSerializerMixin, BookingBaseSerializer):
+    duration = serializers.IntegerField(min_value=1, help_text='Minutes')
+    min_capacity = serializers.IntegerField(min_value=0, required=False)
+
+
+class FreeSlotSerializer(FromToSerializerMixin, BookingBaseSerializer):
+    pass
+
+
+class RoomFreeSlotsSerializer(BookingBaseSerializer):
+    room_id = serializers.IntegerField()
+    number = serializers.IntegerField()
+    name = serializers.CharField()
+    capacity = serializers.IntegerField()
+    slots = FreeSlotSerializer(many=True)
+
+
+class AvailabilityMatrixRequestSerializer(FromToSerializerMixin, BookingBaseSerializer):
+    # At most five digits: a longer number may overflow timedelta.
+    slot = serializers.RegexField(
+        r'^[1-9][0-9]{0,4}[mh]$', default='15m', help_text='Slot length, e.g. 15m or 1h'
+    )
+    encoding = serializers.ChoiceField(choices=('rle', 'bitmap'), default='rle')
+
+    @staticmethod
+    def validate_slot(value: str) -> timedelta:
+        if value.endswith('h'):
+            return timedelta(hours=int(value[:-1]))
+        return timedelta(minutes=int(value[:-1]))
+
+
+class RoomAvailabilityRowSerializer(BookingBaseSerializer):
+    room_id = serializers.IntegerField()
+    number = serializers.IntegerField()
+    name = serializers.CharField()
+    capacity = serializers.IntegerField()
+    busy = serializers.JSONField(
+        help_text='Busy slots: run lengths starting with free slots (rle) or base64 of a bitmap '
+        'where slot i is bit i % 8 of byte i // 8 (bitmap)'
+    )
+
+
+class AvailabilityMatrixSerializer(FromToSerializerMixin, BookingBaseSerializer):
+    slot_minutes = serializers.IntegerField()
+    slots = serializers.IntegerField()
+    encoding = serializers.CharField()
+    all_busy = serializers.JSONField(help_text='Slots in which every room is busy')
+    rooms = RoomAvailabilityRowSerializer(many=True)
+
+
+class ReportJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ReportJob
+        fields = (
+            'id',
+            'status',
+            'reserved_from',
+            'reserved_to',
+            'room',
+            'error',
+            'created_at',
+            'started_at',
+            'finished_at',
+        )
+
+
+class OccupancyRequestSerializer(FromToSerializerMixin, BookingBaseSerializer):
+    granularity = serializers.ChoiceField(choices=('hour', 'day'), default='hour')
+
+
+class OccupancyBucketSerializer(FromToSerializerMixin, BookingBaseSerializer):
+    occupied_minutes = serializers.FloatField()
+    utilization = serializers.FloatField()
+
+
+class RoomOccupancySerializer(BookingBaseSerializer):
+    room_id = serializers.IntegerField()
+    buckets = OccupancyBucketSerializer(many=True)
@@ -0,0 +1,174 @@
+from array import array
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import datetime, time, timedelta, timezone
+from itertools import accumulate, groupby, pairwise, repeat
+from operator import itemgetter, sub
+from typing import Sequence
+
+from core.settings import ANALYTICS_MAX_BUCKETS
+from rest_framework.request import Request
+
+import mrbs_app.api.exceptions as booking_exceptions
+import mrbs_app.serializers.booking as booking_serializers
+from mrbs_app.models import Reservation, Room, RoomDailyOccupancy
+from mrbs_app.services.booking import BookingService
+
+GRANULARITY_SECONDS = {'hour': 3600, 'day': 86400}
+
+
+def make_bucket_boundaries(
+    window_from: datetime, window_to: datetime, granularity: str
+) -> list[datetime]:
+    # Buckets are aligned to whole hours or days (UTC); the first and the last one are cut
+    # to the requested window.
+    size = GRANULARITY_SECONDS[granularity]
+    first = datetime.fromtimestamp(window_from.timestamp() // size * size, tz=timezone.utc)
+    boundaries = [window_from]
+    boundary = first + timedelta(seconds=size)
+    while boundary < window_to:
+        boundaries.append(boundary)
+        boundary += timedelta(seconds=size)
+    boundaries.append(window_to)
+    return boundaries
+
+
+def compute_booked_seconds(
+    starts: Sequence[float], ends: Sequence[float], boundaries: Sequence[float]
+) -> list[float]:
+    # Time booked before t is the sum of clamp(t - start, 0, end - start) over reservations:
+    # ramps rising at the starts minus ramps rising at the ends. With sorted starts and ends
+    # and their prefix sums it takes two bisects per boundary, whatever the number of
+    # reservations in a bucket. Both sequences must be sorted.
+    start_sums = array('d', accumulate(starts, initial=0.0))
+    end_sums = array('d', accumulate(ends, initial=0.0))
+    booked_before = []
+    for boundary in boundaries:
+        started = bisect_right(starts, boundary)
+        ended = bisect_right(ends, boundary)
+        booked_before.append(
+            started * boundary - start_sums[started] - (ended * boundary - end_sums[ended])
+        )
+    return [later - earlier for earlier, later in pairwise(booked_before)]
+
+
+def _utc_date(value: datetime):
+    return value.astimezone(timezone.utc).date()
+
+
+def _is_day_start(value: datetime) -> bool:
+    return value.astimezone(timezone.utc).time() == time.min
+
+
+class OccupancyService(BookingService):
+    @staticmethod
+    def compute_occupancy(
+        window_from: datetime, window_to: datetime, granularity: str
+    ) -> list[dict]:
+        boundaries = make_bucket_boundaries(window_from, window_to, granularity)
+        origin = window_from.timestamp()
+        window = window_to.timestamp() - origin
+        offsets = array('d', [boundary.timestamp() - origin for boundary in boundaries])
+        bucket_seconds = [later - earlier for earlier, later in pairwise(offsets)]
+
+        rows = (
+            Reservation.objects.filter(reserved_from__lt=window_to, reserved_to__gt=window_from)
+            .exclude(status=Reservation.ReservationStatus.CANCELLED)
+            .order_by('room_id', 'reserved_from')
+            .values_list('room_id', 'reserved_from', 'reserved_to')
+        )
+        booked_by_room = {}
+        for room_id, room_rows in groupby(rows, key=itemgetter(0)):
+            _, reserved_from, reserved_to = zip(*room_rows)
+            # Seconds from the window start, clipped to the window.
+            starts = array(
+                'd',
+                map(
+                    max,
+                    map(sub, map(datetime.timestamp, reserved_from), repeat(origin)),
+                    repeat(0.0),
+                ),
+            )
+            ends = sorted(
+                map(
+                    min,
+                    map(sub, map(datetime.timestamp, reserved_to), repeat(origin)),
+                    repeat(window),
+                )
+            )
+            booked_by_room[room_id] = compute_booked_seconds(starts, ends, offsets)
+
+        occupancy = []
+        for room_id in Room.objects.order_by('id').values_list('id', flat=True):
+            booked = booked_by_room.get(room_id) or [0.0] * len(bucket_seconds)
+            occupancy.append(
+                {
+                    'room_id': room_id,
+                    'buckets': [
+                        {
+                            'from': bucket_from,
+                            'to': bucket_to,
+                            'occupied_minutes': round(booked_seconds / 60, 2),
+                            'utilization': round(booked_seconds / seconds, 4),
+                        }
+                        for bucket_from, bucket_to, booked_seconds, seconds in zip(
+                            boundaries, boundaries[1:], booked, bucket_seconds
+                        )
+                    ],
+                }
+            )
+        return occupancy
+
+    @staticmethod
+    def read_daily_occupancy(window_from: datetime, window_to: datetime) -> list[dict]:
+        # Whole UTC days are read from the daily occupancy rollup, a row per room and day,
+        # which also counts archived reservations.
+        boundaries = make_bucket_boundaries(window_from, window_to, 'day')
+        booked_by_room = defaultdict(dict)
+        for room_id, day, booked_minutes in RoomDailyOccupancy.objects.filter(
+            date__gte=_utc_date(window_from), date__lt=_utc_date(window_to)
+        ).values_list('room_id', 'date', 'booked_minutes'):
+            booked_by_room[room_id][day] = booked_minutes
+
+        occupancy = []
+        for room_id in Room.objects.order_by('id').values_list('id', flat=True):
+            booked = booked_by_room.get(room_id, {})
+            occupancy.append(
+                {
+                    'room_id': room_id,
+                    'buckets': [
+                        {
+                            'from': bucket_from,
+                            'to': bucket_to,
+                            'occupied_minutes': float(minutes),
+                            'utilization': round(minutes * 60 / GRANULARITY_SECONDS['day'], 4),
+                        }
+                        for bucket_from, bucket_to, minutes in zip(
+                            boundaries,
+                            boundaries[1:],
+                            [booked.get(_utc_date(day), 0) for day in boundaries[:-1]],
+                        )
+                    ],
+                }
+            )
+        return occupancy
+
+    def get_occupancy(self, request: Request) -> list[dict]:
+        occupancy_serializer = booking_serializers.OccupancyRequestSerializer(
+            data=request.query_params.dict()
+        )
+        occupancy_serializer.is_valid(raise_exception=True)
+        data = occupancy_serializer.validated_data
+        self._check_reserved_time(reserved_from=data['from'], reserved_to=data['to'])
+        window = (data['to'] - data['from']).total_seconds()
+        if window > ANALYTICS_MAX_BUCKETS * GRANULARITY_SECONDS[data['granularity']]:
+            raise booking_exceptions.AnalyticsWindowTooLongError
+        if (
+            data['granularity'] == 'day'
+            and _is_day_start(data['from'])
+            and _is_day_start(data['to'])
+        ):
+            return self.read_daily_occupancy(window_from=data['from'], window_to=data['to'])
+        return self.compute_occupancy(
+            window_from=data['from'], window_to=data['to'], granularity=data['granularity']
+        )
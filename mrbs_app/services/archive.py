@@ -0,0 +1,66 @@
+from datetime import datetime
+from typing import Iterator
+
+from core.settings import RESERVATION_ARCHIVE_CHUNK_SIZE
+from django.db import connection, transaction
+
+from mrbs_app.models import Reservation, ReservationArchive
+from mrbs_app.services.locks import run_with_retries
+from mrbs_app.signals import send_reservations_changed
+
+ARCHIVED_FIELDS = (
+    'id',
+    'purpose_of_booking',
+    'reserved_from',
+    'reserved_to',
+    'user_id',
+    'room_id',
+    'status',
+    'series_id',
+    'created_at',
+    'updated_at',
+)
+
+
+class ReservationArchiveService:
+    @staticmethod
+    def _archive_chunk(older_than: datetime, after_id: int, chunk_size: int) -> list[dict]:
+        with transaction.atomic():
+            rows = list(
+                Reservation.objects.filter(id__gt=after_id, reserved_to__lt=older_than)
+                .order_by('id')
+                .values(*ARCHIVED_FIELDS)[:chunk_size]
+            )
+            if not rows:
+                return rows
+            ReservationArchive.objects.bulk_create(
+                [ReservationArchive(**row) for row in rows], ignore_conflicts=True
+            )
+            # Archived rows stay in reports and in the daily rollup, which read both tables,
+            # so the delete goes without the per-row signals of QuerySet.delete(). Nothing
+            # references reservations, so there is nothing to cascade.
+            table = connection.ops.quote_name(Reservation._meta.db_table)
+            placeholders = ', '.join(['%s'] * len(rows))
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'DELETE FROM {table} WHERE id IN ({placeholders})', [row['id'] for row in rows]
+                )
+            # They leave the reservation lists though: the change log entries and data
+            # versions commit with the chunk, and the changes feed returns them archived.
+            send_reservations_changed(
+                sender=Reservation, reservations=[Reservation(**row) for row in rows]
+            )
+        return rows
+
+    def archive_reservations(
+        self, older_than: datetime, chunk_size: int = RESERVATION_ARCHIVE_CHUNK_SIZE
+    ) -> Iterator[int]:
+        # Moves reservations that ended before `older_than`, one transaction per chunk, and
+        # yields the number of rows moved per chunk. Every chunk commits on its own, so an
+        # interrupted run is resumed by simply running it again.
+        after_id = 0
+        while rows := run_with_retries(
+            lambda: self._archive_chunk(older_than, after_id, chunk_size)
+        ):
+            after_id = rows[-1]['id']
+            yield len(rows)
@@ -0,0 +1,157 @@
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from datetime import datetime
+from typing import Iterable
+
+from asgiref.sync import sync_to_async
+from core.settings import AVAILABILITY_ENGINE
+from mrbs_app.models import Reservation
+
+
+class AvailabilityEngine(ABC):
+    @abstractmethod
+    def is_available(self, room_id: int, reserved_from: datetime, reserved_to: datetime) -> bool:
+        pass
+
+    async def ais_available(
+        self, room_id: int, reserved_from: datetime, reserved_to: datetime
+    ) -> bool:
+        return await sync_to_async(self.is_available)(room_id, reserved_from, reserved_to)
+
+    def update(self, reservations: Iterable[Reservation]):
+        # Called after commit with the reservations passed to reservations_changed.
+        pass
+
+    def clear(self):
+        pass
+
+
+class ORMAvailabilityEngine(AvailabilityEngine):
+    @staticmethod
+    def _get_overlapping(room_id: int, reserved_from: datetime, reserved_to: datetime):
+        return Reservation.objects.filter(
+            room_id=room_id,
+            reserved_from__lt=reserved_to,
+            reserved_to__gt=reserved_from,
+            status=Reservation.ReservationStatus.ACTIVE,
+        )
+
+    def is_available(self, room_id: int, reserved_from: datetime, reserved_to: datetime) -> bool:
+        return not self._get_overlapping(room_id, reserved_from, reserved_to).exists()
+
+    async def ais_available(
+        self, room_id: int, reserved_from: datetime, reserved_to: datetime
+    ) -> bool:
+        return not await self._get_overlapping(room_id, reserved_from, reserved_to).aexists()
+
+
+class RoomIntervalIndex:
+    # Active reservations of a room never overlap, so when ordered by start their ends are
+    # ordered as well and a single bisect over the starts answers an overlap check.
+    def __init__(self, intervals: Iterable[tuple[int, datetime, datetime]] = ()):
+        self._starts: list[datetime] = []
+        self._ends: list[datetime] = []
+        self._ids: list[int] = []
+        for reservation_id, reserved_from, reserved_to in sorted(intervals, key=lambda i: i[1]):
+            self._starts.append(reserved_from)
+            self._ends.append(reserved_to)
+            self._ids.append(reservation_id)
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def overlaps(self, reserved_from: datetime, reserved_to: datetime) -> bool:
+        position = bisect_left(self._starts, reserved_to)
+        return position > 0 and self._ends[position - 1] > reserved_from
+
+    def add(self, reservation_id: int, reserved_from: datetime, reserved_to: datetime):
+        position = bisect_left(self._starts, reserved_from)
+        self._starts.insert(position, reserved_from)
+        self._ends.insert(position, reserved_to)
+        self._ids.insert(position, reservation_id)
+
+    def remove(self, reservation_id: int, reserved_from: datetime):
+        position = bisect_left(self._starts, reserved_from)
+        while position < len(self._starts) and self._starts[position] == reserved_from:
+            if self._ids[position] == reservation_id:
+                del self._starts[position]
+                del self._ends[position]
+                del self._ids[position]
+                return
+            position += 1
+
+
+class IntervalIndexAvailabilityEngine(AvailabilityEngine):
+    # Loads, checks and updates of the indexes all happen under the lock: a check never sees
+    # an index being changed, and an update is never lost to a load of the same room that
+    # read the reservations before it.
+    def __init__(self):
+        self._indexes: dict[int, RoomIntervalIndex] = {}
+        self._lock = threading.Lock()
+
+    def _get_room_index(self, room_id: int) -> RoomIntervalIndex:
+        # Must be called with the lock held.
+        index = self._indexes.get(room_id)
+        if index is None:
+            index = self._indexes[room_id] = RoomIntervalIndex(
+                Reservation.objects.filter(
+                    room_id=room_id, status=Reservation.ReservationStatus.ACTIVE
+                ).values_list('id', 'reserved_from', 'reserved_to')
+            )
+        return index
+
+    def is_available(self, room_id: int, reserved_from: datetime, reserved_to: datetime) -> bool:
+        with self._lock:
+            return not self._get_room_index(room_id).overlaps(reserved_from, reserved_to)
+
+    async def ais_available(
+        self, room_id: int, reserved_from: datetime, reserved_to: datetime
+    ) -> bool:
+        # A loaded room is checked on the event loop, a room to load in a worker thread.
+        with self._lock:
+            index = self._indexes.get(room_id)
+            if index is not None:
+                return not index.overlaps(reserved_from, reserved_to)
+        return await super().ais_available(room_id, reserved_from, reserved_to)
+
+    def update(self, reservations: Iterable[Reservation]):
+        reservations = list(reservations)
+        with self._lock:
+            loaded = False
+            for reservation in reservations:
+                for room_id, reserved_from, _ in reservation.get_changed_ranges():
+                    index = self._indexes.get(room_id)
+                    if index is not None:
+                        index.remove(reservation.id, reserved_from)
+                        loaded = True
+            if not loaded:
+                return
+            # The current state is read again, under the lock: the reservations may have been
+            # deleted or changed since, and an update applied later reads a later state.
+            for reservation_id, room_id, reserved_from, reserved_to in Reservation.objects.filter(
+                pk__in=[reservation.id for reservation in reservations],
+                status=Reservation.ReservationStatus.ACTIVE,
+            ).values_list('id', 'room_id', 'reserved_from', 'reserved_to'):
+                index = self._indexes.get(room_id)
+                if index is not None:
+                    index.add(reservation_id, reserved_from, reserved_to)
+
+    def clear(self):
+        with self._lock:
+            self._indexes.clear()
+
+
+AVAILABILITY_ENGINES = {
+    'orm': ORMAvailabilityEngine,
+    'interval_index': IntervalIndexAvailabilityEngine,
+}
+
+_engine: AvailabilityEngine | None = None
+
+
+def get_availability_engine() -> AvailabilityEngine:
+    global _engine  # pylint: disable=global-statement
+    if _engine is None:
+        _engine = AVAILABILITY_ENGINES.get(AVAILABILITY_ENGINE, ORMAvailabilityEngine)()
+    return _engine
@@ -0,0 +1,112 @@
+import base64
+import re
+from datetime import datetime, timedelta
+
+from core.settings import AVAILABILITY_MATRIX_MAX_SLOTS
+from django.db.models import FilteredRelation, Q
+from rest_framework.request import Request
+
+import mrbs_app.api.exceptions as booking_exceptions
+import mrbs_app.serializers.booking as booking_serializers
+from mrbs_app.models import Reservation, Room
+from mrbs_app.services.booking import BookingService
+
+_RUN = re.compile('0+|1+')
+
+
+def make_busy_mask(
+    reserved_from: datetime,
+    reserved_to: datetime,
+    window_from: datetime,
+    slot: timedelta,
+    slots: int,
+) -> int:
+    # Bit i is set when the reservation overlaps slot i, so a room's busy slots are the OR of
+    # the masks of its reservations. Python integers are arbitrary-length bitsets: shifts, OR
+    # and AND work a machine word at a time, over the whole row at once.
+    first = max((reserved_from - window_from) // slot, 0)
+    last = min(-((window_from - reserved_to) // slot), slots)
+    if first >= last:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+
+def encode_slots(bits: int, slots: int, encoding: str) -> list[int] | str:
+    if encoding == 'bitmap':
+        return base64.b64encode(bits.to_bytes((slots + 7) // 8, 'little')).decode('ascii')
+    # Run lengths of alternating free and busy slots, starting with free ones.
+    row = format(bits, f'0{slots}b')[::-1]
+    runs = [len(run) for run in _RUN.findall(row)]
+    return [0, *runs] if row.startswith('1') else runs
+
+
+class AvailabilityMatrixService(BookingService):
+    @staticmethod
+    def compute_matrix(
+        window_from: datetime, window_to: datetime, slot: timedelta, encoding: str = 'rle'
+    ) -> dict:
+        slots = -((window_from - window_to) // slot)
+        # Rooms left-joined to their reservations overlapping the window: one query, rooms
+        # without reservations come with a single row of NULLs.
+        rows = (
+            Room.objects.annotate(
+                busy=FilteredRelation(
+                    'reservation',
+                    condition=Q(
+                        reservation__reserved_from__lt=window_to,
+                        reservation__reserved_to__gt=window_from,
+                    )
+                    & ~Q(reservation__status=Reservation.ReservationStatus.CANCELLED),
+                )
+            )
+            .order_by('id')
+            .values_list(
+                'id', 'number', 'name', 'capacity', 'busy__reserved_from', 'busy__reserved_to'
+            )
+        )
+        rooms = {}
+        for room_id, number, name, capacity, reserved_from, reserved_to in rows:
+            if room_id not in rooms:
+                rooms[room_id] = [number, name, capacity, 0]
+            if reserved_from is not None:
+                rooms[room_id][3] |= make_busy_mask(
+                    reserved_from, reserved_to, window_from, slot, slots
+                )
+
+        all_busy = (1 << slots) - 1 if rooms else 0
+        for *_, bits in rooms.values():
+            all_busy &= bits
+        return {
+            'from': window_from,
+            'to': window_to,
+            'slot_minutes': slot // timedelta(minutes=1),
+            'slots': slots,
+            'encoding': encoding,
+            'all_busy': encode_slots(all_busy, slots, encoding),
+            'rooms': [
+                {
+                    'room_id': room_id,
+                    'number': number,
+                    'name': name,
+                    'capacity': capacity,
+                    'busy': encode_slots(bits, slots, encoding),
+                }
+                for room_id, (number, name, capacity, bits) in rooms.items()
+            ],
+        }
+
+    def get_matrix(self, request: Request) -> dict:
+        matrix_serializer = booking_serializers.AvailabilityMatrixRequestSerializer(
+            data=request.query_params.dict()
+        )
+        matrix_serializer.is_valid(raise_exception=True)
+        data = matrix_serializer.validated_data
+        self._check_reserved_time(reserved_from=data['from'], reserved_to=data['to'])
+        if data['to'] - data['from'] > AVAILABILITY_MATRIX_MAX_SLOTS * data['slot']:
+            raise booking_exceptions.AvailabilityMatrixTooLargeError
+        return self.compute_matrix(
+            window_from=data['from'],
+            window_to=data['to'],
+            slot=data['slot'],
+            encoding=data['encoding'],
+        )
@@ -1,16 +1,76 @@
+import csv
+import json
+from collections import defaultdict
+from contextlib import ExitStack
 from datetime import datetime
+from typing import Callable, Iterable, Iterator, TypeVar
 
-from core.settings import REPORT_EXT, REPORT_FILE_PATH
-from django.db.models import QuerySet
-from docx import Document
+from core.settings import (
+    BULK_RESERVATIONS_MAX_ITEMS,
+    REPORT_EXPORT_CHUNK_SIZE,
+    REPORT_EXT,
+)
+from django.contrib.auth import get_user_model
+from django.db import OperationalError, transaction
+from django.db.models import F, QuerySet
 from rest_framework.request import Request
 
 import mrbs_app.api.exceptions as booking_exceptions
 import mrbs_app.serializers.booking as booking_serializers
-from mrbs_app.models import Reservation
+from mrbs_app.models import Reservation, ReservationArchive
+from mrbs_app.services.availability import (
+    AvailabilityEngine,
+    RoomIntervalIndex,
+    get_availability_engine,
+)
+from mrbs_app.services.docx_report import get_report_writer
+from mrbs_app.services.locks import is_lock_error, lock_room_row, room_lock, run_with_retries
+from mrbs_app.services.metrics import timed_service
+from mrbs_app.services.pagination import apaginate_by_keyset, paginate_by_keyset
+from mrbs_app.services.report_cache import report_cache
+from mrbs_app.services.report_store import report_store
+from mrbs_app.signals import send_reservations_changed
 
+T = TypeVar('T')
 
+RESERVATION_LIST_FIELDS = (
+    'id',
+    'purpose_of_booking',
+    'reserved_from',
+    'reserved_to',
+    'user',
+    'room',
+    'status',
+    'series',
+)
+
+REPORT_ROW_FIELDS = (
+    'id',
+    'purpose_of_booking',
+    'reserved_from',
+    'reserved_to',
+    'status',
+    'room_id',
+)
+
+EXPORT_CSV = 'csv'
+EXPORT_NDJSON = 'ndjson'
+EXPORT_COLUMNS = (
+    'id',
+    'user',
+    'reserved_from',
+    'reserved_to',
+    'purpose_of_booking',
+    'room_number',
+    'status',
+)
+
+
+@timed_service
 class BookingService:
+    def __init__(self, availability_engine: AvailabilityEngine = None):
+        self._availability_engine = availability_engine or get_availability_engine()
+
     @staticmethod
     def _get_active_reservations(
         room_id: int, reserved_from: datetime, reserved_to: datetime
@@ -22,6 +82,17 @@ class BookingService:
             status=Reservation.ReservationStatus.ACTIVE,
         )
 
+    @staticmethod
+    def _get_listed_reservations(
+        room_id: int, reserved_from: datetime, reserved_to: datetime
+    ) -> QuerySet[Reservation]:
+        # Ended reservations are moved to COMPLETED by the sweeper but still took the room.
+        return Reservation.objects.filter(
+            room_id=room_id,
+            reserved_from__lt=reserved_to,
+            reserved_to__gt=reserved_from,
+        ).exclude(status=Reservation.ReservationStatus.CANCELLED)
+
     @staticmethod
     def _check_reserved_time(reserved_from: datetime, reserved_to: datetime):
         if reserved_from >= reserved_to:
@@ -30,111 +101,363 @@ class BookingService:
     def _is_room_available(
         self, room_id: int, reserved_from: datetime, reserved_to: datetime
     ) -> bool:
-        return not self._get_active_reservations(
+        return self._availability_engine.is_available(
             room_id=room_id, reserved_from=reserved_from, reserved_to=reserved_to
-        ).exists()
+        )
+
+    def _insert_reservation(self, reservation: Reservation):
+        # The engine check rejects obviously busy slots cheaply. The authoritative check runs
+        # after the insert, in the same transaction: once the insert holds the write lock no
+        # concurrent booking of the room can commit, so the check sees every competitor and a
+        # conflict rolls the insert back.
+        with room_lock(reservation.room_id):
+            if not self._is_room_available(
+                room_id=reservation.room_id,
+                reserved_from=reservation.reserved_from,
+                reserved_to=reservation.reserved_to,
+            ):
+                raise booking_exceptions.ReservationBusyError
+            with transaction.atomic():
+                lock_room_row(reservation.room_id)
+                reservation.save()
+                if (
+                    self._get_active_reservations(
+                        room_id=reservation.room_id,
+                        reserved_from=reservation.reserved_from,
+                        reserved_to=reservation.reserved_to,
+                    )
+                    .exclude(pk=reservation.pk)
+                    .exists()
+                ):
+                    raise booking_exceptions.ReservationBusyError
+
+    @staticmethod
+    def _run_with_retries(operation: Callable[[], T]) -> T:
+        try:
+            return run_with_retries(operation)
+        except OperationalError as exc:
+            if not is_lock_error(exc):
+                raise
+            raise booking_exceptions.ReservationConflictError from exc
 
     def make_reservation(self, request: Request):
         reservation_serializer = booking_serializers.ReservationCreateSerializer(data=request.data)
         reservation_serializer.is_valid(raise_exception=True)
-        data = reservation_serializer.data
+        data = reservation_serializer.validated_data
 
         self._check_reserved_time(
             reserved_from=data['reserved_from'], reserved_to=data['reserved_to']
         )
-        if self._is_room_available(
+        self._run_with_retries(
+            lambda: self._insert_reservation(
+                Reservation(
+                    purpose_of_booking=data['purpose_of_booking'],
+                    reserved_from=data['reserved_from'],
+                    reserved_to=data['reserved_to'],
+                    status=Reservation.ReservationStatus.ACTIVE,
+                    user=request.user,
+                    room_id=data['room_id'],
+                )
+            )
+        )
+
+    def _insert_reservations_bulk(
+        self, items: list[dict], positions_by_room: dict[int, list[int]], user
+    ) -> list[Reservation | None]:
+        accepted: list[Reservation | None] = [None] * len(items)
+        room_ids = sorted(positions_by_room)
+        with ExitStack() as room_locks:
+            for room_id in room_ids:
+                room_locks.enter_context(room_lock(room_id))
+            with transaction.atomic():
+                for room_id in room_ids:
+                    lock_room_row(room_id)
+                for room_id in room_ids:
+                    positions = positions_by_room[room_id]
+                    # One range query per room covers every item of the batch for that room;
+                    # items are then checked against it and against the items accepted before.
+                    index = RoomIntervalIndex(
+                        self._get_active_reservations(
+                            room_id=room_id,
+                            reserved_from=min(items[p]['reserved_from'] for p in positions),
+                            reserved_to=max(items[p]['reserved_to'] for p in positions),
+                        ).values_list('id', 'reserved_from', 'reserved_to')
+                    )
+                    for position in positions:
+                        item = items[position]
+                        if index.overlaps(item['reserved_from'], item['reserved_to']):
+                            continue
+                        index.add(None, item['reserved_from'], item['reserved_to'])
+                        accepted[position] = Reservation(
+                            purpose_of_booking=item['purpose_of_booking'],
+                            reserved_from=item['reserved_from'],
+                            reserved_to=item['reserved_to'],
+                            status=Reservation.ReservationStatus.ACTIVE,
+                            user=user,
+                            room_id=room_id,
+                        )
+                created = Reservation.objects.bulk_create(
+                    [reservation for reservation in accepted if reservation is not None]
+                )
+                send_reservations_changed(sender=Reservation, reservations=created)
+        return accepted
+
+    def make_reservations_bulk(
+        self, request: Request
+    ) -> list[Reservation | booking_exceptions.BookingErrorBase]:
+        reservation_serializer = booking_serializers.ReservationCreateSerializer(
+            data=request.data, many=True, allow_empty=False, max_length=BULK_RESERVATIONS_MAX_ITEMS
+        )
+        reservation_serializer.is_valid(raise_exception=True)
+        items = reservation_serializer.validated_data
+
+        results: list[Reservation | booking_exceptions.BookingErrorBase | None] = [None] * len(
+            items
+        )
+        positions_by_room = defaultdict(list)
+        for position, item in enumerate(items):
+            try:
+                self._check_reserved_time(
+                    reserved_from=item['reserved_from'], reserved_to=item['reserved_to']
+                )
+            except booking_exceptions.ReservationTimeError as exc:
+                results[position] = exc
+                continue
+            positions_by_room[item['room_id']].append(position)
+
+        if positions_by_room:
+            accepted = self._run_with_retries(
+                lambda: self._insert_reservations_bulk(items, positions_by_room, request.user)
+            )
+            for positions in positions_by_room.values():
+                for position in positions:
+                    results[position] = (
+                        accepted[position] or booking_exceptions.ReservationBusyError()
+                    )
+        return results
+
+    def cancel_reservation(self, reservation_id: int) -> Reservation:
+        try:
+            reservation = Reservation.objects.get(
+                pk=reservation_id, status=Reservation.ReservationStatus.ACTIVE
+            )
+        except Reservation.DoesNotExist as exc:
+            raise booking_exceptions.ReservationNotFoundError from exc
+        reservation.status = Reservation.ReservationStatus.CANCELLED
+        # Atomic, so the change log entry written by post_save commits with the update.
+        with transaction.atomic():
+            reservation.save(update_fields=['status', 'updated_at'])
+        return reservation
+
+    def _validate_availability_params(self, query_params: dict) -> dict:
+        availability_serializer = booking_serializers.ReservationsRequestSerializer(
+            data=query_params
+        )
+        availability_serializer.is_valid(raise_exception=True)
+        data = availability_serializer.validated_data
+        self._check_reserved_time(
+            reserved_from=data['reserved_from'], reserved_to=data['reserved_to']
+        )
+        return data
+
+    def check_availability(self, request: Request) -> dict:
+        data = self._validate_availability_params(request.query_params.dict())
+        available = self._is_room_available(
             room_id=data['room_id'],
             reserved_from=data['reserved_from'],
             reserved_to=data['reserved_to'],
-        ):
-            Reservation(
-                purpose_of_booking=data['purpose_of_booking'],
-                reserved_from=data['reserved_from'],
-                reserved_to=data['reserved_to'],
-                status=Reservation.ReservationStatus.ACTIVE,
-                user=request.user,
-                room_id=data['room_id'],
-            ).save()
-            return
-        raise booking_exceptions.ReservationBusyError
+        )
+        return {'room_id': data['room_id'], 'available': available}
 
-    def get_reservations_by_period(self, request: Request) -> list[Reservation]:
-        reservation_serializer = booking_serializers.ReservationsRequestSerializer(
-            data=request.query_params.dict()
+    async def acheck_availability(self, query_params: dict) -> dict:
+        data = self._validate_availability_params(query_params)
+        available = await self._availability_engine.ais_available(
+            room_id=data['room_id'],
+            reserved_from=data['reserved_from'],
+            reserved_to=data['reserved_to'],
+        )
+        return {'room_id': data['room_id'], 'available': available}
+
+    @staticmethod
+    def _validate_page_params(query_params: dict) -> dict:
+        reservation_serializer = booking_serializers.ReservationsPageRequestSerializer(
+            data=query_params
         )
         reservation_serializer.is_valid(raise_exception=True)
-        data = reservation_serializer.data
-        return self._get_active_reservations(
-            room_id=data['room_id'],
+        return reservation_serializer.validated_data
+
+    def _get_page_query(self, query_params: dict) -> dict:
+        data = self._validate_page_params(query_params)
+        return {
+            'reservations': self._get_listed_reservations(
+                room_id=data['room_id'],
+                reserved_from=data['reserved_from'],
+                reserved_to=data['reserved_to'],
+            ),
+            'fields': RESERVATION_LIST_FIELDS,
+            'limit': data['limit'],
+            'cursor': data.get('cursor'),
+        }
+
+    def get_reservations_etag(self, request: Request) -> str:
+        query_params = request.query_params.dict()
+        data = self._validate_page_params(query_params)
+        return report_cache.get_etag(
             reserved_from=data['reserved_from'],
             reserved_to=data['reserved_to'],
+            room_id=data['room_id'],
+            limit=data['limit'],
+            cursor=query_params.get('cursor', ''),
         )
 
+    def get_reservations_page(self, request: Request) -> tuple[list[dict], str | None]:
+        return paginate_by_keyset(**self._get_page_query(request.query_params.dict()))
+
+    async def aget_reservations_page(self, query_params: dict) -> tuple[list[dict], str | None]:
+        return await apaginate_by_keyset(**self._get_page_query(query_params))
+
+
+def make_report_file_name(reserved_from: datetime, reserved_to: datetime) -> str:
+    return f'report_{reserved_from.isoformat()}_{reserved_to.isoformat()}{REPORT_EXT}'
+
+
+class _EchoBuffer:
+    def write(self, value: str) -> str:
+        return value
 
+
+@timed_service
 class BookingReportService:
     @staticmethod
-    def _get_reservations(
+    def _get_period_rows(
+        reservations: QuerySet,
         reserved_from: datetime,
         reserved_to: datetime,
         room_id: int = None,
-    ) -> QuerySet[Reservation]:
+    ) -> QuerySet:
+        reservations = reservations.filter(
+            reserved_from__lt=reserved_to, reserved_to__gt=reserved_from
+        )
         if room_id:
-            return Reservation.objects.filter(
-                reserved_from__lt=reserved_to, reserved_to__gt=reserved_from, room_id=room_id
+            reservations = reservations.filter(room_id=room_id)
+        return reservations.values(
+            *REPORT_ROW_FIELDS,
+            user_name=F(f'user__{get_user_model().USERNAME_FIELD}'),
+            room_number=F('room__number'),
+        )
+
+    def _get_reservations(
+        self,
+        reserved_from: datetime,
+        reserved_to: datetime,
+        room_id: int = None,
+        by_room: bool = False,
+    ) -> QuerySet:
+        # Reservations moved to the archive by `manage.py archive_reservations` are reported
+        # as well; UNION ALL keeps it a single query, and the archive side is an empty index
+        # range scan unless the period reaches into archived time.
+        return (
+            self._get_period_rows(Reservation.objects, reserved_from, reserved_to, room_id)
+            .union(
+                self._get_period_rows(
+                    ReservationArchive.objects, reserved_from, reserved_to, room_id
+                ),
+                all=True,
             )
-        return Reservation.objects.filter(
-            reserved_from__lt=reserved_to,
-            reserved_to__gt=reserved_from,
+            .order_by(*(('room_number', 'room_id') if by_room else ()), 'reserved_from', 'id')
         )
 
-    @staticmethod
-    def _make_document(bookings: QuerySet[Reservation]) -> Document:
-        doc = Document()
-        doc.add_heading('Отчет о бронированиях переговорных комнат', level=0)
-
-        table = doc.add_table(rows=1, cols=5)
-        table.style = 'Table Grid'
-        hdr_cells = table.rows[0].cells
-        hdr_cells[0].text = '#'
-        hdr_cells[1].text = 'Кто бронировал'
-        hdr_cells[2].text = 'Время бронирования'
-        hdr_cells[3].text = 'Цель бронирования'
-        hdr_cells[4].text = 'Номер комнаты'
+    def build_reservations_report(
+        self,
+        reserved_from: datetime,
+        reserved_to: datetime,
+        room_id: int = None,
+        split_by_room: bool = False,
+    ) -> str:
+        params = {'split_by_room': split_by_room} if split_by_room else {}
+        cache_key = report_cache.get_key(reserved_from, reserved_to, room_id, **params)
+        file_path = report_store.get(cache_key)
+        if file_path is not None:
+            return file_path
 
-        for booking in bookings:
-            row_cells = table.add_row().cells
-            row_cells[0].text = str(booking.id)
-            row_cells[1].text = str(booking.user)
-            row_cells[2].text = (
-                f'{booking.reserved_from.strftime("%Y-%m-%d %H:%M")} - '
-                f'{booking.reserved_to.strftime("%Y-%m-%d %H:%M")}'
-            )
-            row_cells[3].text = booking.purpose_of_booking
-            row_cells[4].text = str(booking.room.number)
-        doc.add_page_break()
-        return doc
+        bookings = self._get_reservations(
+            room_id=room_id,
+            reserved_from=reserved_from,
+            reserved_to=reserved_to,
+            by_room=split_by_room,
+        ).iterator(chunk_size=REPORT_EXPORT_CHUNK_SIZE)
+        return report_store.put(
+            cache_key,
+            lambda path: get_report_writer().write(bookings, path, split_by_room=split_by_room),
+        )
 
-    def get_reservations_report(self, request: Request) -> str:
-        reservation_serializer = booking_serializers.ReservReportRequestSerializer(
+    def get_report_etag(self, request: Request) -> str:
+        reservation_serializer = booking_serializers.ReservDocxReportRequestSerializer(
             data=request.query_params.dict()
         )
         reservation_serializer.is_valid(raise_exception=True)
-        data = reservation_serializer.data
+        data = reservation_serializer.validated_data
 
-        bookings = self._get_reservations(
+        return report_cache.get_etag(
+            reserved_from=data['reserved_from'],
+            reserved_to=data['reserved_to'],
+            room_id=data.get('room_id'),
+            export=request.query_params.get('export', ''),
+            split_by_room=data['split_by_room'],
+        )
+
+    def get_reservations_report(self, request: Request) -> tuple[str, str]:
+        reservation_serializer = booking_serializers.ReservDocxReportRequestSerializer(
+            data=request.query_params.dict()
+        )
+        reservation_serializer.is_valid(raise_exception=True)
+        data = reservation_serializer.validated_data
+
+        file_path = self.build_reservations_report(
             room_id=data.get('room_id'),
             reserved_from=data['reserved_from'],
             reserved_to=data['reserved_to'],
+            split_by_room=data['split_by_room'],
         )
+        return file_path, make_report_file_name(data['reserved_from'], data['reserved_to'])
+
+    @staticmethod
+    def _make_export_row(booking: dict) -> list:
+        return [
+            booking['id'],
+            booking['user_name'],
+            booking['reserved_from'].isoformat(),
+            booking['reserved_to'].isoformat(),
+            booking['purpose_of_booking'],
+            booking['room_number'],
+            booking['status'],
+        ]
 
-        document = self._make_document(bookings=bookings)
+    def _iter_csv(self, bookings: Iterable[dict]) -> Iterator[str]:
+        writer = csv.writer(_EchoBuffer())
+        yield writer.writerow(EXPORT_COLUMNS)
+        for booking in bookings:
+            yield writer.writerow(self._make_export_row(booking))
 
-        file_path = (
-            f'{REPORT_FILE_PATH}'
-            f'{data["reserved_from"]}_'
-            f'{data["reserved_to"]}'
-            f'{REPORT_EXT}'
+    def _iter_ndjson(self, bookings: Iterable[dict]) -> Iterator[str]:
+        for booking in bookings:
+            yield json.dumps(
+                dict(zip(EXPORT_COLUMNS, self._make_export_row(booking))), ensure_ascii=False
+            ) + '\n'
+
+    def export_reservations_report(self, request: Request) -> tuple[Iterator[str], str, str]:
+        reservation_serializer = booking_serializers.ReservExportRequestSerializer(
+            data=request.query_params.dict()
         )
-        document.save(file_path)
+        reservation_serializer.is_valid(raise_exception=True)
+        data = reservation_serializer.data
 
-        return file_path
+        bookings = self._get_reservations(
+            room_id=data.get('room_id'),
+            reserved_from=data['reserved_from'],
+            reserved_to=data['reserved_to'],
+        ).iterator(chunk_size=REPORT_EXPORT_CHUNK_SIZE)
+        file_name = f'report_{data["reserved_from"]}_{data["reserved_to"]}.{data["export"]}'
+        if data['export'] == EXPORT_CSV:
+            return self._iter_csv(bookings), 'text/csv; charset=utf-8', file_name
+        return self._iter_ndjson(bookings), 'application/x-ndjson; charset=utf-8', file_name
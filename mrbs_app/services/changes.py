@@ -0,0 +1,75 @@
+from rest_framework.request import Request
+
+import mrbs_app.serializers.booking as booking_serializers
+from mrbs_app.models import Reservation, ReservationArchive, ReservationChange
+from mrbs_app.services.booking import RESERVATION_LIST_FIELDS
+from mrbs_app.services.pagination import encode_change_cursor
+
+
+class ReservationChangeService:
+    @staticmethod
+    def get_changes(request: Request) -> dict:
+        # Reservations changed after the cursor, in their current or archived state, and ids of
+        # deleted ones. A reservation changed several times within a page is returned once. Without a
+        # cursor nothing is returned but the cursor of the latest change, from which a client
+        # that has just loaded its window starts polling.
+        changes_serializer = booking_serializers.ReservationChangesRequestSerializer(
+            data=request.query_params.dict()
+        )
+        changes_serializer.is_valid(raise_exception=True)
+        data = changes_serializer.validated_data
+
+        changes = ReservationChange.objects.all()
+        if data.get('room_id') is not None:
+            changes = changes.filter(room_id=data['room_id'])
+        if 'cursor' not in data:
+            latest_id = changes.order_by('-id').values_list('id', flat=True).first()
+            return {
+                'reservations': [],
+                'deleted': [],
+                'next_cursor': encode_change_cursor(latest_id or 0),
+                'has_more': False,
+            }
+
+        rows = list(
+            changes.filter(id__gt=data['cursor'])
+            .order_by('id')
+            .values_list('id', 'reservation_id')[: data['limit'] + 1]
+        )
+        has_more = len(rows) > data['limit']
+        rows = rows[: data['limit']]
+        reservation_ids = list(dict.fromkeys(reservation_id for _, reservation_id in rows))
+        reservations = {
+            reservation['id']: reservation
+            for reservation in Reservation.objects.filter(id__in=reservation_ids).values(
+                *RESERVATION_LIST_FIELDS
+            )
+        }
+        missing_ids = [
+            reservation_id
+            for reservation_id in reservation_ids
+            if reservation_id not in reservations
+        ]
+        if missing_ids:
+            # Archived reservations were not deleted: they are returned in their archived
+            # state.
+            reservations.update(
+                (reservation['id'], reservation)
+                for reservation in ReservationArchive.objects.filter(id__in=missing_ids).values(
+                    *RESERVATION_LIST_FIELDS
+                )
+            )
+        return {
+            'reservations': [
+                reservations[reservation_id]
+                for reservation_id in reservation_ids
+                if reservation_id in reservations
+            ],
+            'deleted': [
+                reservation_id
+                for reservation_id in reservation_ids
+                if reservation_id not in reservations
+            ],
+            'next_cursor': encode_change_cursor(rows[-1][0] if rows else data['cursor']),
+            'has_more': has_more,
+        }
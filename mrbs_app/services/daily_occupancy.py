@@ -0,0 +1,193 @@
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+from itertools import accumulate
+from typing import Iterable, Iterator, NamedTuple
+
+from django.db import transaction
+from django.db.models import Max, Min, Q, QuerySet
+
+from mrbs_app.models import Reservation, ReservationArchive, RoomDailyOccupancy
+
+DAY = timedelta(days=1)
+# Day spans read by one refresh, each a condition of the query (SQLite limits the depth of an
+# expression to 1000). Beyond it, the spans of a room are read as one from first to last day.
+MAX_REFRESH_SPANS = 100
+
+
+class DayStats(NamedTuple):
+    booked_minutes: int
+    reservation_count: int
+    peak_concurrency: int
+
+
+DailyOccupancyStats = dict[tuple[int, date], DayStats]
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+def iter_days(reserved_from: datetime, reserved_to: datetime) -> Iterator[date]:
+    day = reserved_from.astimezone(timezone.utc).date()
+    while _day_start(day) < reserved_to:
+        yield day
+        day += DAY
+
+
+def _get_day_span(reserved_from: datetime, reserved_to: datetime) -> tuple[date, date]:
+    # First and last day of iter_days().
+    return (
+        reserved_from.astimezone(timezone.utc).date(),
+        max(reserved_from, reserved_to - timedelta(microseconds=1)).astimezone(timezone.utc).date(),
+    )
+
+
+def _merge_spans(spans: list[tuple[date, date]]) -> list[tuple[date, date]]:
+    merged = []
+    for first_day, last_day in sorted(spans):
+        if merged and first_day <= merged[-1][1] + DAY:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], last_day))
+        else:
+            merged.append((first_day, last_day))
+    return merged
+
+
+def _clip_rows(
+    rows: Iterable[tuple[int, datetime, datetime]], spans: dict[int, list[tuple[date, date]]]
+) -> Iterator[tuple[int, datetime, datetime]]:
+    # Cuts reservations at the bounds of the refreshed days, so that a reservation longer than
+    # them costs the refreshed days only. Cuts fall on day starts and keep the day stats.
+    for room_id, reserved_from, reserved_to in rows:
+        for first_day, last_day in spans[room_id]:
+            period_from = max(reserved_from, _day_start(first_day))
+            period_to = min(reserved_to, _day_start(last_day) + DAY)
+            if period_from < period_to:
+                yield room_id, period_from, period_to
+
+
+def compute_daily_occupancy(rows: Iterable[tuple[int, datetime, datetime]]) -> DailyOccupancyStats:
+    # Stats of every (room_id, day) the given reservations touch.
+    periods = defaultdict(list)
+    for room_id, reserved_from, reserved_to in rows:
+        for day in iter_days(reserved_from, reserved_to):
+            day_start = _day_start(day)
+            periods[room_id, day].append(
+                (max(reserved_from, day_start), min(reserved_to, day_start + DAY))
+            )
+
+    stats = {}
+    for key, day_periods in periods.items():
+        booked = sum(
+            (period_to - period_from for period_from, period_to in day_periods), timedelta()
+        )
+        # At equal times ends (-1) sort before starts (+1): back-to-back bookings do not overlap.
+        events = sorted(
+            [(period_from, 1) for period_from, _ in day_periods]
+            + [(period_to, -1) for _, period_to in day_periods]
+        )
+        peak = max(accumulate(delta for _, delta in events))
+        stats[key] = DayStats(round(booked.total_seconds() / 60), len(day_periods), peak)
+    return stats
+
+
+def _get_occupying_rows(scope: Q) -> QuerySet:
+    # Archived reservations keep counting, so archiving never changes the rollup.
+    return (
+        Reservation.objects.exclude(status=Reservation.ReservationStatus.CANCELLED)
+        .filter(scope)
+        .values_list('room_id', 'reserved_from', 'reserved_to')
+        .union(
+            ReservationArchive.objects.exclude(status=Reservation.ReservationStatus.CANCELLED)
+            .filter(scope)
+            .values_list('room_id', 'reserved_from', 'reserved_to'),
+            all=True,
+        )
+    )
+
+
+def _store_daily_occupancy(stats: DailyOccupancyStats, scope: Q):
+    # Rows in scope are replaced by the stats; room-days left without reservations go away.
+    # No savepoint inside the transaction of a reservation change: it fails as a whole.
+    with transaction.atomic(savepoint=False):
+        RoomDailyOccupancy.objects.filter(scope).delete()
+        RoomDailyOccupancy.objects.bulk_create(
+            [
+                RoomDailyOccupancy(room_id=room_id, date=day, **day_stats._asdict())
+                for (room_id, day), day_stats in stats.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['room', 'date'],
+            update_fields=[*DayStats._fields, 'updated_at'],
+        )
+
+
+def refresh_daily_occupancy(reservations: Iterable[Reservation]):
+    # Recomputes the days touched by the given reservations, before and after the change, from
+    # the reservations table: one read of the affected rooms and days, whatever the number of
+    # changed reservations. Runs in the transaction of the change, so the rollup commits with
+    # it. The days of a reservation are bounded by RESERVATION_MAX_DAYS.
+    spans = defaultdict(list)
+    for reservation in reservations:
+        for room_id, reserved_from, reserved_to in reservation.get_changed_ranges():
+            spans[room_id].append(_get_day_span(reserved_from, reserved_to))
+    if not spans:
+        return
+    spans = {room_id: _merge_spans(room_spans) for room_id, room_spans in spans.items()}
+    if sum(map(len, spans.values())) > MAX_REFRESH_SPANS:
+        spans = {
+            room_id: [(room_spans[0][0], room_spans[-1][1])]
+            for room_id, room_spans in spans.items()
+        }
+
+    reservations_scope, rollup_scope = Q(), Q()
+    for room_id, room_spans in spans.items():
+        for first_day, last_day in room_spans:
+            reservations_scope |= Q(
+                room_id=room_id,
+                reserved_from__lt=_day_start(last_day) + DAY,
+                reserved_to__gt=_day_start(first_day),
+            )
+            rollup_scope |= Q(room_id=room_id, date__range=(first_day, last_day))
+
+    _store_daily_occupancy(
+        compute_daily_occupancy(_clip_rows(_get_occupying_rows(reservations_scope), spans)),
+        rollup_scope,
+    )
+
+
+def rebuild_daily_occupancy(chunk_days: int) -> Iterator[tuple[date, date, int]]:
+    # Rebuilds the rollup window by window, each in its own transaction, and yields
+    # (first day, last day, rows written) per window.
+    bounds = [
+        model.objects.exclude(status=Reservation.ReservationStatus.CANCELLED).aggregate(
+            first=Min('reserved_from'), last=Max('reserved_to')
+        )
+        for model in (Reservation, ReservationArchive)
+    ]
+    bounds = [table_bounds for table_bounds in bounds if table_bounds['first'] is not None]
+    if not bounds:
+        RoomDailyOccupancy.objects.all().delete()
+        return
+    first = min(table_bounds['first'] for table_bounds in bounds)
+    last = max(table_bounds['last'] for table_bounds in bounds)
+    first_day = first.astimezone(timezone.utc).date()
+    last_day = (last - timedelta(microseconds=1)).astimezone(timezone.utc).date()
+    RoomDailyOccupancy.objects.exclude(date__range=(first_day, last_day)).delete()
+
+    window_from = first_day
+    while window_from <= last_day:
+        window_to = min(window_from + DAY * (chunk_days - 1), last_day)
+        stats = compute_daily_occupancy(
+            _clip_rows(
+                _get_occupying_rows(
+                    Q(
+                        reserved_from__lt=_day_start(window_to) + DAY,
+                        reserved_to__gt=_day_start(window_from),
+                    )
+                ),
+                defaultdict(lambda: [(window_from, window_to)]),
+            )
+        )
+        _store_daily_occupancy(stats, Q(date__range=(window_from, window_to)))
+        yield window_from, window_to, len(stats)
+        window_from = window_to + DAY
@@ -0,0 +1,217 @@
+import io
+import os
+import re
+import tempfile
+import zipfile
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from itertools import chain, groupby
+from typing import BinaryIO, Callable, Iterable, Iterator
+
+import docx
+from core.settings import REPORT_DOCX_WRITER
+from docx import Document
+from docx.enum.section import WD_SECTION
+
+REPORT_TITLE = 'Отчет о бронированиях переговорных комнат'
+REPORT_HEADERS = (
+    '#',
+    'Кто бронировал',
+    'Время бронирования',
+    'Цель бронирования',
+    'Номер комнаты',
+)
+
+DOCX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+DOCUMENT_PART = 'word/document.xml'
+# Width of a column in twips: the text width of the template page (8640) split evenly,
+# as python-docx does for a table added to the body.
+COLUMN_WIDTH = 8640 // len(REPORT_HEADERS)
+
+_INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+_XML_ESCAPES = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;'})
+_SPECIAL_CHARS = re.compile('[&<>\t\r\n\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+_CELL_PROPERTIES = f'<w:tcPr><w:tcW w:type="dxa" w:w="{COLUMN_WIDTH}"/></w:tcPr>'
+_CELL_START = f'<w:tc>{_CELL_PROPERTIES}<w:p><w:r><w:t xml:space="preserve">'
+_CELL_END = '</w:t></w:r></w:p></w:tc>'
+_EMPTY_CELL = f'<w:tc>{_CELL_PROPERTIES}<w:p/></w:tc>'
+
+
+def make_report_cells(booking: dict) -> tuple[str, ...]:
+    return (
+        str(booking['id']),
+        booking['user_name'],
+        # 'YYYY-MM-DD HH:MM', isoformat() is several times faster than strftime().
+        f'{booking["reserved_from"].isoformat(" ", "minutes")[:16]} - '
+        f'{booking["reserved_to"].isoformat(" ", "minutes")[:16]}',
+        booking['purpose_of_booking'],
+        str(booking['room_number']),
+    )
+
+
+def _room_heading(room_number) -> str:
+    return f'Комната {room_number}'
+
+
+def _room_id(booking: dict):
+    return booking['room_id']
+
+
+def _group_by_room(bookings: Iterable[dict]) -> Iterator[tuple[int, Iterator[dict]]]:
+    # Room numbers are not unique: bookings are grouped by room id, and the number of the room
+    # goes into the heading only.
+    for _, room_bookings in groupby(bookings, key=_room_id):
+        first = next(room_bookings)
+        yield first['room_number'], chain((first,), room_bookings)
+
+
+class ReportWriter(ABC):
+    # Writes the reservations report to `file_path`. With `split_by_room` the bookings must be
+    # ordered by room (the bookings of a room next to each other): every room gets a heading
+    # and a table in its own section.
+    @abstractmethod
+    def write(self, bookings: Iterable[dict], file_path: str, split_by_room: bool = False):
+        pass
+
+    @staticmethod
+    def _replace_file(file_path: str, write: Callable[[BinaryIO], None]):
+        # The document is written to a temporary file of the same directory and moved into
+        # place: readers of a cached report never see a partly written file.
+        directory = os.path.dirname(file_path) or '.'
+        descriptor, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb') as file:
+                write(file)
+            os.replace(temp_path, file_path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+
+class PythonDocxReportWriter(ReportWriter):
+    # Builds the whole document tree with python-docx before saving it.
+    @staticmethod
+    def _add_table(doc: Document, bookings: Iterable[dict]):
+        table = doc.add_table(rows=1, cols=len(REPORT_HEADERS))
+        table.style = 'Table Grid'
+        for cell, text in zip(table.rows[0].cells, REPORT_HEADERS):
+            cell.text = text
+        for booking in bookings:
+            for cell, text in zip(table.add_row().cells, make_report_cells(booking)):
+                cell.text = text
+
+    def write(self, bookings: Iterable[dict], file_path: str, split_by_room: bool = False):
+        doc = Document()
+        doc.add_heading(REPORT_TITLE, level=0)
+        if split_by_room:
+            for index, (room_number, room_bookings) in enumerate(_group_by_room(bookings)):
+                if index:
+                    doc.add_section(WD_SECTION.NEW_PAGE)
+                doc.add_heading(_room_heading(room_number), level=1)
+                self._add_table(doc, room_bookings)
+        else:
+            self._add_table(doc, bookings)
+        doc.add_page_break()
+        self._replace_file(file_path, doc.save)
+
+
+@lru_cache(maxsize=None)
+def _get_template() -> tuple[tuple[tuple[zipfile.ZipInfo, bytes], ...], str, str, str]:
+    # Parts of the python-docx default template, and its main document split around the body
+    # content: everything up to <w:body>, the final section properties, and the closing tags.
+    template_path = os.path.join(os.path.dirname(docx.__file__), 'templates', 'default.docx')
+    with zipfile.ZipFile(template_path) as template:
+        parts = tuple(
+            (info, template.read(info))
+            for info in template.infolist()
+            if info.filename != DOCUMENT_PART
+        )
+        document = template.read(DOCUMENT_PART).decode('utf-8')
+    match = re.search(r'(?s)^(.*?<w:body>).*?(<w:sectPr\b.*?</w:sectPr>)(.*)$', document)
+    head, section_properties, tail = match.groups()
+    return parts, head, section_properties, tail
+
+
+class StreamingDocxReportWriter(ReportWriter):
+    # Writes the table XML straight into the zip entry of the main document while the
+    # bookings are iterated, so memory does not grow with the number of rows. The other parts
+    # come from the python-docx template, and the markup is the one python-docx generates,
+    # so both writers produce the same document.
+    @staticmethod
+    def _paragraph(text: str, style: str = None) -> str:
+        properties = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ''
+        return f'<w:p>{properties}<w:r><w:t>{text.translate(_XML_ESCAPES)}</w:t></w:r></w:p>'
+
+    @staticmethod
+    def _cell(text: str) -> str:
+        if not text:
+            return _EMPTY_CELL
+        if _SPECIAL_CHARS.search(text):
+            text = (
+                _INVALID_XML_CHARS.sub('', text)
+                .translate(_XML_ESCAPES)
+                .replace('\t', '</w:t><w:tab/><w:t xml:space="preserve">')
+                .replace('\r\n', '\n')
+                .replace('\r', '\n')
+                .replace('\n', '</w:t><w:br/><w:t xml:space="preserve">')
+            )
+        return f'{_CELL_START}{text}{_CELL_END}'
+
+    def _row(self, cells: Iterable[str]) -> str:
+        return f'<w:tr>{"".join(map(self._cell, cells))}</w:tr>'
+
+    def _write_table(self, document: io.TextIOBase, bookings: Iterable[dict]):
+        document.write(
+            '<w:tbl><w:tblPr><w:tblStyle w:val="TableGrid"/><w:tblW w:type="auto" w:w="0"/>'
+            '<w:tblLook w:firstColumn="1" w:firstRow="1" w:lastColumn="0" w:lastRow="0"'
+            ' w:noHBand="0" w:noVBand="1" w:val="04A0"/></w:tblPr><w:tblGrid>'
+            + f'<w:gridCol w:w="{COLUMN_WIDTH}"/>' * len(REPORT_HEADERS)
+            + '</w:tblGrid>'
+        )
+        document.write(self._row(REPORT_HEADERS))
+        for booking in bookings:
+            document.write(self._row(make_report_cells(booking)))
+        document.write('</w:tbl>')
+
+    def _write_document(
+        self, document: io.TextIOBase, bookings: Iterable[dict], split_by_room: bool
+    ):
+        _, head, section_properties, tail = _get_template()
+        document.write(head)
+        document.write(self._paragraph(REPORT_TITLE, style='Title'))
+        if split_by_room:
+            for index, (room_number, room_bookings) in enumerate(_group_by_room(bookings)):
+                if index:
+                    # A section ends with the paragraph holding its properties.
+                    document.write(f'<w:p><w:pPr>{section_properties}</w:pPr></w:p>')
+                document.write(self._paragraph(_room_heading(room_number), style='Heading1'))
+                self._write_table(document, room_bookings)
+        else:
+            self._write_table(document, bookings)
+        document.write('<w:p><w:r><w:br w:type="page"/></w:r></w:p>')
+        document.write(section_properties)
+        document.write(tail)
+
+    def write(self, bookings: Iterable[dict], file_path: str, split_by_room: bool = False):
+        parts = _get_template()[0]
+
+        def _write_archive(file: BinaryIO):
+            with zipfile.ZipFile(file, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+                for info, data in parts:
+                    archive.writestr(info.filename, data)
+                with archive.open(DOCUMENT_PART, 'w', force_zip64=True) as part, io.TextIOWrapper(
+                    part, encoding='utf-8'
+                ) as document:
+                    self._write_document(document, bookings, split_by_room)
+
+        self._replace_file(file_path, _write_archive)
+
+
+REPORT_WRITERS = {
+    'python_docx': PythonDocxReportWriter,
+    'streaming': StreamingDocxReportWriter,
+}
+
+
+def get_report_writer() -> ReportWriter:
+    return REPORT_WRITERS.get(REPORT_DOCX_WRITER, StreamingDocxReportWriter)()
@@ -0,0 +1,119 @@
+import asyncio
+import json
+import threading
+from typing import AsyncIterator, Iterable, NamedTuple
+
+from core.settings import (
+    EVENTS_HEARTBEAT_INTERVAL,
+    EVENTS_RETRY_MS,
+    EVENTS_SUBSCRIBER_QUEUE_SIZE,
+)
+
+from mrbs_app.models import ReservationChange
+
+
+class ReservationEvent(NamedTuple):
+    id: int
+    reservation_id: int
+    room_id: int
+
+    def encode(self) -> str:
+        data = json.dumps({'reservation_id': self.reservation_id, 'room_id': self.room_id})
+        return f'id: {self.id}\nevent: reservation\ndata: {data}\n\n'
+
+
+class Subscription:
+    # Events reach a subscriber through a bounded queue owned by its event loop. A subscriber
+    # that lets the queue fill up is marked as overflowed and its stream is ended: the client
+    # reconnects with Last-Event-ID and catches up from the change log, so a slow client costs
+    # a bounded amount of memory and never slows the fan-out down.
+    def __init__(self, room_ids: Iterable[int], queue_size: int = EVENTS_SUBSCRIBER_QUEUE_SIZE):
+        self.room_ids = frozenset(room_ids)
+        self.overflowed = False
+        self._loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue[ReservationEvent] = asyncio.Queue(maxsize=queue_size)
+
+    def _put(self, event: ReservationEvent):
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    def put(self, event: ReservationEvent):
+        # Called from any thread, usually the one that committed the reservation.
+        self._loop.call_soon_threadsafe(self._put, event)
+
+    async def get(self, timeout: float) -> ReservationEvent | None:
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class ReservationEventBroker:
+    # In-process fan-out of reservation changes to the subscribers of their rooms. Events carry
+    # the id of their ReservationChange entry, which clients send back as Last-Event-ID. Writes
+    # made by other processes are not published here: subscribers get them on reconnection.
+    def __init__(self):
+        self._subscriptions: dict[int, set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def subscribers(self) -> int:
+        with self._lock:
+            return len(set().union(*self._subscriptions.values()))
+
+    def subscribe(self, subscription: Subscription):
+        with self._lock:
+            for room_id in subscription.room_ids:
+                self._subscriptions.setdefault(room_id, set()).add(subscription)
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            for room_id in subscription.room_ids:
+                room_subscriptions = self._subscriptions.get(room_id, set())
+                room_subscriptions.discard(subscription)
+                if not room_subscriptions:
+                    self._subscriptions.pop(room_id, None)
+
+    def publish(self, changes: Iterable[ReservationChange]):
+        with self._lock:
+            deliveries = [
+                (subscription, ReservationEvent(change.id, change.reservation_id, change.room_id))
+                for change in changes
+                for subscription in self._subscriptions.get(change.room_id, ())
+            ]
+        for subscription, event in deliveries:
+            subscription.put(event)
+
+    async def stream(
+        self,
+        room_ids: Iterable[int],
+        last_event_id: int = None,
+        heartbeat_interval: float = EVENTS_HEARTBEAT_INTERVAL,
+        queue_size: int = EVENTS_SUBSCRIBER_QUEUE_SIZE,
+    ) -> AsyncIterator[str]:
+        # Subscribes before replaying the changes missed since `last_event_id`, so nothing
+        # committed in between is lost; events already replayed are skipped.
+        subscription = Subscription(room_ids, queue_size)
+        self.subscribe(subscription)
+        try:
+            yield f'retry: {EVENTS_RETRY_MS}\n\n'
+            if last_event_id is not None:
+                missed = ReservationChange.objects.filter(
+                    id__gt=last_event_id, room_id__in=subscription.room_ids
+                ).order_by('id')
+                async for change in missed.values_list('id', 'reservation_id', 'room_id'):
+                    last_event_id = change[0]
+                    yield ReservationEvent(*change).encode()
+            while not subscription.overflowed:
+                event = await subscription.get(timeout=heartbeat_interval)
+                if event is None:
+                    yield ': heartbeat\n\n'
+                elif last_event_id is None or event.id > last_event_id:
+                    yield event.encode()
+        finally:
+            self.unsubscribe(subscription)
+
+
+reservation_events = ReservationEventBroker()
@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+from itertools import groupby
+from typing import Iterable
+
+from rest_framework.request import Request
+
+import mrbs_app.serializers.booking as booking_serializers
+from mrbs_app.models import Reservation, Room
+from mrbs_app.services.booking import BookingService
+
+
+def compute_free_gaps(
+    reservations: Iterable[tuple[datetime, datetime]],
+    window_from: datetime,
+    window_to: datetime,
+    duration: timedelta,
+) -> list[tuple[datetime, datetime]]:
+    # Sweep line over start-ordered reservations: the cursor is the end of the busy time seen
+    # so far, so overlapping or nested reservations are merged on the fly.
+    gaps = []
+    cursor = window_from
+    for reserved_from, reserved_to in reservations:
+        if reserved_from - cursor >= duration:
+            gaps.append((cursor, reserved_from))
+        cursor = max(cursor, reserved_to)
+    if window_to - cursor >= duration:
+        gaps.append((cursor, window_to))
+    return gaps
+
+
+class FreeSlotService(BookingService):
+    @staticmethod
+    def find_free_slots(
+        window_from: datetime, window_to: datetime, duration: timedelta, min_capacity: int = None
+    ) -> list[dict]:
+        rooms = Room.objects.order_by('id')
+        reservations = Reservation.objects.filter(
+            reserved_from__lt=window_to, reserved_to__gt=window_from
+        ).exclude(status=Reservation.ReservationStatus.CANCELLED)
+        if min_capacity:
+            rooms = rooms.filter(capacity__gte=min_capacity)
+            reservations = reservations.filter(room__capacity__gte=min_capacity)
+
+        busy_by_room = {
+            room_id: [(reserved_from, reserved_to) for _, reserved_from, reserved_to in rows]
+            for room_id, rows in groupby(
+                reservations.order_by('room_id', 'reserved_from').values_list(
+                    'room_id', 'reserved_from', 'reserved_to'
+                ),
+                key=lambda row: row[0],
+            )
+        }
+
+        free_slots = []
+        for room_id, number, name, capacity in rooms.values_list(
+            'id', 'number', 'name', 'capacity'
+        ):
+            gaps = compute_free_gaps(
+                busy_by_room.get(room_id, ()), window_from, window_to, duration
+            )
+            if gaps:
+                free_slots.append(
+                    {
+                        'room_id': room_id,
+                        'number': number,
+                        'name': name,
+                        'capacity': capacity,
+                        'slots': [{'from': start, 'to': end} for start, end in gaps],
+                    }
+                )
+        return free_slots
+
+    def get_free_slots(self, request: Request) -> list[dict]:
+        free_slots_serializer = booking_serializers.FreeSlotsRequestSerializer(
+            data=request.query_params.dict()
+        )
+        free_slots_serializer.is_valid(raise_exception=True)
+        data = free_slots_serializer.validated_data
+        self._check_reserved_time(reserved_from=data['from'], reserved_to=data['to'])
+        return self.find_free_slots(
+            window_from=data['from'],
+            window_to=data['to'],
+            duration=timedelta(minutes=data['duration']),
+            min_capacity=data.get('min_capacity'),
+        )
@@ -0,0 +1,89 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, TypeVar
+
+from core.settings import (
+    RESERVATION_MAX_RETRIES,
+    RESERVATION_RETRY_BACKOFF,
+    SERIALIZE_DATABASE_WRITES,
+)
+from django.db import OperationalError, connection
+
+from mrbs_app.models import Room
+
+T = TypeVar('T')
+
+# Locking layers of a booking write, outermost first:
+# - serialized_writes(): one in-process lock for every write, with SERIALIZE_DATABASE_WRITES on
+#   SQLite (the production profile). The room locks taken under it never wait.
+# - room_lock(): one in-process lock per room, which serializes the writers of a room when
+#   writes are not serialized as a whole.
+# - lock_room_row(): serializes the writers of a room across processes with SELECT ... FOR
+#   UPDATE. SQLite has no row locks: there its single writer lock does it, waited for up to
+#   busy_timeout and then retried by run_with_retries().
+_room_locks: dict[int, threading.Lock] = {}
+_room_locks_guard = threading.Lock()
+_write_lock = threading.RLock()
+
+
+def _get_room_lock(room_id: int) -> threading.Lock:
+    lock = _room_locks.get(room_id)
+    if lock is None:
+        with _room_locks_guard:
+            lock = _room_locks.setdefault(room_id, threading.Lock())
+    return lock
+
+
+@contextmanager
+def room_lock(room_id: int):
+    # Serializes writers of one room inside this process; other rooms are not blocked.
+    with _get_room_lock(room_id):
+        yield
+
+
+def lock_room_row(room_id: int):
+    # Serializes writers of one room across processes. Must be called inside
+    # transaction.atomic(). SQLite has no row locks but allows a single writer only,
+    # and a plain read here would just widen the window for a lock upgrade deadlock.
+    if connection.features.has_select_for_update:
+        list(Room.objects.select_for_update().filter(pk=room_id).values_list('id', flat=True))
+
+
+@contextmanager
+def serialized_writes():
+    # Queues the writers of this process when the database accepts a single writer. Reentrant,
+    # so writes made by signal receivers inside a serialized write do not deadlock. Taken
+    # before any room lock.
+    if SERIALIZE_DATABASE_WRITES and connection.vendor == 'sqlite':
+        with _write_lock:
+            yield
+    else:
+        yield
+
+
+def is_lock_error(exc: Exception) -> bool:
+    # SQLite reports a write lock held by another connection as SQLITE_BUSY ("database is
+    # locked") or SQLITE_LOCKED ("database table is locked"). Other operational errors (disk
+    # full, I/O error, missing table) do not go away by repeating the write.
+    return isinstance(exc, OperationalError) and any(
+        message in str(exc) for message in ('database is locked', 'database table is locked')
+    )
+
+
+def run_with_retries(operation: Callable[[], T]) -> T:
+    # Runs a write serialized with the other writers of this process and repeats it when it
+    # failed on a database locked by another process, with exponential backoff and full
+    # jitter. The last OperationalError is raised when the attempts are exhausted, any other
+    # error at once.
+    for attempt in range(RESERVATION_MAX_RETRIES):
+        try:
+            with serialized_writes():
+                return operation()
+        except OperationalError as exc:
+            if not is_lock_error(exc):
+                raise
+            time.sleep(RESERVATION_RETRY_BACKOFF * 2**attempt * random.random())
+    with serialized_writes():
+        return operation()
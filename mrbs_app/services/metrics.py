@@ -0,0 +1,145 @@
+import bisect
+import functools
+import inspect
+import math
+import threading
+import time
+from typing import Iterable
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    pairs = [
+        '{}="{}"'.format(
+            name, str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+        )
+        for name, value in zip(names, values)
+    ]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Histogram:
+    # Cumulative histogram in the Prometheus exposition format, one series per label values.
+    def __init__(
+        self, name: str, documentation: str, labels: Iterable[str], buckets: Iterable[float]
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series: dict[tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str):
+        bucket = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0, 0.0]
+            series[0][bucket] += 1
+            series[1] += 1
+            series[2] += value
+
+    def collect(self) -> dict:
+        with self._lock:
+            return {
+                label_values: (list(counts), count, total)
+                for label_values, (counts, count, total) in self._series.items()
+            }
+
+    def render(self) -> list[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        for label_values, (counts, count, total) in sorted(self.collect().items()):
+            cumulative = 0
+            for upper_bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(
+                    self.labels + ('le',), label_values + (_format_value(upper_bound),)
+                )
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.labels, label_values)
+            lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+            lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+request_duration = Histogram(
+    'mrbs_http_request_duration_seconds',
+    'Time spent handling HTTP requests.',
+    labels=('method', 'view', 'status'),
+    buckets=DURATION_BUCKETS,
+)
+request_queries = Histogram(
+    'mrbs_http_request_queries',
+    'SQL queries executed per HTTP request.',
+    labels=('method', 'view'),
+    buckets=QUERY_COUNT_BUCKETS,
+)
+request_sql_duration = Histogram(
+    'mrbs_http_request_sql_duration_seconds',
+    'Time spent in SQL queries per HTTP request.',
+    labels=('method', 'view'),
+    buckets=DURATION_BUCKETS,
+)
+service_duration = Histogram(
+    'mrbs_service_call_duration_seconds',
+    'Time spent in booking service methods.',
+    labels=('service', 'method'),
+    buckets=DURATION_BUCKETS,
+)
+
+METRICS = (request_duration, request_queries, request_sql_duration, service_duration)
+
+
+def render_metrics() -> str:
+    return '\n'.join(line for metric in METRICS for line in metric.render()) + '\n'
+
+
+def _timed(function, service: str):
+    if inspect.iscoroutinefunction(function):
+
+        @functools.wraps(function)
+        async def _async_wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await function(*args, **kwargs)
+            finally:
+                service_duration.observe(time.perf_counter() - started, service, function.__name__)
+
+        return _async_wrapper
+
+    @functools.wraps(function)
+    def _wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            service_duration.observe(time.perf_counter() - started, service, function.__name__)
+
+    return _wrapper
+
+
+def timed_service(cls):
+    # Records the duration of every public method of the class. Methods returning an iterator
+    # (streamed exports) are timed until the iterator is returned, the streaming itself is
+    # covered by the request metrics.
+    for name, attribute in list(vars(cls).items()):
+        if name.startswith('_'):
+            continue
+        if isinstance(attribute, (staticmethod, classmethod)):
+            setattr(cls, name, type(attribute)(_timed(attribute.__func__, cls.__name__)))
+        elif inspect.isfunction(attribute):
+            setattr(cls, name, _timed(attribute, cls.__name__))
+    return cls
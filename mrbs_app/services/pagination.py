@@ -0,0 +1,69 @@
+import base64
+import binascii
+from datetime import datetime
+
+from django.db.models import Q, QuerySet
+
+
+def encode_cursor(reserved_from: datetime, reservation_id: int) -> str:
+    position = f'{reserved_from.isoformat()}|{reservation_id}'
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        reserved_from, reservation_id = (
+            base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        )
+        return datetime.fromisoformat(reserved_from), int(reservation_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise ValueError('Invalid cursor') from exc
+
+
+def encode_change_cursor(change_id: int) -> str:
+    return base64.urlsafe_b64encode(f'change|{change_id}'.encode()).decode()
+
+
+def decode_change_cursor(cursor: str) -> int:
+    try:
+        prefix, change_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        if prefix != 'change':
+            raise ValueError(prefix)
+        return int(change_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise ValueError('Invalid cursor') from exc
+
+
+def _get_keyset_page_query(
+    reservations: QuerySet, fields: tuple[str, ...], limit: int, cursor: tuple[datetime, int] = None
+) -> QuerySet:
+    # Keyset pagination on (reserved_from, id): every page is an index range scan that starts
+    # right after the previous page, however deep the client pages.
+    if cursor is not None:
+        reserved_from, reservation_id = cursor
+        reservations = reservations.filter(
+            Q(reserved_from__gt=reserved_from)
+            | Q(reserved_from=reserved_from, id__gt=reservation_id)
+        )
+    return reservations.order_by('reserved_from', 'id').values(*fields)[: limit + 1]
+
+
+def _make_page(rows: list[dict], limit: int) -> tuple[list[dict], str | None]:
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1]['reserved_from'], rows[-1]['id'])
+
+
+def paginate_by_keyset(
+    reservations: QuerySet, fields: tuple[str, ...], limit: int, cursor: tuple[datetime, int] = None
+) -> tuple[list[dict], str | None]:
+    rows = list(_get_keyset_page_query(reservations, fields, limit, cursor))
+    return _make_page(rows, limit)
+
+
+async def apaginate_by_keyset(
+    reservations: QuerySet, fields: tuple[str, ...], limit: int, cursor: tuple[datetime, int] = None
+) -> tuple[list[dict], str | None]:
+    rows = [row async for row in _get_keyset_page_query(reservations, fields, limit, cursor)]
+    return _make_page(rows, limit)
@@ -0,0 +1,92 @@
+import hashlib
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterable
+
+from core.settings import RESERVATION_MAX_DAYS
+from django.db.models import Max, Q
+
+from mrbs_app.models import Reservation, ReservationDataVersion
+
+ALL_ROOMS = 0
+ALL_DAYS = date.min
+
+
+def make_report_params_key(
+    reserved_from: datetime,
+    reserved_to: datetime,
+    room_id: int = None,
+    versions: Iterable = (),
+    **params,
+) -> str:
+    key = '|'.join(
+        [reserved_from.isoformat(), reserved_to.isoformat(), str(room_id or '')]
+        + [str(version) for version in versions]
+        + [f'{name}={value}' for name, value in sorted(params.items())]
+    )
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def _utc_date(value: datetime) -> date:
+    return value.astimezone(timezone.utc).date()
+
+
+class ReportCache:
+    # Reports are stored under a key that includes the data version of the window: the
+    # highest version of its days, per room or for all rooms. A reservation write sets the
+    # versions of the days it covers to the id of its change log entry, which is above every
+    # version written before, so only reports whose window overlaps the change get a new key.
+    @staticmethod
+    def get_version(reserved_from: datetime, reserved_to: datetime, room_id: int = None) -> int:
+        versions = ReservationDataVersion.objects.filter(
+            Q(date__gte=_utc_date(reserved_from), date__lte=_utc_date(reserved_to))
+            | Q(date=ALL_DAYS),
+            room_id=room_id or ALL_ROOMS,
+        ).aggregate(version=Max('version'))
+        return versions['version'] or 0
+
+    def get_key(
+        self, reserved_from: datetime, reserved_to: datetime, room_id: int = None, **params
+    ) -> str:
+        return make_report_params_key(
+            reserved_from,
+            reserved_to,
+            room_id,
+            versions=[self.get_version(reserved_from, reserved_to, room_id)],
+            **params,
+        )
+
+    def get_etag(
+        self, reserved_from: datetime, reserved_to: datetime, room_id: int = None, **params
+    ) -> str:
+        # Changes whenever a reservation of the room (or of any room without `room_id`)
+        # overlapping the window is written, so it can be checked without reading reservations.
+        key = self.get_key(reserved_from, reserved_to, room_id)
+        params = '&'.join(f'{name}={value}' for name, value in sorted(params.items()))
+        return '"{}"'.format(hashlib.sha256(f'{key}|{params}'.encode()).hexdigest()[:32])
+
+    @staticmethod
+    def bump_versions(reservations: Iterable[Reservation], version: int):
+        # Must run in the transaction of the change, `version` being the id of its latest change
+        # log entry: SQLite allocates those in commit order, so versions only ever grow.
+        days = set()
+        for reservation in reservations:
+            for room_id, reserved_from, reserved_to in reservation.get_changed_ranges():
+                first_day, last_day = _utc_date(reserved_from), _utc_date(reserved_to)
+                if (last_day - first_day).days > RESERVATION_MAX_DAYS:
+                    days.update(((room_id, ALL_DAYS), (ALL_ROOMS, ALL_DAYS)))
+                    continue
+                for offset in range((last_day - first_day).days + 1):
+                    day = first_day + timedelta(days=offset)
+                    days.update(((room_id, day), (ALL_ROOMS, day)))
+        ReservationDataVersion.objects.bulk_create(
+            [
+                ReservationDataVersion(room_id=room_id, date=day, version=version)
+                for room_id, day in days
+            ],
+            update_conflicts=True,
+            unique_fields=['room_id', 'date'],
+            update_fields=['version'],
+        )
+
+
+report_cache = ReportCache()
@@ -0,0 +1,144 @@
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from core.settings import REPORT_JOB_TIMEOUT
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+from rest_framework.request import Request
+
+import mrbs_app.api.exceptions as booking_exceptions
+import mrbs_app.serializers.booking as booking_serializers
+from mrbs_app.models import ReportJob
+from mrbs_app.services.booking import BookingReportService, make_report_file_name
+from mrbs_app.services.locks import run_with_retries
+from mrbs_app.services.report_cache import make_report_params_key
+
+
+class ReportJobService:
+    def create_job(self, request: Request) -> tuple[ReportJob, bool]:
+        job_serializer = booking_serializers.ReportJobCreateSerializer(data=request.data)
+        job_serializer.is_valid(raise_exception=True)
+        data = job_serializer.validated_data
+        params_key = make_report_params_key(
+            data['reserved_from'], data['reserved_to'], data.get('room_id')
+        )
+
+        in_flight = ReportJob.objects.filter(
+            params_key=params_key, status__in=ReportJob.IN_FLIGHT_STATUSES
+        )
+        job = in_flight.first()
+        if job is not None:
+            return job, False
+        try:
+            with transaction.atomic():
+                job = ReportJob.objects.create(
+                    params_key=params_key,
+                    reserved_from=data['reserved_from'],
+                    reserved_to=data['reserved_to'],
+                    room_id=data.get('room_id'),
+                    user=request.user,
+                    status=ReportJob.JobStatus.PENDING,
+                )
+        except IntegrityError:
+            # An identical job was created concurrently; the partial unique constraint kept
+            # it the only one in flight. It may have finished since, and any other integrity
+            # error is not a duplicate.
+            job = in_flight.first()
+            if job is None:
+                raise
+            return job, False
+        return job, True
+
+    @staticmethod
+    def get_job(job_id: int) -> ReportJob:
+        try:
+            return ReportJob.objects.get(pk=job_id)
+        except ReportJob.DoesNotExist as exc:
+            raise booking_exceptions.ReportJobNotFoundError from exc
+
+    @staticmethod
+    async def aget_job(job_id: int) -> ReportJob:
+        try:
+            return await ReportJob.objects.aget(pk=job_id)
+        except ReportJob.DoesNotExist as exc:
+            raise booking_exceptions.ReportJobNotFoundError from exc
+
+    def get_job_file(self, job_id: int) -> tuple[str, str]:
+        job = self.get_job(job_id)
+        if job.status != ReportJob.JobStatus.DONE:
+            raise booking_exceptions.ReportNotReadyError
+        # Reports stored long ago may have been evicted from the report store.
+        if not os.path.exists(job.file_path):
+            raise booking_exceptions.ReportExpiredError
+        return job.file_path, make_report_file_name(job.reserved_from, job.reserved_to)
+
+    @staticmethod
+    def _claim_jobs(limit: int) -> list[ReportJob]:
+        now = timezone.now()
+        # Atomic, so a claim that failed on a locked database leaves no job running unseen.
+        with transaction.atomic():
+            # Jobs of a worker that died mid-run go back to the queue.
+            ReportJob.objects.filter(
+                status=ReportJob.JobStatus.RUNNING,
+                started_at__lt=now - timedelta(seconds=REPORT_JOB_TIMEOUT),
+            ).update(status=ReportJob.JobStatus.PENDING, updated_at=now)
+
+            candidates = ReportJob.objects.filter(status=ReportJob.JobStatus.PENDING).order_by('id')
+            claimed = [
+                job_id
+                for job_id in candidates.values_list('id', flat=True)[:limit]
+                if ReportJob.objects.filter(pk=job_id, status=ReportJob.JobStatus.PENDING).update(
+                    status=ReportJob.JobStatus.RUNNING, started_at=now, updated_at=now
+                )
+            ]
+            return list(ReportJob.objects.filter(pk__in=claimed).order_by('id'))
+
+    def claim_jobs(self, limit: int) -> list[ReportJob]:
+        return run_with_retries(lambda: self._claim_jobs(limit))
+
+    @staticmethod
+    def run_job(job: ReportJob):
+        try:
+            job.file_path = BookingReportService().build_reservations_report(
+                reserved_from=job.reserved_from,
+                reserved_to=job.reserved_to,
+                room_id=job.room_id,
+            )
+            job.status = ReportJob.JobStatus.DONE
+        except Exception as exc:  # pylint: disable=broad-except
+            job.error = repr(exc)
+            job.status = ReportJob.JobStatus.FAILED
+        job.finished_at = timezone.now()
+        # The worker claims the next jobs meanwhile; a save lost to its lock would leave the
+        # job running until REPORT_JOB_TIMEOUT.
+        run_with_retries(
+            lambda: job.save(
+                update_fields=['file_path', 'error', 'status', 'finished_at', 'updated_at']
+            )
+        )
+
+    def _run_job_in_thread(self, job: ReportJob):
+        try:
+            self.run_job(job)
+        finally:
+            connection.close()
+
+    def run_worker(self, concurrency: int, poll_interval: float, once: bool = False):
+        running: set[Future] = set()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            while True:
+                running = {future for future in running if not future.done()}
+                free_slots = concurrency - len(running)
+                jobs = self.claim_jobs(limit=free_slots) if free_slots else []
+                for job in jobs:
+                    running.add(executor.submit(self._run_job_in_thread, job))
+                if jobs:
+                    continue
+                if running:
+                    wait(running, timeout=poll_interval, return_when=FIRST_COMPLETED)
+                elif once:
+                    return
+                else:
+                    time.sleep(poll_interval)
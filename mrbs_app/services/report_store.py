@@ -0,0 +1,91 @@
+import os
+import threading
+from typing import Callable
+
+from core.settings import REPORT_EXT, REPORT_STORE_DIR, REPORT_STORE_MAX_BYTES
+
+
+class ReportStore:
+    # Content-addressed storage of generated reports: a report is stored under its cache key,
+    # a hash of its parameters and of the data version of its window. Data versions are kept in
+    # the database, so every process computes the same key and a file on disk is the cached
+    # report for all of them; a newer version of the same report gets a new file instead of
+    # overwriting one that may be being served. Once the files take more than
+    # REPORT_STORE_MAX_BYTES the least recently used ones (by modification time, updated on
+    # every hit) are deleted.
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_path(key: str) -> str:
+        return os.path.join(REPORT_STORE_DIR, f'{key}{REPORT_EXT}')
+
+    def get(self, key: str) -> str | None:
+        file_path = self.get_path(key)
+        try:
+            os.utime(file_path)
+            hit = True
+        except FileNotFoundError:
+            hit = False
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return file_path if hit else None
+
+    def put(self, key: str, write: Callable[[str], None]) -> str:
+        # `write` must create the file atomically (write a temporary file and rename it):
+        # concurrent requests for the same report may write it at the same time.
+        file_path = self.get_path(key)
+        os.makedirs(REPORT_STORE_DIR, exist_ok=True)
+        write(file_path)
+        self.evict(keep=file_path)
+        return file_path
+
+    @staticmethod
+    def _scan() -> list[tuple[float, int, str]]:
+        files = []
+        try:
+            entries = list(os.scandir(REPORT_STORE_DIR))
+        except FileNotFoundError:
+            return files
+        for entry in entries:
+            if not entry.name.endswith(REPORT_EXT):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+        return files
+
+    def evict(self, keep: str = None):
+        with self._lock:
+            files = self._scan()
+            size = sum(file_size for _, file_size, _ in files)
+            for _, file_size, file_path in sorted(files):
+                if size <= REPORT_STORE_MAX_BYTES:
+                    break
+                if file_path == keep:
+                    continue
+                try:
+                    os.unlink(file_path)
+                except FileNotFoundError:
+                    pass
+                size -= file_size
+
+    def clear(self):
+        with self._lock:
+            for _, _, file_path in self._scan():
+                try:
+                    os.unlink(file_path)
+                except FileNotFoundError:
+                    pass
+            self.hits = 0
+            self.misses = 0
+
+
+report_store = ReportStore()
@@ -0,0 +1,149 @@
+import random
+from datetime import datetime, time, timedelta, timezone
+from typing import Iterator
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from faker import Faker
+
+from mrbs_app.models import Reservation, Room
+
+SEED_BATCH_SIZE = 10_000
+RESERVATION_COLUMNS = (
+    'purpose_of_booking',
+    'reserved_from',
+    'reserved_to',
+    'user_id',
+    'room_id',
+    'status',
+    'created_at',
+    'updated_at',
+)
+WORKDAY_START = time(8)
+WORKDAY_END = time(20)
+DURATIONS_MINUTES = (15, 30, 30, 45, 60, 60, 60, 90, 120)
+CANCELLED_SHARE = 0.05
+PURPOSES_POOL_SIZE = 500
+
+
+class BookingSeedService:
+    # Generates realistic bookings fast: Faker text is drawn once into small pools, and
+    # reservations are written with executemany() in large batches inside one transaction,
+    # which skips the per-object compilation of bulk_create().
+    def __init__(self, seed: int = 0):
+        self._random = random.Random(seed)
+        self._faker = Faker()
+        self._faker.seed_instance(seed)
+
+    def _create_users(self, users: int) -> list[int]:
+        password = make_password(None)
+        user_model = get_user_model()
+        created = user_model.objects.bulk_create(
+            [
+                user_model(
+                    username=f'{self._faker.user_name()}_{number}',
+                    first_name=self._faker.first_name(),
+                    last_name=self._faker.last_name(),
+                    email=self._faker.email(),
+                    password=password,
+                )
+                for number in range(users)
+            ]
+        )
+        return [user.id for user in created]
+
+    def _create_rooms(self, rooms: int) -> list[int]:
+        created = Room.objects.bulk_create(
+            [
+                Room(
+                    number=number + 1,
+                    name=f'{self._faker.city()[:24]} {number + 1}',
+                    capacity=self._random.choice((2, 4, 6, 8, 10, 12, 20)),
+                )
+                for number in range(rooms)
+            ]
+        )
+        return [room.id for room in created]
+
+    @staticmethod
+    def _fit_working_hours(cursor: datetime, duration: timedelta) -> datetime:
+        day = cursor.date()
+        cursor = max(cursor, datetime.combine(day, WORKDAY_START, tzinfo=timezone.utc))
+        if day.weekday() < 5 and cursor + duration <= datetime.combine(
+            day, WORKDAY_END, tzinfo=timezone.utc
+        ):
+            return cursor
+        day += timedelta(days=1)
+        while day.weekday() >= 5:
+            day += timedelta(days=1)
+        return datetime.combine(day, WORKDAY_START, tzinfo=timezone.utc)
+
+    def _iter_room_periods(
+        self, start: datetime, count: int
+    ) -> Iterator[tuple[datetime, datetime]]:
+        # Bookings of one room follow each other with random gaps during working hours on
+        # weekdays, so they never overlap.
+        cursor = start
+        for _ in range(count):
+            cursor += timedelta(minutes=15 * self._random.randrange(0, 9))
+            duration = timedelta(minutes=self._random.choice(DURATIONS_MINUTES))
+            cursor = self._fit_working_hours(cursor, duration)
+            yield cursor, cursor + duration
+            cursor += duration
+
+    @staticmethod
+    def _insert_reservations(rows: list[tuple]):
+        columns = ', '.join(
+            connection.ops.quote_name(Reservation._meta.get_field(column).column)
+            for column in RESERVATION_COLUMNS
+        )
+        placeholders = ', '.join(['%s'] * len(RESERVATION_COLUMNS))
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {connection.ops.quote_name(Reservation._meta.db_table)} '
+                f'({columns}) VALUES ({placeholders})',
+                rows,
+            )
+
+    def seed_bookings(
+        self, rooms: int, reservations: int, users: int, start: datetime, now: datetime
+    ) -> int:
+        purposes = [self._faker.sentence(nb_words=4).rstrip('.') for _ in range(PURPOSES_POOL_SIZE)]
+        # Rows bypass the model fields, so datetimes are adapted for the database here.
+        adapt_datetime = connection.ops.adapt_datetimefield_value
+        created_at = adapt_datetime(now)
+        created = 0
+        with transaction.atomic():
+            user_ids = self._create_users(users)
+            room_ids = self._create_rooms(rooms)
+            batch = []
+            for index, room_id in enumerate(room_ids):
+                room_reservations = reservations // rooms + (index < reservations % rooms)
+                for reserved_from, reserved_to in self._iter_room_periods(start, room_reservations):
+                    if self._random.random() < CANCELLED_SHARE:
+                        status = Reservation.ReservationStatus.CANCELLED
+                    elif reserved_to <= now:
+                        status = Reservation.ReservationStatus.COMPLETED
+                    else:
+                        status = Reservation.ReservationStatus.ACTIVE
+                    batch.append(
+                        (
+                            self._random.choice(purposes),
+                            adapt_datetime(reserved_from),
+                            adapt_datetime(reserved_to),
+                            self._random.choice(user_ids),
+                            room_id,
+                            status,
+                            created_at,
+                            created_at,
+                        )
+                    )
+                    if len(batch) == SEED_BATCH_SIZE:
+                        self._insert_reservations(batch)
+                        created += len(batch)
+                        batch = []
+            if batch:
+                self._insert_reservations(batch)
+                created += len(batch)
+        return created
@@ -0,0 +1,185 @@
+from datetime import date, datetime, timedelta
+from itertools import islice
+from typing import Iterator
+
+from core.settings import SERIES_MAX_OCCURRENCES
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.request import Request
+
+import mrbs_app.api.exceptions as booking_exceptions
+import mrbs_app.serializers.booking as booking_serializers
+from mrbs_app.models import Reservation, ReservationSeries
+from mrbs_app.services.booking import BookingService
+from mrbs_app.services.locks import lock_room_row, room_lock
+from mrbs_app.signals import send_reservations_changed
+
+
+def _iter_daily_starts(series: ReservationSeries) -> Iterator[datetime]:
+    step = timedelta(days=series.interval)
+    current = series.reserved_from
+    while current <= series.until:
+        yield current
+        current += step
+
+
+def _iter_weekly_starts(series: ReservationSeries) -> Iterator[datetime]:
+    weekdays = sorted(set(series.weekdays)) or [series.reserved_from.weekday()]
+    step = timedelta(weeks=series.interval)
+    week_start = series.reserved_from - timedelta(days=series.reserved_from.weekday())
+    while week_start <= series.until:
+        for weekday in weekdays:
+            current = week_start + timedelta(days=weekday)
+            if current > series.until:
+                return
+            if current >= series.reserved_from:
+                yield current
+        week_start += step
+
+
+def iter_occurrences(series: ReservationSeries) -> Iterator[tuple[datetime, datetime]]:
+    duration = series.reserved_to - series.reserved_from
+    excluded_dates = set(series.excluded_dates)
+    if series.frequency == ReservationSeries.Frequency.DAILY:
+        starts = _iter_daily_starts(series)
+    else:
+        starts = _iter_weekly_starts(series)
+    for start in starts:
+        if start.date().isoformat() not in excluded_dates:
+            yield start, start + duration
+
+
+def find_conflicts(
+    occurrences: list[tuple[datetime, datetime]], reservations: list[tuple[datetime, datetime]]
+) -> list[tuple[datetime, datetime]]:
+    # Sort-and-sweep over two start-ordered lists of non-overlapping intervals: the ends are
+    # ordered too, so a single forward pointer over the reservations is enough.
+    conflicts = []
+    position = 0
+    for reserved_from, reserved_to in occurrences:
+        while position < len(reservations) and reservations[position][1] <= reserved_from:
+            position += 1
+        if position < len(reservations) and reservations[position][0] < reserved_to:
+            conflicts.append((reserved_from, reserved_to))
+    return conflicts
+
+
+class ReservationSeriesService(BookingService):
+    @staticmethod
+    def _get_active_series(series_id: int, user) -> ReservationSeries:
+        # Only the owner of a series, or staff, may change it; to anyone else it does not exist.
+        series = ReservationSeries.objects.filter(
+            pk=series_id, status=ReservationSeries.SeriesStatus.ACTIVE
+        )
+        if not user.is_staff:
+            series = series.filter(user=user)
+        try:
+            return series.get()
+        except ReservationSeries.DoesNotExist as exc:
+            raise booking_exceptions.ReservationNotFoundError from exc
+
+    def _expand_occurrences(self, series: ReservationSeries) -> list[tuple[datetime, datetime]]:
+        self._check_reserved_time(
+            reserved_from=series.reserved_from, reserved_to=series.reserved_to
+        )
+        occurrences = list(islice(iter_occurrences(series), SERIES_MAX_OCCURRENCES + 1))
+        if not occurrences:
+            raise booking_exceptions.ReservationTimeError
+        if len(occurrences) > SERIES_MAX_OCCURRENCES:
+            raise booking_exceptions.ReservationSeriesTooLongError
+        for previous, current in zip(occurrences, occurrences[1:]):
+            if previous[1] > current[0]:
+                raise booking_exceptions.ReservationTimeError
+        return occurrences
+
+    def _insert_series(
+        self, series: ReservationSeries, occurrences: list[tuple[datetime, datetime]]
+    ) -> ReservationSeries:
+        with room_lock(series.room_id), transaction.atomic():
+            lock_room_row(series.room_id)
+            booked = list(
+                self._get_active_reservations(
+                    room_id=series.room_id,
+                    reserved_from=occurrences[0][0],
+                    reserved_to=occurrences[-1][1],
+                )
+                .order_by('reserved_from')
+                .values_list('reserved_from', 'reserved_to')
+            )
+            if find_conflicts(occurrences, booked):
+                raise booking_exceptions.ReservationBusyError
+            series.save()
+            reservations = Reservation.objects.bulk_create(
+                [
+                    Reservation(
+                        purpose_of_booking=series.purpose_of_booking,
+                        reserved_from=reserved_from,
+                        reserved_to=reserved_to,
+                        status=Reservation.ReservationStatus.ACTIVE,
+                        user_id=series.user_id,
+                        room_id=series.room_id,
+                        series=series,
+                    )
+                    for reserved_from, reserved_to in occurrences
+                ]
+            )
+            send_reservations_changed(sender=Reservation, reservations=reservations)
+        return series
+
+    def _cancel_series_reservations(self, series: ReservationSeries, **filters):
+        reservations = Reservation.objects.filter(
+            series=series, status=Reservation.ReservationStatus.ACTIVE, **filters
+        )
+        cancelled = list(reservations.only('id', 'room_id', 'reserved_from', 'reserved_to'))
+        reservations.update(
+            status=Reservation.ReservationStatus.CANCELLED, updated_at=timezone.now()
+        )
+        send_reservations_changed(sender=Reservation, reservations=cancelled)
+
+    def create_series(self, request: Request) -> tuple[ReservationSeries, int]:
+        series_serializer = booking_serializers.ReservationSeriesCreateSerializer(data=request.data)
+        series_serializer.is_valid(raise_exception=True)
+        data = series_serializer.validated_data
+
+        def _make_series() -> ReservationSeries:
+            return ReservationSeries(
+                purpose_of_booking=data['purpose_of_booking'],
+                reserved_from=data['reserved_from'],
+                reserved_to=data['reserved_to'],
+                frequency=data['frequency'],
+                interval=data['interval'],
+                weekdays=data['weekdays'],
+                until=data['until'],
+                status=ReservationSeries.SeriesStatus.ACTIVE,
+                user=request.user,
+                room_id=data['room_id'],
+            )
+
+        occurrences = self._expand_occurrences(_make_series())
+        series = self._run_with_retries(lambda: self._insert_series(_make_series(), occurrences))
+        return series, len(occurrences)
+
+    def _skip_occurrence(self, series_id: int, user, skipped_date: date):
+        with transaction.atomic():
+            series = self._get_active_series(series_id, user)
+            if skipped_date.isoformat() not in series.excluded_dates:
+                series.excluded_dates.append(skipped_date.isoformat())
+                series.save(update_fields=['excluded_dates', 'updated_at'])
+            self._cancel_series_reservations(series, reserved_from__date=skipped_date)
+
+    def skip_occurrence(self, series_id: int, request: Request):
+        skip_serializer = booking_serializers.ReservationSeriesSkipSerializer(data=request.data)
+        skip_serializer.is_valid(raise_exception=True)
+        skipped_date: date = skip_serializer.validated_data['date']
+
+        self._run_with_retries(lambda: self._skip_occurrence(series_id, request.user, skipped_date))
+
+    def _cancel_series(self, series_id: int, user):
+        with transaction.atomic():
+            series = self._get_active_series(series_id, user)
+            series.status = ReservationSeries.SeriesStatus.CANCELLED
+            series.save(update_fields=['status', 'updated_at'])
+            self._cancel_series_reservations(series, reserved_from__gte=timezone.now())
+
+    def cancel_series(self, series_id: int, request: Request):
+        self._run_with_retries(lambda: self._cancel_series(series_id, request.user))
@@ -0,0 +1,47 @@
+import time
+from datetime import datetime
+
+from core.settings import RESERVATION_SWEEP_CHUNK_SIZE
+from django.db import transaction
+from django.utils import timezone
+
+from mrbs_app.models import Reservation
+from mrbs_app.services.booking import BookingService
+from mrbs_app.signals import send_reservations_changed
+
+
+class ReservationSweepService(BookingService):
+    def _complete_chunk(self, now: datetime, chunk_size: int) -> int:
+        with transaction.atomic():
+            ended = list(
+                Reservation.objects.filter(
+                    status=Reservation.ReservationStatus.ACTIVE, reserved_to__lte=now
+                )
+                .order_by('reserved_to')
+                .only('id', 'room_id', 'reserved_from', 'reserved_to')[:chunk_size]
+            )
+            if not ended:
+                return 0
+            # The status condition is repeated so that a reservation cancelled meanwhile
+            # stays cancelled.
+            completed = Reservation.objects.filter(
+                pk__in=[reservation.id for reservation in ended],
+                status=Reservation.ReservationStatus.ACTIVE,
+            ).update(status=Reservation.ReservationStatus.COMPLETED, updated_at=timezone.now())
+            send_reservations_changed(sender=Reservation, reservations=ended)
+        return completed
+
+    def complete_ended_reservations(
+        self, now: datetime = None, chunk_size: int = RESERVATION_SWEEP_CHUNK_SIZE
+    ) -> int:
+        # Every chunk is a short transaction of its own, so writers are never blocked for long.
+        now = now or timezone.now()
+        total = 0
+        while completed := self._run_with_retries(lambda: self._complete_chunk(now, chunk_size)):
+            total += completed
+        return total
+
+    def run_sweeper(self, interval: float, chunk_size: int):
+        while True:
+            self.complete_ended_reservations(chunk_size=chunk_size)
+            time.sleep(interval)
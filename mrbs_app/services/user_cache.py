@@ -0,0 +1,59 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable
+
+from core.settings import AUTH_USER_CACHE_SIZE, AUTH_USER_CACHE_TTL
+
+
+class UserCache:
+    # In-process LRU cache of authenticated users, keyed by user id and token version, with a
+    # TTL that bounds how long a change made by another process can go unnoticed. Entries are
+    # stored with the generation read before the database lookup: a lookup that raced with an
+    # invalidation is dropped instead of caching the user as it was before the change.
+    def __init__(self, max_size: int = AUTH_USER_CACHE_SIZE, ttl: float = AUTH_USER_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[Hashable, Hashable], tuple[float, object]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: Hashable, token_version: Hashable = None):
+        key = (user_id, token_version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, user_id: Hashable, token_version: Hashable, user, generation: int):
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[(user_id, token_version)] = (time.monotonic() + self.ttl, user)
+            self._entries.move_to_end((user_id, token_version))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: Hashable):
+        with self._lock:
+            self.generation += 1
+            for key in [key for key in self._entries if key[0] == user_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+user_cache = UserCache()
@@ -0,0 +1,115 @@
+import copy
+from typing import Iterable
+
+from core.settings import SQLITE_PRAGMAS
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+from mrbs_app.middleware import count_request_queries
+from mrbs_app.models import Reservation, ReservationChange
+from mrbs_app.services.availability import get_availability_engine
+from mrbs_app.services.daily_occupancy import refresh_daily_occupancy
+from mrbs_app.services.events import reservation_events
+from mrbs_app.services.report_cache import report_cache
+from mrbs_app.services.user_cache import user_cache
+
+# Sent after commit with `reservations`, a list of created, changed or cancelled reservations,
+# and `changes`, their entries in the change log. Individual save() and delete() calls are
+# covered by the model signals below; code that writes with bulk_create() or QuerySet.update()
+# must call send_reservations_changed() itself, inside the transaction of the write.
+reservations_changed = Signal()
+
+
+def _log_reservation_changes(reservations: list[Reservation]) -> list[ReservationChange]:
+    changed = {reservation.pk: reservation.room_id for reservation in reservations}
+    return ReservationChange.objects.bulk_create(
+        [
+            ReservationChange(reservation_id=reservation_id, room_id=room_id)
+            for reservation_id, room_id in changed.items()
+        ]
+    )
+
+
+def send_reservations_changed(sender, reservations: Iterable[Reservation]):
+    reservations = list(reservations)
+    if reservations:
+        # The change log, the data versions and the daily occupancy rollup are written in the
+        # transaction of the change: a change commits together with them or not at all, so the
+        # feed never misses one, the cached reports and ETags of every process are invalidated
+        # and the rollup never drifts from the reservations.
+        changes = _log_reservation_changes(reservations)
+        report_cache.bump_versions(reservations, version=max(change.id for change in changes))
+        refresh_daily_occupancy(reservations)
+        # Robust: a failing receiver is logged instead of failing a write that already
+        # committed.
+        transaction.on_commit(
+            lambda: reservations_changed.send(
+                sender=sender, reservations=reservations, changes=changes
+            ),
+            robust=True,
+        )
+
+
+@receiver(pre_save, sender=Reservation)
+def _remember_previous_range(sender, instance: Reservation, update_fields=None, **kwargs):
+    # The data versions of the days a reservation is moved away from must be bumped as well.
+    instance._previous_range = None
+    if instance._state.adding or (
+        update_fields is not None
+        and not {'room', 'room_id', 'reserved_from', 'reserved_to'} & set(update_fields)
+    ):
+        return
+    instance._previous_range = (
+        Reservation.objects.filter(pk=instance.pk)
+        .values_list('room_id', 'reserved_from', 'reserved_to')
+        .first()
+    )
+
+
+@receiver(post_save, sender=Reservation)
+def _reservation_written(sender, instance: Reservation, **kwargs):
+    send_reservations_changed(sender=sender, reservations=[instance])
+
+
+@receiver(post_delete, sender=Reservation)
+def _reservation_deleted(sender, instance: Reservation, **kwargs):
+    # Django clears the primary key of a deleted instance once the delete signals are sent,
+    # before the receivers of reservations_changed run; the copy keeps it.
+    send_reservations_changed(sender=sender, reservations=[copy.copy(instance)])
+
+
+@receiver(reservations_changed)
+def _update_availability_engine(sender, reservations: list[Reservation], **kwargs):
+    get_availability_engine().update(reservations)
+
+
+@receiver(reservations_changed)
+def _publish_reservation_events(sender, changes: list[ReservationChange], **kwargs):
+    reservation_events.publish(changes)
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def _invalidate_user_cache(sender, instance, **kwargs):
+    user_cache.invalidate(instance.pk)
+    # Again after commit: a concurrent request may have cached the row it read before.
+    transaction.on_commit(lambda: user_cache.invalidate(instance.pk))
+
+
+@receiver(connection_created)
+def _configure_sqlite_connection(sender, connection, **kwargs):
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            for name, value in SQLITE_PRAGMAS.items():
+                cursor.execute(f'PRAGMA {name} = {value}')
+
+
+@receiver(connection_created)
+def _count_request_queries(sender, connection, **kwargs):
+    # The wrapper list belongs to the DatabaseWrapper of the thread, which outlives its
+    # connections: a reconnect must not install the wrapper again.
+    if count_request_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_request_queries)
@@ -7,6 +7,26 @@ from pytest import fixture
 from rest_framework.test import APIClient
 
 from mrbs_app.models import Reservation, Room
+from mrbs_app.services.report_store import report_store
+from mrbs_app.services.user_cache import user_cache
+
+# The usual start of the reservations of tests, a Monday morning.
+START = datetime.datetime(2024, 1, 1, 9, tzinfo=datetime.timezone.utc)
+
+
+@fixture(autouse=True)
+def _clear_user_cache():
+    # Test databases reuse user ids, cached users must not leak between tests.
+    user_cache.clear()
+
+
+@fixture(autouse=True)
+def report_dir(tmp_path_factory, mocker):
+    # Every test stores its reports in an empty directory of its own.
+    directory = tmp_path_factory.mktemp('reports')
+    mocker.patch('mrbs_app.services.report_store.REPORT_STORE_DIR', str(directory))
+    report_store.clear()
+    return directory
 
 
 @fixture()
@@ -55,17 +75,49 @@ def room_creator(faker) -> typing.Callable[[], Room]:
 
 
 @pytest.fixture
-def reservation_creator(user, room_creator, faker) -> typing.Callable[[], Reservation]:
-    def _create() -> Reservation:
-        reservation = Reservation(
-            reserved_from=datetime.datetime.utcnow(),
-            reserved_to=datetime.datetime.utcnow() + datetime.timedelta(hours=1),
-            purpose_of_booking=faker.unique.bothify(text='purpose_???'),
-            user=user,
-            room=room_creator(),
-            status=Reservation.ReservationStatus.ACTIVE,
+def reservation_creator(user, room_creator, faker) -> typing.Callable[..., Reservation]:
+    # Without arguments books a new room for the next hour; tests that need exact data pass the
+    # start, the end (an hour after the start by default), the room, the status and so on.
+    def _create(
+        reserved_from: datetime.datetime = None,
+        reserved_to: datetime.datetime = None,
+        **fields,
+    ) -> Reservation:
+        reservation = _build_reservation(
+            user, room_creator, faker, reserved_from, reserved_to, **fields
         )
         reservation.save()
         return reservation
 
     return _create
+
+
+@pytest.fixture
+def reservation_bulk_creator(user, room_creator, faker) -> typing.Callable[..., list]:
+    # Takes the (reserved_from, reserved_to, fields) of every reservation, saves them in one
+    # query without the signals of Reservation.save().
+    def _create(reservations: typing.Iterable[tuple]) -> list[Reservation]:
+        return Reservation.objects.bulk_create(
+            [
+                _build_reservation(user, room_creator, faker, reserved_from, reserved_to, **fields)
+                for reserved_from, reserved_to, fields in reservations
+            ]
+        )
+
+    return _create
+
+
+def _build_reservation(
+    user, room_creator, faker, reserved_from, reserved_to, **fields
+) -> Reservation:
+    reserved_from = reserved_from or datetime.datetime.utcnow()
+    fields.setdefault('user', user)
+    fields.setdefault('status', Reservation.ReservationStatus.ACTIVE)
+    fields.setdefault('purpose_of_booking', faker.unique.bothify(text='purpose_???'))
+    if 'room' not in fields and 'room_id' not in fields:
+        fields['room'] = room_creator()
+    return Reservation(
+        reserved_from=reserved_from,
+        reserved_to=reserved_to or reserved_from + datetime.timedelta(hours=1),
+        **fields,
+    )
@@ -0,0 +1,81 @@
+import datetime as dt
+import random
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from mrbs_app.api.error_messages import HTTPErrorMessages
+from mrbs_app.models import Reservation
+from mrbs_app.services.analytics import compute_booked_seconds, make_bucket_boundaries
+from mrbs_app.tests.conftest import START
+
+
+def test_make_bucket_boundaries():
+    boundaries = make_bucket_boundaries(
+        START + dt.timedelta(minutes=30), START + dt.timedelta(hours=2, minutes=10), 'hour'
+    )
+    assert boundaries == [
+        START + dt.timedelta(minutes=30),
+        START + dt.timedelta(hours=1),
+        START + dt.timedelta(hours=2),
+        START + dt.timedelta(hours=2, minutes=10),
+    ]
+
+
+def test_compute_booked_seconds_matches_brute_force():
+    rng = random.Random(0)
+    intervals = []
+    for _ in range(200):
+        start = rng.uniform(0, 10_000)
+        intervals.append((start, start + rng.uniform(1, 500)))
+    boundaries = [0.0, *sorted(rng.uniform(0, 11_000) for _ in range(30)), 11_000.0]
+
+    booked = compute_booked_seconds(
+        sorted(start for start, _ in intervals), sorted(end for _, end in intervals), boundaries
+    )
+    expected = [
+        sum(max(0.0, min(end, later) - max(start, earlier)) for start, end in intervals)
+        for earlier, later in zip(boundaries, boundaries[1:])
+    ]
+    assert booked == pytest.approx(expected)
+
+
+@pytest.mark.django_db
+def test_occupancy(room_creator, reservation_creator, user, api_client, django_assert_num_queries):
+    busy_room, free_room = room_creator(), room_creator()
+    for start_minutes, end_minutes, reservation_status in (
+        (-30, 30, Reservation.ReservationStatus.COMPLETED),
+        (45, 150, Reservation.ReservationStatus.ACTIVE),
+        (150, 160, Reservation.ReservationStatus.CANCELLED),
+    ):
+        reservation_creator(
+            START + dt.timedelta(minutes=start_minutes),
+            START + dt.timedelta(minutes=end_minutes),
+            room=busy_room,
+            status=reservation_status,
+        )
+
+    api_client.force_authenticate(user=user)
+    params = {
+        'from': START.isoformat(),
+        'to': (START + dt.timedelta(hours=3)).isoformat(),
+        'granularity': 'hour',
+    }
+    with django_assert_num_queries(2):
+        response = api_client.get(reverse('analytics-occupancy'), data=params)
+    assert response.status_code == status.HTTP_200_OK
+    occupancy = {room['room_id']: room['buckets'] for room in response.json()}
+    assert [bucket['occupied_minutes'] for bucket in occupancy[busy_room.id]] == [45, 60, 30]
+    assert occupancy[busy_room.id][0]['utilization'] == 0.75
+    assert [bucket['occupied_minutes'] for bucket in occupancy[free_room.id]] == [0, 0, 0]
+
+    response = api_client.get(reverse('analytics-occupancy'), data={**params, 'granularity': 'day'})
+    assert response.json()[0]['buckets'][0]['occupied_minutes'] == 135
+
+    response = api_client.get(
+        reverse('analytics-occupancy'),
+        data={**params, 'to': (START + dt.timedelta(days=60)).isoformat()},
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert tuple(response.json()) == HTTPErrorMessages.ANALYTICS_WINDOW_TOO_LONG
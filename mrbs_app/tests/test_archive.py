@@ -0,0 +1,100 @@
+import csv
+import datetime as dt
+import io
+
+import pytest
+from django.core.management import call_command
+from django.db import OperationalError
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from mrbs_app.models import (
+    Reservation,
+    ReservationArchive,
+    ReservationChange,
+    RoomDailyOccupancy,
+)
+from mrbs_app.services.archive import ReservationArchiveService
+from mrbs_app.services.report_cache import report_cache
+
+
+@pytest.mark.django_db
+def test_archive_reservations(room_creator, user, api_client, django_assert_num_queries):
+    room = room_creator()
+    now = timezone.now().replace(microsecond=0)
+    reservations = Reservation.objects.bulk_create(
+        [
+            Reservation(
+                purpose_of_booking=f'meeting {days}',
+                reserved_from=now - dt.timedelta(days=days),
+                reserved_to=now - dt.timedelta(days=days) + dt.timedelta(hours=1),
+                user=user,
+                room=room,
+                status=Reservation.ReservationStatus.COMPLETED,
+            )
+            for days in (100, 90, 80, 70, 60, 10, 0)
+        ]
+    )
+    call_command('rebuild_daily_occupancy')
+    rollup = list(RoomDailyOccupancy.objects.order_by('date').values_list('date', 'booked_minutes'))
+    window = (now - dt.timedelta(days=365), now - dt.timedelta(days=30))
+    version = report_cache.get_version(*window, room_id=room.id)
+
+    archived = list(
+        ReservationArchiveService().archive_reservations(
+            older_than=now - dt.timedelta(days=30), chunk_size=2
+        )
+    )
+    assert archived == [2, 2, 1]
+    assert sorted(ReservationArchive.objects.values_list('id', flat=True)) == [
+        reservation.id for reservation in reservations[:5]
+    ]
+    assert sorted(Reservation.objects.values_list('id', flat=True)) == [
+        reservation.id for reservation in reservations[5:]
+    ]
+    assert ReservationArchive.objects.get(pk=reservations[0].id).reserved_from == (
+        reservations[0].reserved_from
+    )
+    # The archived reservations leave the list of the period: its ETag changes.
+    assert report_cache.get_version(*window, room_id=room.id) > version
+    assert sorted(ReservationChange.objects.values_list('reservation_id', flat=True)) == [
+        reservation.id for reservation in reservations[:5]
+    ]
+
+    call_command('archive_reservations', older_than=30)
+    assert ReservationArchive.objects.count() == 5
+
+    api_client.force_authenticate(user=user)
+    # The data version of the period for the ETag, and the rows.
+    with django_assert_num_queries(2):
+        response = api_client.get(
+            reverse('report'),
+            data={
+                'reserved_from': (now - dt.timedelta(days=365)).isoformat(),
+                'reserved_to': (now + dt.timedelta(days=1)).isoformat(),
+                'export': 'csv',
+            },
+        )
+        content = b''.join(response.streaming_content).decode()
+    assert response.status_code == status.HTTP_200_OK
+    rows = list(csv.DictReader(io.StringIO(content)))
+    assert [int(row['id']) for row in rows] == [reservation.id for reservation in reservations]
+    assert rows[0]['user'] == user.username
+
+    call_command('rebuild_daily_occupancy')
+    assert (
+        list(RoomDailyOccupancy.objects.order_by('date').values_list('date', 'booked_minutes'))
+        == rollup
+    )
+
+
+def test_archive_chunk_retried_on_locked_database(mocker):
+    mocker.patch('mrbs_app.services.locks.RESERVATION_RETRY_BACKOFF', 0)
+    archive_chunk = mocker.patch.object(
+        ReservationArchiveService,
+        '_archive_chunk',
+        side_effect=[OperationalError('database is locked'), [{'id': 1}], []],
+    )
+    assert list(ReservationArchiveService().archive_reservations(older_than=timezone.now())) == [1]
+    assert archive_chunk.call_count == 3
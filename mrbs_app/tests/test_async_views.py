@@ -0,0 +1,115 @@
+import datetime as dt
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import reverse
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+
+from mrbs_app.models import ReportJob, Reservation
+from mrbs_app.services.availability import IntervalIndexAvailabilityEngine, ORMAvailabilityEngine
+from mrbs_app.tests.conftest import START
+
+# The ASGI handler runs the ORM on its own connection, which cannot see data created inside a
+# test transaction.
+
+
+@pytest.fixture
+def async_get(user):
+    headers = {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+
+    def _get(path: str, data: dict = None):
+        return async_to_sync(AsyncClient().get)(path, data=data, headers=headers)
+
+    return _get
+
+
+@pytest.fixture
+def booked_room(room_creator, user):
+    room = room_creator()
+    Reservation.objects.bulk_create(
+        [
+            Reservation(
+                purpose_of_booking=f'meeting {hour}',
+                reserved_from=START + dt.timedelta(hours=hour),
+                reserved_to=START + dt.timedelta(hours=hour, minutes=30),
+                user=user,
+                room=room,
+                status=Reservation.ReservationStatus.ACTIVE,
+            )
+            for hour in range(5)
+        ]
+    )
+    return room
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_views_require_token():
+    response = async_to_sync(AsyncClient().get)(reverse('async-availability'))
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_reservation_list_matches_sync(booked_room, user, api_client, async_get):
+    params = {
+        'room_id': booked_room.id,
+        'reserved_from': START.isoformat(),
+        'reserved_to': (START + dt.timedelta(days=1)).isoformat(),
+        'limit': 3,
+    }
+    api_client.force_authenticate(user=user)
+    sync_response = api_client.get(reverse('reservations'), data=params)
+
+    response = async_get(reverse('async-reservations'), data=params)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == sync_response.json()
+    assert response['X-Next-Cursor'] == sync_response['X-Next-Cursor']
+
+    response = async_get(
+        reverse('async-reservations'), data={**params, 'cursor': response['X-Next-Cursor']}
+    )
+    assert len(response.json()) == 2
+    assert 'X-Next-Cursor' not in response
+
+    response = async_get(reverse('async-reservations'), data={**params, 'cursor': 'junk'})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize('engine_class', [ORMAvailabilityEngine, IntervalIndexAvailabilityEngine])
+def test_async_availability(engine_class, booked_room, user, api_client, async_get, mocker):
+    mocker.patch('mrbs_app.services.availability._engine', engine_class())
+    api_client.force_authenticate(user=user)
+    for start_minutes, available in ((15, False), (30, True), (-30, True), (-15, False)):
+        params = {
+            'room_id': booked_room.id,
+            'reserved_from': (START + dt.timedelta(minutes=start_minutes)).isoformat(),
+            'reserved_to': (START + dt.timedelta(minutes=start_minutes + 30)).isoformat(),
+        }
+        response = async_get(reverse('async-availability'), data=params)
+        assert response.json() == {'room_id': booked_room.id, 'available': available}
+        assert api_client.get(reverse('availability'), data=params).json() == response.json()
+
+    response = async_get(
+        reverse('async-availability'),
+        data={**params, 'reserved_to': params['reserved_from']},
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_report_job(user, async_get):
+    job = ReportJob.objects.create(
+        params_key='key',
+        reserved_from=START,
+        reserved_to=START + dt.timedelta(days=1),
+        user=user,
+        status=ReportJob.JobStatus.PENDING,
+    )
+    response = async_get(reverse('async-report-job', kwargs={'job_id': job.id}))
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()['status'] == ReportJob.JobStatus.PENDING
+
+    response = async_get(reverse('async-report-job', kwargs={'job_id': job.id + 1}))
+    assert response.status_code == status.HTTP_404_NOT_FOUND
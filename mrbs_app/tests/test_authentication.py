@@ -0,0 +1,73 @@
+import datetime as dt
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+
+from mrbs_app.services.user_cache import UserCache, user_cache
+from mrbs_app.tests.conftest import START
+
+
+def _get_availability(api_client, room):
+    with CaptureQueriesContext(connection) as captured:
+        response = api_client.get(
+            reverse('availability'),
+            data={
+                'room_id': room.id,
+                'reserved_from': START.isoformat(),
+                'reserved_to': (START + dt.timedelta(hours=1)).isoformat(),
+            },
+        )
+    auth_queries = [query for query in captured if 'auth_user' in query['sql']]
+    return response, auth_queries
+
+
+@pytest.mark.django_db
+def test_cached_jwt_authentication(api_client, user, room_creator):
+    room = room_creator()
+    api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+
+    response, auth_queries = _get_availability(api_client, room)
+    assert response.status_code == status.HTTP_200_OK
+    assert len(auth_queries) == 1
+
+    for _ in range(3):
+        response, auth_queries = _get_availability(api_client, room)
+        assert response.status_code == status.HTTP_200_OK
+        assert auth_queries == []
+    assert user_cache.hits == 3
+
+    user.first_name = 'Renamed'
+    user.save()
+    response, auth_queries = _get_availability(api_client, room)
+    assert response.status_code == status.HTTP_200_OK
+    assert len(auth_queries) == 1
+
+    user.is_active = False
+    user.save()
+    response, _ = _get_availability(api_client, room)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_user_cache_lru_and_ttl(mocker):
+    monotonic = mocker.patch('mrbs_app.services.user_cache.time.monotonic', return_value=0.0)
+    cache = UserCache(max_size=2, ttl=10.0)
+    for user_id in (1, 2):
+        cache.set(user_id, None, f'user {user_id}', cache.generation)
+    assert cache.get(1) == 'user 1'
+
+    cache.set(3, None, 'user 3', cache.generation)
+    assert cache.get(2) is None
+    assert cache.get(1) == 'user 1'
+    assert cache.get(1, 'other token version') is None
+
+    stale_generation = cache.generation
+    cache.invalidate(3)
+    cache.set(3, None, 'user 3 before save', stale_generation)
+    assert cache.get(3) is None
+
+    monotonic.return_value = 10.0
+    assert cache.get(1) is None
@@ -0,0 +1,102 @@
+import datetime as dt
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from mrbs_app.models import Reservation
+from mrbs_app.services.availability import (
+    IntervalIndexAvailabilityEngine,
+    ORMAvailabilityEngine,
+    RoomIntervalIndex,
+)
+from mrbs_app.services.booking import BookingService
+from mrbs_app.tests.conftest import START
+
+
+def _hours(start: float, end: float) -> tuple[dt.datetime, dt.datetime]:
+    return START + dt.timedelta(hours=start), START + dt.timedelta(hours=end)
+
+
+def test_room_interval_index_overlaps():
+    index = RoomIntervalIndex([(1, *_hours(0, 1)), (2, *_hours(2, 3))])
+    assert index.overlaps(*_hours(0.5, 1.5))
+    assert index.overlaps(*_hours(-1, 5))
+    assert not index.overlaps(*_hours(1, 2))
+    assert not index.overlaps(*_hours(3, 4))
+
+    index.add(3, *_hours(1, 2))
+    assert index.overlaps(*_hours(1, 2))
+    index.remove(3, _hours(1, 2)[0])
+    assert not index.overlaps(*_hours(1, 2))
+    assert len(index) == 2
+
+
+@pytest.mark.django_db
+def test_engines_agree(faker, room_creator, user):
+    room = room_creator()
+    Reservation.objects.bulk_create(
+        [
+            Reservation(
+                reserved_from=_hours(i, i + 0.5)[0],
+                reserved_to=_hours(i, i + 0.5)[1],
+                purpose_of_booking=faker.bothify(text='purpose_???'),
+                user=user,
+                room=room,
+                status=(
+                    Reservation.ReservationStatus.CANCELLED
+                    if i % 3 == 0
+                    else Reservation.ReservationStatus.ACTIVE
+                ),
+            )
+            for i in range(10)
+        ]
+    )
+    orm_engine, index_engine = ORMAvailabilityEngine(), IntervalIndexAvailabilityEngine()
+    for start in range(0, 40):
+        period = _hours(start / 4, start / 4 + 0.25)
+        assert orm_engine.is_available(room.id, *period) == index_engine.is_available(
+            room.id, *period
+        )
+
+
+def test_interval_index_follows_create_and_cancel(
+    faker, room_creator, user, api_client, mocker, django_capture_on_commit_callbacks
+):
+    engine = IntervalIndexAvailabilityEngine()
+    mocker.patch('mrbs_app.services.availability._engine', engine)
+    room = room_creator()
+    reserved_from, reserved_to = _hours(0, 1)
+    data = {
+        'room_id': room.id,
+        'purpose_of_booking': faker.bothify('Purpose_???'),
+        'reserved_from': reserved_from,
+        'reserved_to': reserved_to,
+    }
+    api_client.force_authenticate(user=user)
+    assert engine.is_available(room.id, reserved_from, reserved_to)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = api_client.post(reverse('reservation'), data=data)
+    assert response.status_code == status.HTTP_201_CREATED
+    assert not engine.is_available(room.id, reserved_from, reserved_to)
+
+    response = api_client.post(reverse('reservation'), data=data)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    with django_capture_on_commit_callbacks(execute=True):
+        BookingService().cancel_reservation(Reservation.objects.get().id)
+    assert engine.is_available(room.id, reserved_from, reserved_to)
+
+    # Moved into the checked period by a plain save(), as the admin does.
+    reservation = Reservation.objects.get()
+    reservation.status = Reservation.ReservationStatus.ACTIVE
+    reservation.reserved_from, reservation.reserved_to = _hours(2, 3)
+    with django_capture_on_commit_callbacks(execute=True):
+        reservation.save()
+    assert engine.is_available(room.id, reserved_from, reserved_to)
+    assert not engine.is_available(room.id, *_hours(2.5, 3.5))
+
+    with django_capture_on_commit_callbacks(execute=True):
+        reservation.delete()
+    assert engine.is_available(room.id, *_hours(2.5, 3.5))
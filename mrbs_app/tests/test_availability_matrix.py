@@ -0,0 +1,103 @@
+import base64
+import datetime as dt
+import random
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from mrbs_app.api.error_messages import HTTPErrorMessages
+from mrbs_app.models import Reservation, Room
+from mrbs_app.services.availability_matrix import encode_slots, make_busy_mask
+from mrbs_app.tests.conftest import START
+
+SLOT = dt.timedelta(minutes=15)
+
+
+def _at(minutes: int) -> dt.datetime:
+    return START + dt.timedelta(minutes=minutes)
+
+
+def test_make_busy_mask_matches_brute_force():
+    rng = random.Random(0)
+    slots = 40
+    for _ in range(500):
+        reserved_from = _at(rng.randint(-100, 700))
+        reserved_to = reserved_from + dt.timedelta(minutes=rng.randint(1, 200))
+        bits = make_busy_mask(reserved_from, reserved_to, START, SLOT, slots)
+        expected = [
+            reserved_from < START + SLOT * (index + 1) and reserved_to > START + SLOT * index
+            for index in range(slots)
+        ]
+        assert [bool(bits >> index & 1) for index in range(slots)] == expected
+
+
+def test_encode_slots():
+    bits = 0b1100_0110
+    assert encode_slots(bits, 10, 'rle') == [1, 2, 3, 2, 2]
+    assert encode_slots(bits | 1, 10, 'rle') == [0, 3, 3, 2, 2]
+    assert encode_slots(0, 10, 'rle') == [10]
+    assert base64.b64decode(encode_slots(bits, 10, 'bitmap')) == bytes([0b1100_0110, 0])
+
+
+@pytest.mark.django_db
+def test_availability_matrix(reservation_bulk_creator, user, api_client, django_assert_num_queries):
+    busy = Room.objects.create(number=1, name='Busy', capacity=4)
+    free = Room.objects.create(number=2, name='Free', capacity=12)
+    reservation_bulk_creator(
+        (reserved_from, reserved_to, {'room': room, 'status': reservation_status})
+        for room, reserved_from, reserved_to, reservation_status in (
+            (busy, _at(-30), _at(20), Reservation.ReservationStatus.ACTIVE),
+            (busy, _at(45), _at(60), Reservation.ReservationStatus.COMPLETED),
+            (busy, _at(60), _at(90), Reservation.ReservationStatus.CANCELLED),
+            (free, _at(0), _at(10), Reservation.ReservationStatus.CANCELLED),
+        )
+    )
+    api_client.force_authenticate(user=user)
+    params = {'from': _at(0).isoformat(), 'to': _at(120).isoformat(), 'slot': '15m'}
+    with django_assert_num_queries(1):
+        response = api_client.get(reverse('availability-matrix'), data=params)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        'from': '2024-01-01T09:00:00Z',
+        'to': '2024-01-01T11:00:00Z',
+        'slot_minutes': 15,
+        'slots': 8,
+        'encoding': 'rle',
+        'all_busy': [8],
+        'rooms': [
+            {
+                'room_id': busy.id,
+                'number': 1,
+                'name': 'Busy',
+                'capacity': 4,
+                'busy': [0, 2, 1, 1, 4],
+            },
+            {'room_id': free.id, 'number': 2, 'name': 'Free', 'capacity': 12, 'busy': [8]},
+        ],
+    }
+
+    response = api_client.get(
+        reverse('availability-matrix'), data={**params, 'slot': '1h', 'encoding': 'bitmap'}
+    )
+    rooms = response.json()['rooms']
+    assert [base64.b64decode(room['busy']) for room in rooms] == [b'\x01', b'\x00']
+
+
+@pytest.mark.django_db
+def test_availability_matrix_rejects_invalid_params(user, api_client):
+    api_client.force_authenticate(user=user)
+    params = {'from': _at(0).isoformat(), 'to': _at(60 * 24 * 30).isoformat(), 'slot': '5m'}
+
+    response = api_client.get(reverse('availability-matrix'), data=params)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert tuple(response.json()) == HTTPErrorMessages.AVAILABILITY_MATRIX_TOO_LARGE
+
+    for slot in ('15s', '99999999999h'):
+        response = api_client.get(reverse('availability-matrix'), data={**params, 'slot': slot})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'slot' in response.json()
+
+    response = api_client.get(reverse('availability-matrix'), data={**params, 'slot': '99999h'})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()['slots'] == 1
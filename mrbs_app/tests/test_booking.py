@@ -109,3 +109,55 @@ def test_get_reservations_empty(faker, user, api_client):
     assert response.status_code == status.HTTP_200_OK
     assert len(response_data) == 0
     assert response_data == []
+
+
+def test_get_reservations_pages(faker, room_creator, user, api_client):
+    room = room_creator()
+    reserved_time = dt.datetime(2024, 1, 1, 9, tzinfo=dt.timezone.utc)
+    fake_reservations = Reservation.objects.bulk_create(
+        [
+            Reservation(
+                reserved_from=reserved_time + dt.timedelta(hours=i // 2, minutes=30 * (i % 2)),
+                reserved_to=reserved_time + dt.timedelta(hours=i // 2, minutes=30 * (i % 2) + 30),
+                purpose_of_booking=faker.unique.bothify(text='purpose_???'),
+                user=user,
+                room=room,
+                status=Reservation.ReservationStatus.ACTIVE,
+            )
+            for i in range(7)
+        ]
+    )
+    url = reverse('reservations')
+    params = {
+        'reserved_from': reserved_time.isoformat(),
+        'reserved_to': (reserved_time + dt.timedelta(days=1)).isoformat(),
+        'room_id': room.id,
+        'limit': 3,
+    }
+    api_client.force_authenticate(user=user)
+
+    received = []
+    while True:
+        response = api_client.get(url, data=params)
+        assert response.status_code == status.HTTP_200_OK
+        received.extend(reservation['id'] for reservation in response.json())
+        if 'X-Next-Cursor' not in response:
+            break
+        assert 'rel="next"' in response['Link']
+        params['cursor'] = response['X-Next-Cursor']
+    assert received == [reservation.id for reservation in fake_reservations]
+
+
+def test_get_reservations_invalid_cursor(user, api_client):
+    reserved_time = dt.datetime(2024, 1, 1, 9, tzinfo=dt.timezone.utc)
+    api_client.force_authenticate(user=user)
+    response = api_client.get(
+        reverse('reservations'),
+        data={
+            'reserved_from': reserved_time.isoformat(),
+            'reserved_to': (reserved_time + dt.timedelta(days=1)).isoformat(),
+            'room_id': 1,
+            'cursor': 'not-a-cursor',
+        },
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,72 @@
+import datetime as dt
+
+from django.urls import reverse
+from rest_framework import status
+
+from mrbs_app.api.error_messages import HTTPErrorMessages
+from mrbs_app.models import Reservation
+from mrbs_app.tests.conftest import START
+
+
+def _item(room_id: int, start: float, end: float) -> dict:
+    return {
+        'room_id': room_id,
+        'purpose_of_booking': 'sync',
+        'reserved_from': (START + dt.timedelta(hours=start)).isoformat(),
+        'reserved_to': (START + dt.timedelta(hours=end)).isoformat(),
+    }
+
+
+def test_create_reservations_bulk(room_creator, user, api_client):
+    first_room, second_room = room_creator(), room_creator()
+    Reservation.objects.create(
+        reserved_from=START,
+        reserved_to=START + dt.timedelta(hours=1),
+        purpose_of_booking='existing',
+        user=user,
+        room=first_room,
+        status=Reservation.ReservationStatus.ACTIVE,
+    )
+    data = [
+        _item(first_room.id, 0.5, 1.5),
+        _item(first_room.id, 1, 2),
+        _item(second_room.id, 1, 2),
+        _item(first_room.id, 1.5, 2.5),
+        _item(second_room.id, 3, 2),
+        _item(second_room.id, 2, 3),
+    ]
+    api_client.force_authenticate(user=user)
+    response = api_client.post(reverse('reservations-bulk'), data=data, format='json')
+    assert response.status_code == status.HTTP_200_OK
+
+    results = response.json()
+    assert [result['created'] for result in results] == [False, True, True, False, False, True]
+    assert tuple(results[0]['error']) == HTTPErrorMessages.BOOKING_TIME_IS_BUSY[0]
+    assert tuple(results[3]['error']) == HTTPErrorMessages.BOOKING_TIME_IS_BUSY[0]
+    assert tuple(results[4]['error']) == HTTPErrorMessages.INCORRECT_RESERVATION_TIME
+    created_ids = {result['id'] for result in results if result['created']}
+    assert (
+        set(Reservation.objects.exclude(purpose_of_booking='existing').values_list('id', flat=True))
+        == created_ids
+    )
+
+
+def test_create_reservations_bulk_queries(
+    room_creator, user, api_client, django_assert_max_num_queries
+):
+    rooms = [room_creator() for _ in range(3)]
+    data = [_item(room.id, hour, hour + 1) for room in rooms for hour in range(30)]
+    api_client.force_authenticate(user=user)
+    # One range query per room, one INSERT, one of the change log, one of the data versions and
+    # three of the daily occupancy rollup, plus the savepoint around them.
+    with django_assert_max_num_queries(len(rooms) + 8):
+        response = api_client.post(reverse('reservations-bulk'), data=data, format='json')
+    assert response.status_code == status.HTTP_200_OK
+    assert Reservation.objects.count() == len(data)
+
+
+def test_create_reservations_bulk_invalid(user, api_client):
+    api_client.force_authenticate(user=user)
+    response = api_client.post(reverse('reservations-bulk'), data=[{'room_id': 1}], format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert Reservation.objects.count() == 0
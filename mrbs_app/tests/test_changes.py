@@ -0,0 +1,88 @@
+import datetime as dt
+
+import pytest
+from django.db import DatabaseError, transaction
+from django.urls import reverse
+from rest_framework import status
+
+from mrbs_app.models import Reservation, ReservationChange
+from mrbs_app.services.archive import ReservationArchiveService
+from mrbs_app.tests.conftest import START
+
+
+@pytest.mark.django_db
+def test_reservation_changes_feed(
+    room_creator,
+    reservation_creator,
+    user,
+    api_client,
+    django_assert_num_queries,
+    django_capture_on_commit_callbacks,
+):
+    rooms = [room_creator(), room_creator()]
+    api_client.force_authenticate(user=user)
+
+    def _changes(**params) -> dict:
+        response = api_client.get(reverse('changes'), data=params)
+        assert response.status_code == status.HTTP_200_OK, response.data
+        return response.data
+
+    start = _changes()
+    assert (start['reservations'], start['deleted'], start['has_more']) == ([], [], False)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        reservations = [
+            reservation_creator(START + dt.timedelta(hours=hour), room=rooms[hour])
+            for hour in range(2)
+        ]
+    with django_capture_on_commit_callbacks(execute=True):
+        reservations[0].status = Reservation.ReservationStatus.CANCELLED
+        reservations[0].save()
+
+    with django_assert_num_queries(2):
+        page = _changes(cursor=start['next_cursor'], limit=2)
+    assert [reservation['id'] for reservation in page['reservations']] == [
+        reservation.id for reservation in reservations
+    ]
+    assert page['reservations'][0]['status'] == Reservation.ReservationStatus.CANCELLED
+    assert page['has_more']
+
+    page = _changes(cursor=page['next_cursor'], limit=2)
+    assert [reservation['id'] for reservation in page['reservations']] == [reservations[0].id]
+    assert not page['has_more']
+    assert _changes(cursor=page['next_cursor'])['reservations'] == []
+
+    deleted_id = reservations[1].id
+    with django_capture_on_commit_callbacks(execute=True):
+        reservations[1].delete()
+    page = _changes(cursor=start['next_cursor'], room_id=rooms[1].id)
+    assert page['reservations'] == []
+    assert page['deleted'] == [deleted_id]
+
+    list(ReservationArchiveService().archive_reservations(older_than=START + dt.timedelta(days=1)))
+    with django_assert_num_queries(3):
+        page = _changes(cursor=start['next_cursor'], room_id=rooms[0].id)
+    assert [reservation['id'] for reservation in page['reservations']] == [reservations[0].id]
+    assert page['reservations'][0]['status'] == Reservation.ReservationStatus.CANCELLED
+    assert page['deleted'] == []
+
+    response = api_client.get(reverse('changes'), data={'cursor': 'not-a-cursor'})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_reservation_change_logged_in_write_transaction(room_creator, reservation_creator, mocker):
+    room = room_creator()
+
+    # Logged before commit, with no on-commit callback run.
+    with transaction.atomic():
+        reservation = reservation_creator(START, room=room)
+        assert list(ReservationChange.objects.values_list('reservation_id', flat=True)) == [
+            reservation.id
+        ]
+
+    # A change that cannot be logged is not committed either.
+    mocker.patch.object(ReservationChange.objects, 'bulk_create', side_effect=DatabaseError)
+    with pytest.raises(DatabaseError), transaction.atomic():
+        reservation_creator(START, room=room)
+    assert list(Reservation.objects.values_list('id', flat=True)) == [reservation.id]
@@ -0,0 +1,94 @@
+import datetime as dt
+import random
+import threading
+import time
+from collections import Counter
+
+import pytest
+from django.conf import settings
+from django.db import connection, connections
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from mrbs_app.models import Reservation
+from mrbs_app.tests.conftest import START
+
+WRITERS = 50
+ROOMS = 5
+ATTEMPTS_PER_WRITER = 10
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_reservations_never_overlap(room_creator, user, mocker):
+    mocker.patch('mrbs_app.services.locks.SERIALIZE_DATABASE_WRITES', True)
+    rooms = [room_creator() for _ in range(ROOMS)]
+    barrier = threading.Barrier(WRITERS)
+    results = Counter()
+    results_lock = threading.Lock()
+
+    def _writer(seed: int):
+        rng = random.Random(seed)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        barrier.wait()
+        try:
+            for _ in range(ATTEMPTS_PER_WRITER):
+                reserved_from = START + dt.timedelta(minutes=30 * rng.randrange(8))
+                response = client.post(
+                    reverse('reservation'),
+                    data={
+                        'room_id': rng.choice(rooms).id,
+                        'purpose_of_booking': f'writer_{seed}',
+                        'reserved_from': reserved_from,
+                        'reserved_to': reserved_from + dt.timedelta(hours=1),
+                    },
+                )
+                with results_lock:
+                    results[response.status_code] += 1
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=_writer, args=(seed,)) for seed in range(WRITERS)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    attempts = WRITERS * ATTEMPTS_PER_WRITER
+    print(
+        f'\n{WRITERS} writers, {ROOMS} rooms: {attempts} attempts in {elapsed:.2f} s '
+        f'({attempts / elapsed:.0f} req/s), responses: {dict(results)}'
+    )
+    assert sum(results.values()) == attempts
+    # Writes of one process are serialized, so none of them fails on a locked database.
+    assert set(results) <= {status.HTTP_201_CREATED, status.HTTP_400_BAD_REQUEST}
+
+    for room in rooms:
+        booked = list(
+            Reservation.objects.filter(
+                room=room, status=Reservation.ReservationStatus.ACTIVE
+            ).order_by('reserved_from')
+        )
+        for previous, current in zip(booked, booked[1:]):
+            assert previous.reserved_to <= current.reserved_from
+    assert Reservation.objects.count() == results[status.HTTP_201_CREATED]
+
+
+@pytest.mark.django_db
+# synchronous: FULL (2) by default, NORMAL (1) in the production profile.
+@pytest.mark.parametrize('profile, synchronous', [('default', 2), ('production', 1)])
+def test_sqlite_connection_pragmas(mocker, profile, synchronous):
+    mocker.patch(
+        'mrbs_app.signals.SQLITE_PRAGMAS',
+        settings.SQLITE_PRODUCTION_PRAGMAS if profile == 'production' else {},
+    )
+    new_connection = connections.create_connection('default')
+    try:
+        with new_connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            assert cursor.fetchone()[0] == synchronous
+    finally:
+        new_connection.close()
@@ -0,0 +1,124 @@
+import datetime as dt
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from mrbs_app.models import Reservation
+from mrbs_app.tests.conftest import START
+
+PERIOD = {
+    'reserved_from': START.isoformat(),
+    'reserved_to': (START + dt.timedelta(days=1)).isoformat(),
+}
+
+
+@pytest.mark.django_db
+def test_reservation_list_etag(
+    room_creator,
+    reservation_creator,
+    user,
+    api_client,
+    django_assert_num_queries,
+    django_capture_on_commit_callbacks,
+):
+    room, other_room = room_creator(), room_creator()
+    with django_capture_on_commit_callbacks(execute=True):
+        reservation_creator(START, room=room)
+    api_client.force_authenticate(user=user)
+    params = {**PERIOD, 'room_id': room.id}
+
+    response = api_client.get(reverse('reservations'), data=params)
+    assert response.status_code == status.HTTP_200_OK
+    etag = response['ETag']
+
+    # Only the data version of the period is read.
+    with django_assert_num_queries(1):
+        response = api_client.get(reverse('reservations'), data=params, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response['ETag'] == etag
+
+    response = api_client.get(
+        reverse('reservations'), data={**params, 'limit': 1}, HTTP_IF_NONE_MATCH=etag
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    with django_capture_on_commit_callbacks(execute=True):
+        reservation_creator(START + dt.timedelta(hours=1), room=other_room)
+    response = api_client.get(reverse('reservations'), data=params, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    with django_capture_on_commit_callbacks(execute=True):
+        reservation_creator(START + dt.timedelta(hours=2), room=room)
+    response = api_client.get(reverse('reservations'), data=params, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response['ETag'] != etag
+    assert len(response.data) == 2
+
+
+@pytest.mark.django_db
+def test_report_etag(
+    room_creator,
+    reservation_creator,
+    user,
+    api_client,
+    django_assert_num_queries,
+    django_capture_on_commit_callbacks,
+):
+    room = room_creator()
+    with django_capture_on_commit_callbacks(execute=True):
+        reservation_creator(START, room=room)
+    api_client.force_authenticate(user=user)
+    params = {**PERIOD, 'export': 'csv'}
+
+    response = api_client.get(reverse('report'), data=params)
+    assert response.status_code == status.HTTP_200_OK
+    b''.join(response.streaming_content)
+    etag = response['ETag']
+
+    # Only the data version of the period is read.
+    with django_assert_num_queries(1):
+        response = api_client.get(reverse('report'), data=params, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    response = api_client.get(
+        reverse('report'), data={**params, 'export': 'ndjson'}, HTTP_IF_NONE_MATCH=etag
+    )
+    assert response.status_code == status.HTTP_200_OK
+    b''.join(response.streaming_content)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Reservation.objects.filter(room=room).get().delete()
+    response = api_client.get(reverse('report'), data=params, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert b''.join(response.streaming_content).count(b'\n') == 1
+
+
+@pytest.mark.django_db
+def test_etag_of_unbounded_window(
+    room_creator,
+    reservation_creator,
+    user,
+    api_client,
+    django_assert_num_queries,
+    django_capture_on_commit_callbacks,
+):
+    # The cost of the ETag does not depend on the length of the window.
+    room = room_creator()
+    api_client.force_authenticate(user=user)
+    params = {
+        'reserved_from': '0002-01-01T00:00:00+00:00',
+        'reserved_to': '9998-12-31T00:00:00+00:00',
+        'room_id': room.id,
+    }
+    etag = api_client.get(reverse('reservations'), data=params)['ETag']
+
+    with django_assert_num_queries(1):
+        response = api_client.get(reverse('reservations'), data=params, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    with django_capture_on_commit_callbacks(execute=True):
+        reservation_creator(START, room=room)
+    response = api_client.get(reverse('reservations'), data=params, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data) == 1
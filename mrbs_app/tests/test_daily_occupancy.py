@@ -0,0 +1,187 @@
+import datetime as dt
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+
+from mrbs_app.models import Reservation, RoomDailyOccupancy
+from mrbs_app.services.booking import BookingService
+from mrbs_app.services.daily_occupancy import (
+    DayStats,
+    compute_daily_occupancy,
+    refresh_daily_occupancy,
+)
+
+START = dt.datetime(2024, 1, 1, 22, tzinfo=dt.timezone.utc)
+DAY_1, DAY_2 = START.date(), START.date() + dt.timedelta(days=1)
+
+
+def _hours(start: float, end: float) -> tuple[dt.datetime, dt.datetime]:
+    return START + dt.timedelta(hours=start), START + dt.timedelta(hours=end)
+
+
+def _rollup() -> dict:
+    return {
+        (row.room_id, row.date): DayStats(
+            row.booked_minutes, row.reservation_count, row.peak_concurrency
+        )
+        for row in RoomDailyOccupancy.objects.all()
+    }
+
+
+def test_compute_daily_occupancy():
+    stats = compute_daily_occupancy(
+        [(1, *_hours(0, 1)), (1, *_hours(0.5, 3)), (1, *_hours(3, 4)), (2, *_hours(-1, 0))]
+    )
+    assert stats == {
+        (1, DAY_1): DayStats(booked_minutes=150, reservation_count=2, peak_concurrency=2),
+        (1, DAY_2): DayStats(booked_minutes=120, reservation_count=2, peak_concurrency=1),
+        (2, DAY_1): DayStats(booked_minutes=60, reservation_count=1, peak_concurrency=1),
+    }
+
+
+@pytest.mark.django_db
+def test_rollup_follows_bookings(
+    room_creator, user, api_client, django_capture_on_commit_callbacks
+):
+    room = room_creator()
+    api_client.force_authenticate(user=user)
+    for start, end in ((0, 1), (1.5, 3)):
+        reserved_from, reserved_to = _hours(start, end)
+        with django_capture_on_commit_callbacks(execute=True):
+            response = api_client.post(
+                reverse('reservation'),
+                data={
+                    'room_id': room.id,
+                    'purpose_of_booking': 'planning',
+                    'reserved_from': reserved_from,
+                    'reserved_to': reserved_to,
+                },
+            )
+        assert response.status_code == status.HTTP_201_CREATED
+    assert _rollup() == {
+        (room.id, DAY_1): DayStats(90, 2, 1),
+        (room.id, DAY_2): DayStats(60, 1, 1),
+    }
+
+    reservation = Reservation.objects.get(reserved_from=_hours(1.5, 3)[0])
+    with django_capture_on_commit_callbacks(execute=True):
+        BookingService().cancel_reservation(reservation_id=reservation.id)
+    assert _rollup() == {(room.id, DAY_1): DayStats(60, 1, 1)}
+
+    expected = _rollup()
+    RoomDailyOccupancy.objects.update(booked_minutes=0)
+    RoomDailyOccupancy.objects.create(room=room, date=DAY_2 + dt.timedelta(days=30))
+    call_command('rebuild_daily_occupancy', chunk_days=1)
+    assert _rollup() == expected
+
+
+@pytest.mark.django_db
+def test_rollup_follows_moves(room_creator, user):
+    room, other_room = room_creator(), room_creator()
+    # Written without signals: only the days refreshed below are rolled up.
+    Reservation.objects.bulk_create(
+        [
+            Reservation(
+                purpose_of_booking='renovation',
+                reserved_from=START - dt.timedelta(days=365),
+                reserved_to=START + dt.timedelta(days=365),
+                user=user,
+                room=room,
+                status=Reservation.ReservationStatus.ACTIVE,
+            )
+        ]
+    )
+    # Rolled up in the transaction of the change, without waiting for the commit.
+    reservation = Reservation.objects.create(
+        purpose_of_booking='planning',
+        reserved_from=_hours(0, 1)[0],
+        reserved_to=_hours(0, 1)[1],
+        user=user,
+        room=room,
+        status=Reservation.ReservationStatus.ACTIVE,
+    )
+    assert _rollup() == {(room.id, DAY_1): DayStats(24 * 60 + 60, 2, 2)}
+
+    reservation.room = other_room
+    reservation.reserved_from, reservation.reserved_to = _hours(3, 4)
+    reservation.save()
+    assert _rollup() == {
+        (room.id, DAY_1): DayStats(24 * 60, 1, 1),
+        (other_room.id, DAY_2): DayStats(60, 1, 1),
+    }
+
+    with pytest.raises(ValidationError):
+        Reservation(
+            purpose_of_booking='renovation',
+            reserved_from=START,
+            reserved_to=START + dt.timedelta(days=32),
+            user=user,
+            room=room,
+            status=Reservation.ReservationStatus.ACTIVE,
+        ).full_clean()
+
+
+@pytest.mark.django_db
+def test_daily_analytics_read_from_rollup(
+    room_creator, user, api_client, django_assert_num_queries
+):
+    room = room_creator()
+    for start, end in ((0, 1), (1.5, 3)):
+        reserved_from, reserved_to = _hours(start, end)
+        Reservation.objects.create(
+            purpose_of_booking='planning',
+            reserved_from=reserved_from,
+            reserved_to=reserved_to,
+            user=user,
+            room=room,
+            status=Reservation.ReservationStatus.ACTIVE,
+        )
+    RoomDailyOccupancy.objects.filter(date=DAY_2).update(booked_minutes=720)
+
+    api_client.force_authenticate(user=user)
+    params = {
+        'from': dt.datetime.combine(DAY_1, dt.time.min, tzinfo=dt.timezone.utc).isoformat(),
+        'to': dt.datetime.combine(DAY_2, dt.time.max, tzinfo=dt.timezone.utc).isoformat(),
+        'granularity': 'day',
+    }
+    # Not whole days: computed from the reservations.
+    response = api_client.get(reverse('analytics-occupancy'), data=params)
+    assert [bucket['occupied_minutes'] for bucket in response.json()[0]['buckets']] == [90, 60]
+
+    params['to'] = dt.datetime.combine(
+        DAY_2 + dt.timedelta(days=1), dt.time.min, tzinfo=dt.timezone.utc
+    ).isoformat()
+    with django_assert_num_queries(2):
+        response = api_client.get(reverse('analytics-occupancy'), data=params)
+    assert response.status_code == status.HTTP_200_OK
+    assert [
+        (bucket['occupied_minutes'], bucket['utilization'])
+        for bucket in response.json()[0]['buckets']
+    ] == [(90, 0.0625), (720, 0.5)]
+
+
+@pytest.mark.django_db
+def test_refresh_of_many_days(room_creator, user):
+    room = room_creator()
+    # Completed by the sweeper in one chunk, for example: more days apart than SQLite accepts
+    # conditions in one query.
+    reservations = Reservation.objects.bulk_create(
+        [
+            Reservation(
+                purpose_of_booking='planning',
+                reserved_from=START + dt.timedelta(days=2 * day),
+                reserved_to=START + dt.timedelta(days=2 * day, hours=1),
+                user=user,
+                room=room,
+                status=Reservation.ReservationStatus.COMPLETED,
+            )
+            for day in range(1100)
+        ]
+    )
+    refresh_daily_occupancy(reservations)
+    rollup = _rollup()
+    assert len(rollup) == 1100
+    assert rollup[room.id, DAY_1] == DayStats(60, 1, 1)
@@ -0,0 +1,149 @@
+import datetime as dt
+import io
+import zipfile
+
+import docx
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from mrbs_app.models import Reservation
+from mrbs_app.services.docx_report import (
+    REPORT_HEADERS,
+    PythonDocxReportWriter,
+    StreamingDocxReportWriter,
+)
+from mrbs_app.tests.conftest import START
+
+
+def _bookings() -> list[dict]:
+    return [
+        {
+            'id': index,
+            'user_name': 'R&D <team>',
+            'reserved_from': START + dt.timedelta(hours=index),
+            'reserved_to': START + dt.timedelta(hours=index + 1),
+            'purpose_of_booking': purpose,
+            'room_number': room_number,
+            'room_id': room_number,
+        }
+        for index, (purpose, room_number) in enumerate(
+            [('Planning\nQ1', 1), (' sync\t', 1), ('Demo', 2), ('', 3)]
+        )
+    ]
+
+
+def _read(file_path) -> tuple[int, list[str], list[list[list[str]]]]:
+    document = docx.Document(file_path)
+    headings = [paragraph.text for paragraph in document.paragraphs if paragraph.text]
+    tables = [
+        [[cell.text for cell in row.cells] for row in table.rows] for table in document.tables
+    ]
+    return len(document.sections), headings, tables
+
+
+@pytest.mark.parametrize('split_by_room', [False, True])
+def test_streaming_writer_matches_python_docx(tmp_path, split_by_room):
+    PythonDocxReportWriter().write(iter(_bookings()), tmp_path / 'tree.docx', split_by_room)
+    StreamingDocxReportWriter().write(
+        iter(_bookings()), str(tmp_path / 'streamed.docx'), split_by_room
+    )
+
+    streamed = _read(tmp_path / 'streamed.docx')
+    assert streamed == _read(tmp_path / 'tree.docx')
+    sections, headings, tables = streamed
+    if split_by_room:
+        assert sections == 3
+        assert headings[1:] == ['Комната 1', 'Комната 2', 'Комната 3']
+        assert [len(table) for table in tables] == [3, 2, 2]
+    else:
+        assert [len(table) for table in tables] == [5]
+    assert tables[0][0] == list(REPORT_HEADERS)
+    assert tables[0][1][1:4] == [
+        'R&D <team>',
+        '2024-01-01 09:00 - 2024-01-01 10:00',
+        'Planning\nQ1',
+    ]
+    # The streamed file is written under a temporary name and renamed when complete.
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['streamed.docx', 'tree.docx']
+
+
+@pytest.mark.parametrize('writer_class', [PythonDocxReportWriter, StreamingDocxReportWriter])
+def test_split_by_room_separates_rooms_with_the_same_number(tmp_path, writer_class):
+    bookings = _bookings()
+    bookings[1]['room_id'] = 10
+    writer_class().write(iter(bookings), str(tmp_path / 'report.docx'), split_by_room=True)
+
+    sections, headings, tables = _read(tmp_path / 'report.docx')
+    assert sections == 4
+    assert headings[1:] == ['Комната 1', 'Комната 1', 'Комната 2', 'Комната 3']
+    assert [len(table) for table in tables] == [2, 2, 2, 2]
+
+
+# python-docx leaves its archive open when a write fails.
+@pytest.mark.filterwarnings('ignore::pytest.PytestUnraisableExceptionWarning')
+@pytest.mark.parametrize('writer_class', [PythonDocxReportWriter, StreamingDocxReportWriter])
+def test_failed_write_keeps_previous_file(tmp_path, mocker, writer_class):
+    file_path = str(tmp_path / 'report.docx')
+    writer_class().write(iter(_bookings()), file_path)
+    previous = _read(file_path)
+
+    # The disk fills up once the first parts of the new file are written.
+    writestr = zipfile.ZipFile.writestr
+    calls = iter(range(3))
+
+    def _writestr(archive, *args, **kwargs):
+        if next(calls, None) is None:
+            raise OSError('No space left on device')
+        writestr(archive, *args, **kwargs)
+
+    mocker.patch.object(zipfile.ZipFile, 'writestr', _writestr)
+    with pytest.raises(OSError):
+        writer_class().write(iter(_bookings()), file_path)
+    assert _read(file_path) == previous
+    assert [path.name for path in tmp_path.iterdir()] == ['report.docx']
+
+
+def test_streaming_writer_drops_characters_invalid_in_xml(tmp_path):
+    bookings = _bookings()
+    bookings[0]['purpose_of_booking'] = 'Bell\x07 and null\x00'
+    StreamingDocxReportWriter().write(iter(bookings), str(tmp_path / 'report.docx'))
+    assert _read(tmp_path / 'report.docx')[2][0][1][3] == 'Bell and null'
+
+
+@pytest.mark.django_db
+def test_report_split_by_room(report_dir, room_creator, user, api_client):
+    rooms = sorted((room_creator() for _ in range(2)), key=lambda room: (room.number, room.id))
+    Reservation.objects.bulk_create(
+        [
+            Reservation(
+                reserved_from=START + dt.timedelta(hours=hour),
+                reserved_to=START + dt.timedelta(hours=hour + 1),
+                purpose_of_booking='meeting',
+                user=user,
+                room=room,
+                status=Reservation.ReservationStatus.ACTIVE,
+            )
+            for hour, room in ((0, rooms[1]), (1, rooms[0]), (2, rooms[1]))
+        ]
+    )
+    api_client.force_authenticate(user=user)
+    params = {
+        'reserved_from': START.isoformat(),
+        'reserved_to': (START + dt.timedelta(days=1)).isoformat(),
+    }
+
+    whole = api_client.get(reverse('report'), data=params)
+    split = api_client.get(reverse('report'), data={**params, 'split_by_room': 'true'})
+    assert whole.status_code == split.status_code == status.HTTP_200_OK
+    assert whole['ETag'] != split['ETag']
+    b''.join(whole.streaming_content)
+    assert len(list(report_dir.iterdir())) == 2
+
+    sections, headings, tables = _read(io.BytesIO(b''.join(split.streaming_content)))
+    assert sections == 2
+    assert headings[1:] == [f'Комната {rooms[0].number}', f'Комната {rooms[1].number}']
+    assert [[row[4] for row in table[1:]] for table in tables] == [
+        [str(rooms[0].number)],
+        [str(rooms[1].number)] * 2,
+    ]
@@ -0,0 +1,82 @@
+import asyncio
+import datetime as dt
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.test import AsyncClient
+from django.urls import reverse
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+
+from mrbs_app.models import ReservationChange
+from mrbs_app.services.events import ReservationEvent, reservation_events
+from mrbs_app.tests.conftest import START
+
+
+@pytest.mark.django_db(transaction=True)
+def test_reservation_events(room_creator, reservation_creator, user):
+    room, other_room = room_creator(), room_creator()
+    headers = {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+    missed = ReservationChange.objects.get(reservation_id=reservation_creator(START, room=room).id)
+
+    async def _listen() -> list[bytes]:
+        client = AsyncClient()
+        response = await client.get(reverse('events'), data={'room_id': 'x'}, headers=headers)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        response = await client.get(
+            reverse('events'),
+            data={'room_id': [room.id]},
+            headers={**headers, 'Last-Event-ID': '0'},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'] == 'text/event-stream'
+        content = aiter(response.streaming_content)
+        received = [await anext(content), await anext(content)]
+        await sync_to_async(reservation_creator)(START + dt.timedelta(hours=1), room=other_room)
+        reservation = await sync_to_async(reservation_creator)(
+            START + dt.timedelta(hours=2), room=room
+        )
+        received.append(await anext(content))
+        assert reservation_events.subscribers == 1
+
+        # A client disconnect cancels the task streaming the response.
+        waiting = asyncio.ensure_future(anext(content))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        assert reservation_events.subscribers == 0
+        return received, reservation
+
+    received, reservation = async_to_sync(_listen)()
+    change = ReservationChange.objects.get(reservation_id=reservation.id)
+    assert received == [
+        b'retry: 3000\n\n',
+        f'id: {missed.id}\nevent: reservation\n'
+        f'data: {{"reservation_id": {missed.reservation_id}, "room_id": {room.id}}}\n\n'.encode(),
+        ReservationEvent(change.id, reservation.id, room.id).encode().encode(),
+    ]
+
+
+def test_reservation_events_heartbeat_and_overflow():
+    async def _listen() -> list[str]:
+        stream = reservation_events.stream(room_ids=[1], heartbeat_interval=0.01, queue_size=2)
+        received = [await anext(stream), await anext(stream)]
+        reservation_events.publish(
+            [
+                ReservationChange(id=change_id, reservation_id=10, room_id=1)
+                for change_id in (1, 2, 3)
+            ]
+        )
+        received.append(await anext(stream))
+        with pytest.raises(StopAsyncIteration):
+            await anext(stream)
+        return received
+
+    assert async_to_sync(_listen)() == [
+        'retry: 3000\n\n',
+        ': heartbeat\n\n',
+        ReservationEvent(1, 10, 1).encode(),
+    ]
+    assert reservation_events.subscribers == 0
@@ -0,0 +1,72 @@
+import datetime as dt
+
+from django.urls import reverse
+from rest_framework import status
+
+from mrbs_app.models import Reservation, Room
+from mrbs_app.services.free_slots import compute_free_gaps
+from mrbs_app.tests.conftest import START
+
+
+def _at(hours: float) -> dt.datetime:
+    return START + dt.timedelta(hours=hours)
+
+
+def test_compute_free_gaps():
+    busy = [(_at(1), _at(2)), (_at(1.5), _at(3)), (_at(3.25), _at(4))]
+    assert compute_free_gaps(busy, _at(0), _at(6), dt.timedelta(minutes=30)) == [
+        (_at(0), _at(1)),
+        (_at(4), _at(6)),
+    ]
+    assert compute_free_gaps(busy, _at(0), _at(6), dt.timedelta(minutes=15)) == [
+        (_at(0), _at(1)),
+        (_at(3), _at(3.25)),
+        (_at(4), _at(6)),
+    ]
+
+
+def test_get_free_slots(user, api_client, django_assert_max_num_queries):
+    small = Room.objects.create(number=1, name='Small', capacity=4)
+    large = Room.objects.create(number=2, name='Large', capacity=12)
+    busy = Room.objects.create(number=3, name='Busy', capacity=20)
+    Reservation.objects.bulk_create(
+        [
+            Reservation(
+                reserved_from=reserved_from,
+                reserved_to=reserved_to,
+                purpose_of_booking='meeting',
+                user=user,
+                room=room,
+                status=Reservation.ReservationStatus.ACTIVE,
+            )
+            for room, reserved_from, reserved_to in (
+                (large, _at(1), _at(2)),
+                (busy, _at(0), _at(4)),
+                (small, _at(0), _at(4)),
+            )
+        ]
+    )
+    api_client.force_authenticate(user=user)
+    with django_assert_max_num_queries(2):
+        response = api_client.get(
+            reverse('free-slots'),
+            data={
+                'from': _at(0).isoformat(),
+                'to': _at(4).isoformat(),
+                'duration': 60,
+                'min_capacity': 10,
+            },
+        )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [
+        {
+            'room_id': large.id,
+            'number': 2,
+            'name': 'Large',
+            'capacity': 12,
+            'slots': [
+                {'from': '2024-01-01T09:00:00Z', 'to': '2024-01-01T10:00:00Z'},
+                {'from': '2024-01-01T11:00:00Z', 'to': '2024-01-01T13:00:00Z'},
+            ],
+        }
+    ]
@@ -0,0 +1,141 @@
+import datetime as dt
+import logging
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.http import FileResponse, HttpResponse
+from django.test import AsyncClient, Client
+from django.urls import reverse
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+
+from mrbs_app.middleware import RequestMetricsMiddleware, count_request_queries
+from mrbs_app.models import Reservation
+from mrbs_app.services.metrics import METRICS, Histogram, request_queries
+from mrbs_app.services.user_cache import user_cache
+from mrbs_app.tests.conftest import START
+
+
+@pytest.fixture(autouse=True)
+def _clear_metrics():
+    for metric in METRICS:
+        metric.clear()
+
+
+def test_histogram_render():
+    histogram = Histogram('test_seconds', 'Test.', labels=('view',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, 'a"b')
+
+    assert histogram.render() == [
+        '# HELP test_seconds Test.',
+        '# TYPE test_seconds histogram',
+        'test_seconds_bucket{view="a\\"b",le="0.1"} 1',
+        'test_seconds_bucket{view="a\\"b",le="1.0"} 2',
+        'test_seconds_bucket{view="a\\"b",le="+Inf"} 3',
+        'test_seconds_sum{view="a\\"b"} 5.55',
+        'test_seconds_count{view="a\\"b"} 3',
+    ]
+
+
+@pytest.mark.django_db
+def test_request_metrics(
+    room_creator, reservation_bulk_creator, user, api_client, client, mocker, caplog
+):
+    room = room_creator()
+    reservation_bulk_creator(
+        (START + dt.timedelta(hours=i), START + dt.timedelta(hours=i, minutes=30), {'room': room})
+        for i in range(3)
+    )
+    api_client.force_authenticate(user=user)
+    period = {
+        'reserved_from': START.isoformat(),
+        'reserved_to': (START + dt.timedelta(hours=3)).isoformat(),
+    }
+
+    response = api_client.get(reverse('availability'), data={**period, 'room_id': room.id})
+    assert response.status_code == status.HTTP_200_OK
+
+    mocker.patch('mrbs_app.middleware.REQUEST_QUERY_BUDGET', 0)
+    with caplog.at_level(logging.WARNING, logger='mrbs_app.middleware'):
+        response = api_client.get(reverse('report'), data={**period, 'export': 'csv'})
+        assert not caplog.records
+        b''.join(response.streaming_content)
+    assert 'ran 2 SQL queries (budget 0)' in caplog.text
+
+    response = client.get(reverse('metrics'))
+    assert response.status_code == status.HTTP_200_OK
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+    metrics = response.content.decode().splitlines()
+    assert (
+        'mrbs_http_request_duration_seconds_count'
+        '{method="GET",view="availability",status="200"} 1'
+    ) in metrics
+    assert 'mrbs_http_request_queries_bucket{method="GET",view="report",le="2"} 1' in metrics
+    assert 'mrbs_http_request_queries_bucket{method="GET",view="report",le="1"} 0' in metrics
+    assert (
+        'mrbs_service_call_duration_seconds_count'
+        '{service="BookingService",method="check_availability"} 1'
+    ) in metrics
+    assert (
+        'mrbs_service_call_duration_seconds_count'
+        '{service="BookingReportService",method="export_reservations_report"} 1'
+    ) in metrics
+
+
+@pytest.mark.django_db
+def test_request_metrics_keep_file_responses(rf, tmp_path):
+    file_path = tmp_path / 'report.docx'
+    file_path.write_bytes(b'PK')
+    response = FileResponse(open(file_path, 'rb'))
+    request = rf.get('/')
+    request.resolver_match = None
+
+    # The server can only send the file itself (wsgi.file_wrapper) if it is not wrapped.
+    assert RequestMetricsMiddleware(lambda _: response)(request).file_to_stream is not None
+    response.close()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_request_metrics_count_queries_under_asgi(room_creator, user):
+    # Under ASGI the ORM runs in sync_to_async threads, for sync and async views alike.
+    room = room_creator()
+    headers = {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+    params = {
+        'room_id': room.id,
+        'reserved_from': START.isoformat(),
+        'reserved_to': (START + dt.timedelta(hours=3)).isoformat(),
+    }
+
+    def _queries(get) -> dict[str, float]:
+        for metric in METRICS:
+            metric.clear()
+        for view in ('reservations', 'async-reservations'):
+            user_cache.clear()
+            assert get(reverse(view), data=params, headers=headers).status_code == 200
+        return {view: total for (_, view), (_, _, total) in request_queries.collect().items()}
+
+    queries = _queries(Client().get)
+    assert queries['reservations'] >= 2
+    assert _queries(async_to_sync(AsyncClient().get)) == queries
+
+
+@pytest.mark.django_db(transaction=True)
+def test_request_queries_counted_once_after_reconnects(rf):
+    # What a connection closed for CONN_MAX_AGE or a failed health check goes through when it
+    # is opened again.
+    for _ in range(2):
+        connection_created.send(sender=type(connection), connection=connection)
+    assert connection.execute_wrappers.count(count_request_queries) == 1
+
+    def _view(_):
+        Reservation.objects.exists()
+        return HttpResponse()
+
+    request = rf.get('/')
+    request.resolver_match = None
+    RequestMetricsMiddleware(_view)(request)
+    ((_, count, total),) = request_queries.collect().values()
+    assert (count, total) == (1, 1)
@@ -0,0 +1,40 @@
+import datetime as dt
+import decimal
+
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from mrbs_app.api import renderers
+from mrbs_app.api.renderers import FastJSONRenderer
+
+ROWS = [
+    {
+        'id': 1,
+        'purpose_of_booking': 'Планёрка\u2028итоги\u2029 1e5',
+        'reserved_from': dt.datetime(2024, 1, 1, 9, 0, 0, 123456, tzinfo=dt.timezone.utc),
+        'reserved_to': dt.datetime(2024, 1, 1, 10, tzinfo=dt.timezone(dt.timedelta(hours=3))),
+        'user': 1,
+        'room': 2,
+        'status': 'active',
+        'series': None,
+        'price': decimal.Decimal('1.50'),
+        'occupancy': [0.1 + 0.2, 1e16, 1e-7, 2.5e-300],
+        'counter': 2**70,
+        'errors': {0: ['Обязательное поле.']},
+    }
+]
+
+
+@pytest.mark.parametrize('use_orjson', [True, False])
+def test_fast_json_renderer_matches_stock_renderer(use_orjson, mocker):
+    if not use_orjson:
+        mocker.patch.object(renderers, 'orjson', None)
+    elif renderers.orjson is None:
+        pytest.skip('orjson is not installed')
+
+    assert FastJSONRenderer().render(ROWS) == JSONRenderer().render(ROWS)
+    rows = [dict(ROWS[0], counter=1)]
+    rendered = FastJSONRenderer().render(rows)
+    assert rendered == JSONRenderer().render(rows)
+    assert b'"2024-01-01T09:00:00.123456Z"' in rendered
+    assert FastJSONRenderer().render(None) == b''
@@ -0,0 +1,298 @@
+import datetime as dt
+import os
+import subprocess
+import sys
+
+import docx
+import pytest
+from django.conf import settings
+from django.urls import reverse
+from rest_framework import status
+
+from mrbs_app.models import Reservation, ReservationDataVersion
+from mrbs_app.services.report_cache import report_cache
+from mrbs_app.services.report_store import report_store
+from mrbs_app.tests.conftest import START
+
+
+def _report_url(room_id: int = None) -> str:
+    url = (
+        f'{reverse("report")}?'
+        f'reserved_from={START.isoformat().replace("+", "%2B")}&'
+        f'reserved_to={(START + dt.timedelta(days=2)).isoformat().replace("+", "%2B")}'
+    )
+    return f'{url}&room_id={room_id}' if room_id else url
+
+
+def _get_report_file(api_client, report_dir, room_id: int = None) -> str:
+    response = api_client.get(_report_url(room_id))
+    assert response.status_code == status.HTTP_200_OK
+    assert b''.join(response.streaming_content).startswith(b'PK')
+    # The served report is the most recently used file of the store.
+    return max(report_dir.iterdir(), key=lambda path: path.stat().st_mtime_ns).name
+
+
+def test_report_served_from_cache(
+    report_dir,
+    room_creator,
+    reservation_creator,
+    user,
+    api_client,
+    django_assert_num_queries,
+    django_capture_on_commit_callbacks,
+):
+    room, other_room = room_creator(), room_creator()
+    reservation_creator(START, room=room)
+    api_client.force_authenticate(user=user)
+
+    first = _get_report_file(api_client, report_dir, room.id)
+    # Only the data version, for the ETag and for the key of the stored report.
+    with django_assert_num_queries(2):
+        assert _get_report_file(api_client, report_dir, room.id) == first
+    assert (report_store.hits, report_store.misses) == (1, 1)
+
+    # Writes outside the window or to another room keep the stored report.
+    with django_capture_on_commit_callbacks(execute=True):
+        reservation_creator(START + dt.timedelta(days=5), room=room)
+        reservation_creator(START, room=other_room)
+    assert _get_report_file(api_client, report_dir, room.id) == first
+
+    with django_capture_on_commit_callbacks(execute=True):
+        reservation = reservation_creator(START + dt.timedelta(days=1), room=room)
+    third = _get_report_file(api_client, report_dir, room.id)
+    assert third != first
+
+    with django_capture_on_commit_callbacks(execute=True):
+        reservation.status = Reservation.ReservationStatus.CANCELLED
+        reservation.save()
+    assert _get_report_file(api_client, report_dir, room.id) != third
+    assert len(list(report_dir.iterdir())) == 3
+
+
+@pytest.mark.django_db
+def test_versions_of_previous_range_bumped(room_creator, reservation_creator):
+    room, other_room = room_creator(), room_creator()
+    reservation = reservation_creator(START, room=room)
+    window = (START, START + dt.timedelta(hours=1))
+    version = report_cache.get_version(*window, room_id=room.id)
+
+    reservation.reserved_from += dt.timedelta(days=3)
+    reservation.reserved_to += dt.timedelta(days=3)
+    reservation.save()
+    moved = report_cache.get_version(*window, room_id=room.id)
+    assert moved > version
+
+    reservation.room = other_room
+    reservation.save()
+    assert report_cache.get_version(*window, room_id=room.id) == moved
+    assert (
+        report_cache.get_version(reservation.reserved_from, reservation.reserved_to, room.id)
+        > moved
+    )
+
+
+@pytest.mark.django_db
+def test_long_reservation_versions_bounded(room_creator, reservation_creator, user, api_client):
+    room = room_creator()
+    reservation_creator(START, START.replace(year=2074), room=room)
+    # One whole-time version for the room and one for all rooms instead of one per day.
+    assert ReservationDataVersion.objects.count() == 2
+    version = report_cache.get_version(START.replace(year=2050), START.replace(year=2051))
+    assert version == report_cache.get_version(START, START, room_id=room.id) > 0
+
+    api_client.force_authenticate(user=user)
+    response = api_client.post(
+        reverse('reservation'),
+        data={
+            'reserved_from': START.isoformat(),
+            'reserved_to': (START + dt.timedelta(days=31, minutes=1)).isoformat(),
+            'room_id': room.id,
+            'purpose_of_booking': 'meeting',
+        },
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_report_cache_separates_rooms(report_dir, room_creator, user, api_client):
+    room, other_room = room_creator(), room_creator()
+    api_client.force_authenticate(user=user)
+    paths = {
+        _get_report_file(api_client, report_dir, room_id)
+        for room_id in (room.id, other_room.id, None)
+    }
+    assert len(paths) == 3
+
+
+def test_report_store_evicts_least_recently_used(report_dir, mocker):
+    mocker.patch('mrbs_app.services.report_store.REPORT_STORE_MAX_BYTES', 250)
+
+    def _write(file_path: str):
+        with open(file_path, 'wb') as report_file:
+            report_file.write(b'x' * 100)
+
+    first = report_store.put('first', _write)
+    os.utime(first, (1000, 1000))
+    second = report_store.put('second', _write)
+    os.utime(second, (2000, 2000))
+    assert report_store.get('first') == first
+
+    third = report_store.put('third', _write)
+    assert sorted(str(path) for path in report_dir.iterdir()) == sorted([first, third])
+    assert report_store.get('second') is None
+
+
+@pytest.mark.parametrize(
+    'header, value',
+    [
+        ('X-Accel-Redirect', lambda path: f'/protected/reports/{os.path.basename(path)}'),
+        ('X-Sendfile', os.path.abspath),
+    ],
+)
+def test_report_sent_by_front_server(
+    report_dir, mocker, room_creator, user, api_client, header, value
+):
+    mocker.patch('mrbs_app.api.views.booking.REPORT_SENDFILE_HEADER', header)
+    room = room_creator()
+    api_client.force_authenticate(user=user)
+
+    response = api_client.get(_report_url(room.id))
+    assert response.status_code == status.HTTP_200_OK
+    assert response.content == b''
+    assert response['Content-Disposition'].startswith('attachment; filename="report_2024-01-01')
+    (file_path,) = report_dir.iterdir()
+    assert response[header] == value(str(file_path))
+
+
+# Runs Django in a separate interpreter on the SQLite file and report directory given as
+# arguments: nothing one process keeps in memory is shared with another.
+_PROCESS_SETUP = '''
+import os
+import sys
+
+import django
+from django.conf import settings
+
+os.environ['DJANGO_SETTINGS_MODULE'] = 'core.settings'
+settings.DATABASES['default']['NAME'] = sys.argv[1]
+django.setup()
+
+import datetime as dt
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import transaction
+
+from mrbs_app.models import Reservation, Room
+from mrbs_app.services import report_store
+from mrbs_app.services.booking import BookingReportService
+from mrbs_app.services.report_cache import report_cache
+
+report_store.REPORT_STORE_DIR = sys.argv[2]
+START = dt.datetime(2024, 1, 1, 9, tzinfo=dt.timezone.utc)
+# The window is requested in another time zone than the one reservations are stored in.
+MSK = dt.timezone(dt.timedelta(hours=3))
+WINDOW = (START.astimezone(MSK), (START + dt.timedelta(days=2)).astimezone(MSK))
+
+
+def book(hours):
+    with transaction.atomic():
+        Reservation.objects.create(
+            reserved_from=START + dt.timedelta(hours=hours),
+            reserved_to=START + dt.timedelta(hours=hours + 1),
+            purpose_of_booking='meeting',
+            user=get_user_model().objects.get(),
+            room=Room.objects.get(),
+            status=Reservation.ReservationStatus.ACTIVE,
+        )
+'''
+
+
+def _start_process(code: str, database: str, directory: str, **kwargs) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, '-c', _PROCESS_SETUP + code, database, directory],
+        cwd=settings.BASE_DIR,
+        text=True,
+        **kwargs,
+    )
+
+
+def _run_process(code: str, database: str, directory: str) -> str:
+    process = _start_process(code, database, directory, stdout=subprocess.PIPE)
+    output, _ = process.communicate(timeout=60)
+    assert process.returncode == 0
+    return output
+
+
+def test_report_versions_shared_between_processes(tmp_path, report_dir):
+    database, directory = str(tmp_path / 'db.sqlite3'), str(report_dir)
+    _run_process(
+        "call_command('migrate', verbosity=0)\n"
+        "Room.objects.create(number=1, name='Room_1')\n"
+        "get_user_model().objects.create_user(username='user', password='password')\n"
+        "book(0)\n",
+        database,
+        directory,
+    )
+    # Builds the report of the room (and its ETag) for every line read.
+    reporter = _start_process(
+        'room_id = Room.objects.get().id\n'
+        'for _ in sys.stdin:\n'
+        '    file_path = BookingReportService().build_reservations_report(*WINDOW, room_id)\n'
+        "    print(file_path, report_cache.get_etag(*WINDOW, room_id), flush=True)\n",
+        database,
+        directory,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+    )
+
+    def _get_report() -> tuple[str, str]:
+        reporter.stdin.write('\n')
+        reporter.stdin.flush()
+        file_path, etag = reporter.stdout.readline().split()
+        return file_path, etag
+
+    try:
+        first, first_etag = _get_report()
+        assert _get_report() == (first, first_etag)
+
+        _run_process('book(30)\n', database, directory)
+        second, second_etag = _get_report()
+        assert (second, second_etag) != (first, first_etag)
+        assert len(docx.Document(second).tables[0].rows) == 3
+
+        # Outside the window: the report is kept.
+        _run_process('book(24 * 5)\n', database, directory)
+        assert _get_report() == (second, second_etag)
+    finally:
+        reporter.stdin.close()
+        assert reporter.wait(timeout=60) == 0
+
+
+def test_report_store_shared_between_processes(tmp_path, report_dir):
+    database, directory = str(tmp_path / 'db.sqlite3'), str(report_dir)
+    build_report = (
+        'file_path = BookingReportService().build_reservations_report(*WINDOW)\n'
+        'print(file_path, report_store.report_store.hits, report_store.report_store.misses)\n'
+    )
+    _run_process(
+        "call_command('migrate', verbosity=0)\n"
+        "Room.objects.create(number=1, name='Room_1')\n"
+        "get_user_model().objects.create_user(username='user', password='password')\n"
+        'book(0)\n',
+        database,
+        directory,
+    )
+
+    file_path, hits, misses = _run_process(build_report, database, directory).split()
+    assert (hits, misses) == ('0', '1')
+    # Another process is served the stored file.
+    assert _run_process(build_report, database, directory).split() == [file_path, '1', '0']
+
+    # After a write from a third one, both build and then share the new version.
+    _run_process('book(1)\n', database, directory)
+    new_file_path, hits, misses = _run_process(build_report, database, directory).split()
+    assert (new_file_path != file_path, hits, misses) == (True, '0', '1')
+    assert _run_process(build_report, database, directory).split() == [new_file_path, '1', '0']
+    assert sorted(os.listdir(directory)) == sorted(
+        os.path.basename(path) for path in (file_path, new_file_path)
+    )
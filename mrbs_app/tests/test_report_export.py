@@ -0,0 +1,72 @@
+import csv
+import datetime as dt
+import io
+import json
+
+from django.urls import reverse
+from rest_framework import status
+
+from mrbs_app.models import Reservation
+from mrbs_app.tests.conftest import START
+
+
+def _create_reservations(user, rooms, count: int) -> list[Reservation]:
+    return Reservation.objects.bulk_create(
+        [
+            Reservation(
+                reserved_from=START + dt.timedelta(hours=i),
+                reserved_to=START + dt.timedelta(hours=i, minutes=30),
+                purpose_of_booking=f'purpose_{i}',
+                user=user,
+                room=rooms[i % len(rooms)],
+                status=Reservation.ReservationStatus.ACTIVE,
+            )
+            for i in range(count)
+        ]
+    )
+
+
+def _export_url(export: str, hours: int) -> str:
+    return (
+        f'{reverse("report")}?'
+        f'reserved_from={START.isoformat().replace("+", "%2B")}&'
+        f'reserved_to={(START + dt.timedelta(hours=hours)).isoformat().replace("+", "%2B")}&'
+        f'export={export}'
+    )
+
+
+def test_export_report_csv(room_creator, user, api_client, django_assert_num_queries):
+    rooms = [room_creator() for _ in range(3)]
+    reservations = _create_reservations(user, rooms, 30)
+    api_client.force_authenticate(user=user)
+
+    # The data version of the period for the ETag, and the rows.
+    with django_assert_num_queries(2):
+        response = api_client.get(_export_url('csv', 30))
+        content = b''.join(response.streaming_content).decode()
+    assert response.status_code == status.HTTP_200_OK
+    assert response['Content-Type'].startswith('text/csv')
+
+    rows = list(csv.DictReader(io.StringIO(content)))
+    assert [int(row['id']) for row in rows] == [reservation.id for reservation in reservations]
+    assert rows[0]['user'] == user.username
+    assert rows[0]['room_number'] == str(rooms[0].number)
+    assert rows[0]['reserved_from'] == START.isoformat()
+
+
+def test_export_report_ndjson(room_creator, user, api_client):
+    rooms = [room_creator()]
+    reservations = _create_reservations(user, rooms, 5)
+    api_client.force_authenticate(user=user)
+
+    response = api_client.get(_export_url('ndjson', 2))
+    lines = b''.join(response.streaming_content).decode().splitlines()
+    assert response.status_code == status.HTTP_200_OK
+    assert [json.loads(line)['id'] for line in lines] == [reservations[0].id, reservations[1].id]
+    assert json.loads(lines[0])['purpose_of_booking'] == 'purpose_0'
+
+
+def test_export_report_unknown_format(user, api_client):
+    api_client.force_authenticate(user=user)
+    response = api_client.get(_export_url('xlsx', 2))
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
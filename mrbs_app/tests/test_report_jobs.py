@@ -0,0 +1,137 @@
+import datetime as dt
+
+import pytest
+from django.core.management import call_command
+from django.db import IntegrityError, OperationalError
+from django.db.models import QuerySet
+from django.urls import reverse
+from rest_framework import status
+
+from mrbs_app.models import ReportJob, Reservation
+from mrbs_app.services.report_jobs import ReportJobService
+from mrbs_app.services.report_store import report_store
+from mrbs_app.tests.conftest import START
+
+
+def _job_data(**extra) -> dict:
+    return {
+        'reserved_from': START.isoformat(),
+        'reserved_to': (START + dt.timedelta(days=30)).isoformat(),
+        **extra,
+    }
+
+
+def test_create_report_job_deduplicates(room_creator, user, api_client):
+    room = room_creator()
+    api_client.force_authenticate(user=user)
+
+    first = api_client.post(reverse('report-jobs'), data=_job_data())
+    second = api_client.post(reverse('report-jobs'), data=_job_data())
+    other_room = api_client.post(reverse('report-jobs'), data=_job_data(room_id=room.id))
+    assert first.status_code == status.HTTP_202_ACCEPTED
+    assert first.json()['id'] == second.json()['id']
+    assert other_room.json()['id'] != first.json()['id']
+    assert ReportJob.objects.count() == 2
+
+    ReportJob.objects.filter(pk=first.json()['id']).update(status=ReportJob.JobStatus.DONE)
+    third = api_client.post(reverse('report-jobs'), data=_job_data())
+    assert third.json()['id'] != first.json()['id']
+
+
+def test_create_report_job_errors(room_creator, user, api_client, mocker):
+    api_client.force_authenticate(user=user)
+    response = api_client.post(reverse('report-jobs'), data=_job_data(room_id=1000))
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'room_id' in response.json()
+
+    # An integrity error that no job in flight explains is not swallowed.
+    mocker.patch.object(ReportJob.objects, 'create', side_effect=IntegrityError('NOT NULL'))
+    with pytest.raises(IntegrityError):
+        api_client.post(reverse('report-jobs'), data=_job_data(room_id=room_creator().id))
+
+
+def test_claim_jobs_retried_on_locked_database(user, mocker):
+    ReportJob.objects.create(
+        params_key='key',
+        reserved_from=START,
+        reserved_to=START + dt.timedelta(days=1),
+        user=user,
+        status=ReportJob.JobStatus.PENDING,
+    )
+    mocker.patch('mrbs_app.services.locks.RESERVATION_RETRY_BACKOFF', 0)
+    update = QuerySet.update
+    attempts = []
+
+    def _locked_once(queryset, **kwargs):
+        attempts.append(kwargs)
+        if len(attempts) == 2:
+            raise OperationalError('database is locked')
+        return update(queryset, **kwargs)
+
+    mocker.patch.object(QuerySet, 'update', _locked_once)
+    (job,) = ReportJobService().claim_jobs(limit=5)
+    assert job.status == ReportJob.JobStatus.RUNNING
+    assert len(attempts) == 4
+
+
+def test_report_job_lifecycle(report_dir, reservation_creator, user, api_client):
+    reservation_creator()
+    api_client.force_authenticate(user=user)
+    job_id = api_client.post(
+        reverse('report-jobs'),
+        data={
+            'reserved_from': (dt.datetime.utcnow() - dt.timedelta(days=1)).isoformat(),
+            'reserved_to': (dt.datetime.utcnow() + dt.timedelta(days=1)).isoformat(),
+        },
+    ).json()['id']
+
+    response = api_client.get(reverse('report-job-file', kwargs={'job_id': job_id}))
+    assert response.status_code == status.HTTP_409_CONFLICT
+
+    service = ReportJobService()
+    (job,) = service.claim_jobs(limit=5)
+    assert job.status == ReportJob.JobStatus.RUNNING
+    assert service.claim_jobs(limit=5) == []
+    service.run_job(job)
+
+    response = api_client.get(reverse('report-job', kwargs={'job_id': job_id}))
+    assert response.json()['status'] == ReportJob.JobStatus.DONE
+    response = api_client.get(reverse('report-job-file', kwargs={'job_id': job_id}))
+    assert response.status_code == status.HTTP_200_OK
+    assert b''.join(response.streaming_content).startswith(b'PK')
+
+    # The report store evicted the file.
+    report_store.clear()
+    response = api_client.get(reverse('report-job-file', kwargs={'job_id': job_id}))
+    assert response.status_code == status.HTTP_410_GONE
+
+    response = api_client.get(reverse('report-job', kwargs={'job_id': job_id + 1}))
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db(transaction=True)
+def test_report_worker_runs_queued_jobs(report_dir, room_creator, user):
+    rooms = [room_creator() for _ in range(3)]
+    for day, room in enumerate(rooms):
+        day_start = START + dt.timedelta(days=day)
+        Reservation.objects.create(
+            reserved_from=day_start,
+            reserved_to=day_start + dt.timedelta(hours=1),
+            purpose_of_booking='meeting',
+            user=user,
+            room=room,
+            status=Reservation.ReservationStatus.ACTIVE,
+        )
+        ReportJob.objects.create(
+            params_key=str(room.id),
+            reserved_from=day_start,
+            reserved_to=day_start + dt.timedelta(days=1),
+            room=room,
+            user=user,
+            status=ReportJob.JobStatus.PENDING,
+        )
+
+    call_command('report_worker', '--once', '--concurrency', '2', '--poll-interval', '0.01')
+
+    assert set(ReportJob.objects.values_list('status', flat=True)) == {ReportJob.JobStatus.DONE}
+    assert len(list(report_dir.iterdir())) == len(rooms)
@@ -0,0 +1,28 @@
+import pytest
+from django.core.management import call_command
+
+from mrbs_app.models import Reservation, Room, RoomDailyOccupancy
+
+
+@pytest.mark.django_db
+def test_seed_bookings():
+    call_command('seed_bookings', rooms=3, reservations=500, users=5, days_back=10)
+
+    assert Room.objects.count() == 3
+    assert Reservation.objects.count() == 500
+    assert set(Reservation.objects.values_list('status', flat=True)) == set(
+        Reservation.ReservationStatus
+    )
+    assert RoomDailyOccupancy.objects.exists()
+
+    for room in Room.objects.all():
+        booked = list(
+            room.reservation_set.order_by('reserved_from').values_list(
+                'reserved_from', 'reserved_to'
+            )
+        )
+        assert len(booked) in (166, 167)
+        for (_, previous_to), (current_from, current_to) in zip(booked, booked[1:]):
+            assert previous_to <= current_from
+            assert current_from.weekday() < 5 and 8 <= current_from.hour < 20
+            assert current_from < current_to
@@ -0,0 +1,186 @@
+import datetime as dt
+
+import pytest
+from django.db import OperationalError
+from django.urls import reverse
+from rest_framework import status
+
+from mrbs_app.api.error_messages import HTTPErrorMessages
+from mrbs_app.models import Reservation, ReservationSeries
+from mrbs_app.services.series import find_conflicts, iter_occurrences
+
+MONDAY = dt.datetime(2030, 1, 7, 10, tzinfo=dt.timezone.utc)
+
+
+def _series_data(room_id: int, weeks: int, **extra) -> dict:
+    return {
+        'room_id': room_id,
+        'purpose_of_booking': 'stand-up',
+        'reserved_from': MONDAY.isoformat(),
+        'reserved_to': (MONDAY + dt.timedelta(minutes=15)).isoformat(),
+        'frequency': ReservationSeries.Frequency.WEEKLY,
+        'until': (MONDAY + dt.timedelta(weeks=weeks - 1)).isoformat(),
+        **extra,
+    }
+
+
+def test_iter_occurrences_weekly():
+    series = ReservationSeries(
+        reserved_from=MONDAY,
+        reserved_to=MONDAY + dt.timedelta(hours=1),
+        frequency=ReservationSeries.Frequency.WEEKLY,
+        interval=2,
+        weekdays=[0, 2],
+        until=MONDAY + dt.timedelta(weeks=4),
+        excluded_dates=[(MONDAY + dt.timedelta(weeks=2)).date().isoformat()],
+    )
+    starts = [reserved_from for reserved_from, _ in iter_occurrences(series)]
+    assert starts == [
+        MONDAY,
+        MONDAY + dt.timedelta(days=2),
+        MONDAY + dt.timedelta(weeks=2, days=2),
+        MONDAY + dt.timedelta(weeks=4),
+    ]
+
+
+def test_find_conflicts():
+    def _period(start: int, end: int) -> tuple[dt.datetime, dt.datetime]:
+        return MONDAY + dt.timedelta(hours=start), MONDAY + dt.timedelta(hours=end)
+
+    occurrences = [_period(0, 1), _period(2, 3), _period(4, 5), _period(6, 7)]
+    reservations = [_period(1, 2), _period(3, 5), _period(6, 8)]
+    assert find_conflicts(occurrences, reservations) == [_period(4, 5), _period(6, 7)]
+
+
+@pytest.mark.parametrize('weeks', [2, 52])
+def test_create_series_constant_queries(
+    weeks, room_creator, user, api_client, django_assert_max_num_queries
+):
+    room = room_creator()
+    api_client.force_authenticate(user=user)
+    with django_assert_max_num_queries(10):
+        response = api_client.post(
+            reverse('series'), data=_series_data(room.id, weeks), format='json'
+        )
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()['occurrences'] == weeks
+    assert Reservation.objects.filter(series_id=response.json()['id']).count() == weeks
+
+
+def test_create_series_busy(room_creator, user, api_client):
+    room = room_creator()
+    Reservation.objects.create(
+        reserved_from=MONDAY + dt.timedelta(weeks=3),
+        reserved_to=MONDAY + dt.timedelta(weeks=3, hours=1),
+        purpose_of_booking='existing',
+        user=user,
+        room=room,
+        status=Reservation.ReservationStatus.ACTIVE,
+    )
+    api_client.force_authenticate(user=user)
+    response = api_client.post(reverse('series'), data=_series_data(room.id, 10), format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert tuple(response.json()[0]) == HTTPErrorMessages.BOOKING_TIME_IS_BUSY[0]
+    assert not ReservationSeries.objects.exists()
+
+
+def test_skip_and_cancel_series(room_creator, user, api_client, django_assert_max_num_queries):
+    room = room_creator()
+    api_client.force_authenticate(user=user)
+    series_id = api_client.post(
+        reverse('series'), data=_series_data(room.id, 20), format='json'
+    ).json()['id']
+    skipped_date = (MONDAY + dt.timedelta(weeks=1)).date()
+
+    with django_assert_max_num_queries(11):
+        response = api_client.post(
+            reverse('series-skip', kwargs={'series_id': series_id}),
+            data={'date': skipped_date.isoformat()},
+        )
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    active = Reservation.objects.filter(status=Reservation.ReservationStatus.ACTIVE)
+    assert active.count() == 19
+    assert not active.filter(reserved_from__date=skipped_date).exists()
+
+    with django_assert_max_num_queries(11):
+        response = api_client.delete(reverse('series-detail', kwargs={'series_id': series_id}))
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert not active.exists()
+
+    response = api_client.delete(reverse('series-detail', kwargs={'series_id': series_id}))
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_series_changed_by_owner_or_staff_only(room_creator, user, django_user_model, api_client):
+    room = room_creator()
+    api_client.force_authenticate(user=user)
+    series_id = api_client.post(
+        reverse('series'), data=_series_data(room.id, 3), format='json'
+    ).json()['id']
+
+    other_user = django_user_model.objects.create_user(username='other', password='password')
+    api_client.force_authenticate(user=other_user)
+    response = api_client.post(
+        reverse('series-skip', kwargs={'series_id': series_id}),
+        data={'date': MONDAY.date().isoformat()},
+    )
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    response = api_client.delete(reverse('series-detail', kwargs={'series_id': series_id}))
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert Reservation.objects.filter(status=Reservation.ReservationStatus.ACTIVE).count() == 3
+
+    staff = django_user_model.objects.create_user(
+        username='staff', password='password', is_staff=True
+    )
+    api_client.force_authenticate(user=staff)
+    response = api_client.delete(reverse('series-detail', kwargs={'series_id': series_id}))
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert ReservationSeries.objects.get().status == ReservationSeries.SeriesStatus.CANCELLED
+
+
+def test_skip_and_cancel_series_retried_on_locked_database(room_creator, user, api_client, mocker):
+    room = room_creator()
+    api_client.force_authenticate(user=user)
+    series_id = api_client.post(
+        reverse('series'), data=_series_data(room.id, 3), format='json'
+    ).json()['id']
+    mocker.patch('mrbs_app.services.locks.RESERVATION_RETRY_BACKOFF', 0)
+    save = ReservationSeries.save
+    attempts = []
+
+    def _locked_once(series, *args, **kwargs):
+        attempts.append(series.id)
+        if len(attempts) == 1:
+            raise OperationalError('database is locked')
+        return save(series, *args, **kwargs)
+
+    mocker.patch.object(ReservationSeries, 'save', autospec=True, side_effect=_locked_once)
+    response = api_client.post(
+        reverse('series-skip', kwargs={'series_id': series_id}),
+        data={'date': MONDAY.date().isoformat()},
+    )
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert attempts == [series_id, series_id]
+
+    mocker.patch.object(
+        ReservationSeries, 'save', side_effect=OperationalError('database is locked')
+    )
+    response = api_client.delete(reverse('series-detail', kwargs={'series_id': series_id}))
+    assert response.status_code == status.HTTP_409_CONFLICT
+    assert tuple(response.json()) == HTTPErrorMessages.BOOKING_CONFLICT
+    assert Reservation.objects.filter(status=Reservation.ReservationStatus.ACTIVE).count() == 2
+
+
+def test_other_database_errors_not_retried(room_creator, user, api_client, mocker):
+    room = room_creator()
+    api_client.force_authenticate(user=user)
+    series_id = api_client.post(
+        reverse('series'), data=_series_data(room.id, 3), format='json'
+    ).json()['id']
+    save = mocker.patch.object(
+        ReservationSeries, 'save', side_effect=OperationalError('disk I/O error')
+    )
+    # Not turned into a 409: the test client re-raises what the server would answer with 500.
+    with pytest.raises(OperationalError, match='disk I/O error'):
+        api_client.delete(reverse('series-detail', kwargs={'series_id': series_id}))
+    assert save.call_count == 1
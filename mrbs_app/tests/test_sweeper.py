@@ -0,0 +1,84 @@
+import datetime as dt
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from mrbs_app.models import Reservation
+from mrbs_app.services.availability import IntervalIndexAvailabilityEngine
+from mrbs_app.services.sweeper import ReservationSweepService
+
+
+@pytest.mark.django_db
+def test_sweeper_completes_ended_reservations(
+    room_creator, reservation_creator, mocker, django_capture_on_commit_callbacks
+):
+    room = room_creator()
+    now = timezone.now()
+
+    ended = [
+        reservation_creator(now - dt.timedelta(hours=hours), room=room) for hours in range(2, 7)
+    ]
+    cancelled = reservation_creator(
+        now - dt.timedelta(hours=10), room=room, status=Reservation.ReservationStatus.CANCELLED
+    )
+    current = reservation_creator(now - dt.timedelta(minutes=30), room=room)
+    upcoming = reservation_creator(now + dt.timedelta(hours=2), room=room)
+
+    engine = IntervalIndexAvailabilityEngine()
+    mocker.patch('mrbs_app.services.availability._engine', engine)
+    assert not engine.is_available(room.id, ended[0].reserved_from, ended[0].reserved_to)
+    with django_capture_on_commit_callbacks(execute=True):
+        completed = ReservationSweepService().complete_ended_reservations(chunk_size=2)
+    assert completed == 5
+    assert engine.is_available(room.id, ended[0].reserved_from, ended[0].reserved_to)
+
+    statuses = dict(Reservation.objects.values_list('id', 'status'))
+    assert {statuses[reservation.id] for reservation in ended} == {
+        Reservation.ReservationStatus.COMPLETED
+    }
+    assert statuses[cancelled.id] == Reservation.ReservationStatus.CANCELLED
+    assert statuses[current.id] == Reservation.ReservationStatus.ACTIVE
+    assert statuses[upcoming.id] == Reservation.ReservationStatus.ACTIVE
+
+    call_command('sweep_reservations')
+    assert Reservation.objects.filter(status=Reservation.ReservationStatus.COMPLETED).count() == 5
+
+
+@pytest.mark.django_db
+def test_completed_reservations_stay_listed(room_creator, reservation_creator, user, api_client):
+    room = room_creator()
+    now = timezone.now().replace(microsecond=0)
+    window_from, window_to = now - dt.timedelta(hours=4), now - dt.timedelta(hours=1)
+    for hours, reservation_status in (
+        (3, Reservation.ReservationStatus.ACTIVE),
+        (2, Reservation.ReservationStatus.CANCELLED),
+    ):
+        reservation_creator(now - dt.timedelta(hours=hours), room=room, status=reservation_status)
+    assert ReservationSweepService().complete_ended_reservations() == 1
+
+    api_client.force_authenticate(user=user)
+    response = api_client.get(
+        reverse('reservations'),
+        data={
+            'reserved_from': window_from.isoformat(),
+            'reserved_to': window_to.isoformat(),
+            'room_id': room.id,
+        },
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert [reservation['status'] for reservation in response.json()] == [
+        Reservation.ReservationStatus.COMPLETED
+    ]
+
+    response = api_client.get(
+        reverse('free-slots'),
+        data={'from': window_from.isoformat(), 'to': window_to.isoformat(), 'duration': 60},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert [slot['from'] for slot in response.json()[0]['slots']] == [
+        window_from.isoformat().replace('+00:00', 'Z'),
+        (window_to - dt.timedelta(hours=1)).isoformat().replace('+00:00', 'Z'),
+    ]